@@ -0,0 +1,73 @@
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from apps.documents import pagination
+
+
+class DocumentPagination(BasePagination):
+    """Keyset pagination of documents (see ``apps.documents.pagination``).
+
+    If an ``offset`` is given, the regular limit/offset pagination is used
+    instead, which allows jumping to arbitrary pages but gets slower with
+    growing offsets. ``limit`` sets the page size in both cases.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = LimitOffsetPagination.limit_query_param
+    offset_query_param = LimitOffsetPagination.offset_query_param
+    page_size = pagination.PAGE_SIZE
+    max_page_size = 100
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.offset_pagination = None
+        if self.offset_query_param in request.query_params:
+            self.offset_pagination = LimitOffsetPagination()
+            self.offset_pagination.default_limit = self.page_size
+            self.offset_pagination.max_limit = self.max_page_size
+            return self.offset_pagination.paginate_queryset(
+                queryset.order_by(*pagination.ORDERING), request, view
+            )
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        try:
+            documents, self.next_cursor = pagination.paginate(
+                queryset, cursor, self.get_page_size(request)
+            )
+        except ValueError:
+            raise NotFound("Invalid cursor")
+        return documents
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        if self.offset_pagination is not None:
+            return self.offset_pagination.get_paginated_response(data)
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        """Keyset pages only have a link to the next page, offset pages have
+        the count and both links."""
+        keyset = {
+            "type": "object",
+            "required": ["next", "results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+        offset = LimitOffsetPagination().get_paginated_response_schema(schema)
+        return {"oneOf": [keyset, offset]}
@@ -1,9 +1,26 @@
 from django.contrib.auth import get_user_model
+from django.template.defaultfilters import slugify
 from rest_framework import serializers
+from rest_framework.reverse import reverse
 
+from apps.documents import models as document_models
 from apps.lecturers import models
 
 
+class FieldSelectionMixin:
+    """Only serialize the fields listed in the ``fields`` query parameter
+    (comma separated), if there is one. Unknown fields are ignored."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get("request")
+        selection = request and request.query_params.get("fields")
+        if selection:
+            selected = set(selection.split(","))
+            for name in set(self.fields) - selected:
+                self.fields.pop(name)
+
+
 class UserSerializer(serializers.ModelSerializer):
     username = serializers.ReadOnlyField()
     quotes = serializers.PrimaryKeyRelatedField(
@@ -19,6 +36,12 @@ class LecturerSerializer(serializers.ModelSerializer):
     quotes = serializers.PrimaryKeyRelatedField(
         many=True, read_only=True, source="Quote"
     )
+    avg_rating_d = serializers.ReadOnlyField()
+    avg_rating_m = serializers.ReadOnlyField()
+    avg_rating_f = serializers.ReadOnlyField()
+    rating_count_d = serializers.ReadOnlyField()
+    rating_count_m = serializers.ReadOnlyField()
+    rating_count_f = serializers.ReadOnlyField()
 
     class Meta:
         model = models.Lecturer
@@ -35,6 +58,12 @@ class LecturerSerializer(serializers.ModelSerializer):
             "email",
             "office",
             "quotes",
+            "avg_rating_d",
+            "avg_rating_m",
+            "avg_rating_f",
+            "rating_count_d",
+            "rating_count_m",
+            "rating_count_f",
         )
 
 
@@ -56,3 +85,77 @@ class QuoteSerializer(serializers.ModelSerializer):
             "comment",
             "votes",
         )
+
+
+class DocumentSerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    category = serializers.ReadOnlyField(source="category.name")
+    uploader = serializers.ReadOnlyField(source="uploader.username")
+    downloadcount = serializers.ReadOnlyField()
+    rating = serializers.ReadOnlyField()
+    rating_count = serializers.ReadOnlyField()
+    download_url = serializers.SerializerMethodField()
+    thumbnail_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = document_models.Document
+        fields = (
+            "id",
+            "name",
+            "description",
+            "url",
+            "category",
+            "dtype",
+            "original_filename",
+            "file_size",
+            "uploader",
+            "upload_date",
+            "change_date",
+            "license",
+            "public",
+            "downloadcount",
+            "rating",
+            "rating_count",
+            "download_url",
+            "thumbnail_url",
+        )
+
+    def _document_url(self, name, document):
+        args = (slugify(document.category.name), document.pk)
+        request = self.context.get("request")
+        return reverse(f"documents:{name}", args=args, request=request)
+
+    def get_download_url(self, document):
+        if document.category is None:
+            return None
+        return self._document_url("document_download", document)
+
+    def get_thumbnail_url(self, document):
+        if document.category is None or not document.thumbnail():
+            return None
+        url = self._document_url("document_thumbnail", document)
+        return f"{url}?v={document.thumbnail_version()}"
+
+
+class DocumentCategorySerializer(FieldSelectionMixin, serializers.ModelSerializer):
+    lecturers = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+    courses = serializers.SlugRelatedField(
+        many=True, read_only=True, slug_field="abbreviation"
+    )
+    document_count = serializers.ReadOnlyField()
+    summary_count = serializers.ReadOnlyField()
+    exam_count = serializers.ReadOnlyField()
+    other_count = serializers.ReadOnlyField()
+
+    class Meta:
+        model = document_models.DocumentCategory
+        fields = (
+            "id",
+            "name",
+            "description",
+            "lecturers",
+            "courses",
+            "document_count",
+            "summary_count",
+            "exam_count",
+            "other_count",
+        )
@@ -28,6 +28,25 @@ v1_api = [
     re_path(
         r"^quotes/(?P<pk>-?\d+)/vote$", views.QuoteVote.as_view(), name="quote_vote"
     ),
+    re_path(
+        r"^documents/categories$",
+        views.DocumentCategoryList.as_view(),
+        name="document_category_list",
+    ),
+    re_path(
+        r"^documents/categories/(?P<pk>-?\d+)$",
+        views.DocumentCategoryDetail.as_view(),
+        name="document_category_detail",
+    ),
+    re_path(r"^documents$", views.DocumentList.as_view(), name="document_list"),
+    re_path(
+        r"^documents/(?P<pk>-?\d+)$",
+        views.DocumentDetail.as_view(),
+        name="document_detail",
+    ),
+    re_path(
+        r"^documents/search$", views.DocumentSearch.as_view(), name="document_search"
+    ),
 ]
 
 urlpatterns = [
@@ -2,14 +2,17 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.http import HttpResponseBadRequest, JsonResponse
 from django.shortcuts import get_object_or_404
-from rest_framework import generics, permissions
+from rest_framework import exceptions, generics, permissions
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework.reverse import reverse
 from rest_framework.views import APIView
 
+from apps.documents import forms as document_forms
+from apps.documents import models as document_models
 from apps.lecturers import models
 
+from . import pagination
 from . import permissions as custom_permissions
 from . import serializers
 
@@ -21,6 +24,10 @@ def api_root(request, format=None):
             "users": reverse("api:user_list", request=request, format=format),
             "lecturers": reverse("api:lecturer_list", request=request, format=format),
             "quotes": reverse("api:quote_list", request=request, format=format),
+            "documents": reverse("api:document_list", request=request, format=format),
+            "document_search": reverse(
+                "api:document_search", request=request, format=format
+            ),
         }
     )
 
@@ -44,19 +51,19 @@ class UserDetail(generics.RetrieveUpdateAPIView):
 
 # GET
 class LecturerList(generics.ListAPIView):
-    queryset = models.Lecturer.real_objects.all()
+    queryset = models.Lecturer.real_objects.with_ratings().prefetch_related("Quote")
     serializer_class = serializers.LecturerSerializer
 
 
 # GET
 class LecturerDetail(generics.RetrieveAPIView):
-    queryset = models.Lecturer.real_objects.all()
+    queryset = models.Lecturer.real_objects.with_ratings().prefetch_related("Quote")
     serializer_class = serializers.LecturerSerializer
 
 
 # GET / POST
 class QuoteList(generics.ListCreateAPIView):
-    queryset = models.Quote.objects.all()
+    queryset = models.Quote.objects.select_related("lecturer").with_votes()
     serializer_class = serializers.QuoteSerializer
 
     def perform_create(self, serializer):
@@ -65,7 +72,7 @@ class QuoteList(generics.ListCreateAPIView):
 
 # GET / PUT / PATCH
 class QuoteDetail(generics.RetrieveUpdateAPIView):
-    queryset = models.Quote.objects.all()
+    queryset = models.Quote.objects.select_related("lecturer").with_votes()
     serializer_class = serializers.QuoteSerializer
     owner_obj_field = "author"
     permission_classes = (
@@ -74,6 +81,65 @@ class QuoteDetail(generics.RetrieveUpdateAPIView):
     )
 
 
+# GET
+class DocumentCategoryList(generics.ListAPIView):
+    queryset = document_models.DocumentCategory.objects.with_counts().prefetch_related(
+        "lecturers", "courses"
+    )
+    serializer_class = serializers.DocumentCategorySerializer
+
+
+# GET
+class DocumentCategoryDetail(generics.RetrieveAPIView):
+    queryset = document_models.DocumentCategory.objects.with_counts().prefetch_related(
+        "lecturers", "courses"
+    )
+    serializer_class = serializers.DocumentCategorySerializer
+
+
+# GET
+class DocumentList(generics.ListAPIView):
+    """Documents, newest first. Can be filtered by ``category`` (name),
+    ``dtype`` and ``license``."""
+
+    queryset = document_models.Document.objects.select_related(
+        "category", "uploader"
+    ).with_stats()
+    serializer_class = serializers.DocumentSerializer
+    pagination_class = pagination.DocumentPagination
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        category = self.request.query_params.get("category")
+        if category:
+            queryset = queryset.filter(category__name__iexact=category)
+        filter_form = document_forms.DocumentFilterForm(self.request.query_params)
+        if not filter_form.is_valid():
+            raise exceptions.ValidationError(filter_form.errors)
+        return filter_form.filter(queryset)
+
+
+# GET
+class DocumentDetail(generics.RetrieveAPIView):
+    queryset = DocumentList.queryset
+    serializer_class = serializers.DocumentSerializer
+
+
+# GET
+class DocumentSearch(generics.ListAPIView):
+    serializer_class = serializers.DocumentSerializer
+
+    def get_queryset(self):
+        query = self.request.query_params.get("q", "").strip()
+        if not query:
+            return document_models.Document.objects.none()
+        return (
+            document_models.Document.objects.search(query)
+            .select_related("category", "uploader")
+            .with_stats()
+        )
+
+
 # POST
 class QuoteVote(APIView):
     def post(self, request, pk):
@@ -83,23 +149,14 @@ class QuoteVote(APIView):
         if vote not in ["up", "down", "remove"]:
             return HttpResponseBadRequest("Expected up/down/remove for vote")
 
-        if vote == "remove":
-            models.QuoteVote.objects.get(user=request.user, quote=quote).delete()
-        else:
-            try:
-                vote_obj = models.QuoteVote.objects.get(user=request.user, quote=quote)
-            except models.QuoteVote.DoesNotExist:
-                vote_obj = models.QuoteVote()
-                vote_obj.user = request.user
-                vote_obj.quote = quote
-            vote_obj.vote = vote == "up"
-            vote_obj.save()
+        value = None if vote == "remove" else vote == "up"
+        upvotes, downvotes = models.Quote.objects.vote(quote, request.user, value)
 
         data = {
             "vote_elem_pk": quote.pk,
             "vote": vote,
-            "vote_count": quote.QuoteVote.count(),
-            "vote_sum": quote.vote_sum(),
+            "vote_count": upvotes + downvotes,
+            "vote_sum": upvotes - downvotes,
         }
         return JsonResponse(data)
 
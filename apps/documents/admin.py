@@ -13,6 +13,18 @@ class DocumentCategoryAdmin(admin.ModelAdmin):
     search_fields = list_display
 
 
+class ThumbnailJobAdmin(admin.ModelAdmin):
+    list_display = ("document", "queued", "attempts", "claimed")
+    raw_id_fields = ("document",)
+
+
+class DocumentContentAdmin(admin.ModelAdmin):
+    list_display = ("document", "source_change_date", "extracted", "error")
+    raw_id_fields = ("document",)
+
+
 admin.site.register(models.Document, DocumentAdmin)
 admin.site.register(models.DocumentCategory, DocumentCategoryAdmin)
 admin.site.register(models.DocumentRating)
+admin.site.register(models.ThumbnailJob, ThumbnailJobAdmin)
+admin.site.register(models.DocumentContent, DocumentContentAdmin)
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class DocumentsConfig(AppConfig):
+    name = "apps.documents"
+
+    def ready(self):
+        from apps.documents import signals  # noqa: F401
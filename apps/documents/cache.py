@@ -0,0 +1,37 @@
+"""Versioned cache of the document category overview.
+
+The rendered category grid is cached under a version number. Instead of
+deleting cache entries, writes to documents, categories, lecturers and
+courses bump the version, so stale fragments are never read again and
+expire on their own. The fragments are cached per process, the version is in
+the shared cache, so a bump invalidates the fragments of all processes.
+
+"""
+
+import time
+
+from django.core.cache import caches
+
+CATEGORY_LIST_VERSION_KEY = "documents:category_list_version"
+
+
+def category_list_version():
+    """Return the current version of the category grid."""
+    shared = caches["shared"]
+    version = shared.get(CATEGORY_LIST_VERSION_KEY)
+    if version is None:
+        # Start from the current time instead of 1, so that a version key
+        # that was evicted can't be recreated with a version of a cached
+        # fragment.
+        shared.add(CATEGORY_LIST_VERSION_KEY, time.time_ns(), None)
+        version = shared.get(CATEGORY_LIST_VERSION_KEY)
+    return version
+
+
+def invalidate_category_list():
+    """Bump the version of the category grid."""
+    try:
+        caches["shared"].incr(CATEGORY_LIST_VERSION_KEY)
+    except ValueError:
+        # No version stored yet, the next read starts a new one
+        pass
@@ -0,0 +1,131 @@
+"""Buffered logging of document downloads.
+
+A download is counted once per document, visitor and day. Instead of checking
+for a previous download and inserting a row on every request, downloads are
+collected in a per-process buffer and written in a single ``INSERT ... ON
+CONFLICT DO NOTHING`` at most ``DOCUMENT_DOWNLOAD_FLUSH_INTERVAL`` seconds
+later. The unique constraint on ``DocumentDownload`` takes care of duplicates
+across batches and processes.
+
+"""
+
+import atexit
+import hashlib
+import logging
+import threading
+from datetime import date
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+
+from apps.documents import models
+
+logger = logging.getLogger(__name__)
+
+# Flush the buffer early once it contains this many downloads
+MAX_BUFFER_SIZE = 500
+
+
+def visitor_key(request):
+    """Return the key identifying the user or anonymous visitor of a
+    request. Anonymous visitors without a session are identified by their IP
+    address and user agent, which are not stored in plain text."""
+    if request.user.is_authenticated:
+        return f"user:{request.user.pk}"
+    session = getattr(request, "session", None)
+    if session is not None and session.session_key:
+        identity = f"session:{session.session_key}"
+    else:
+        identity = "ip:{}:{}".format(
+            request.META.get("REMOTE_ADDR", ""),
+            request.META.get("HTTP_USER_AGENT", ""),
+        )
+    return "anon:" + hashlib.sha256(identity.encode("utf8")).hexdigest()[:32]
+
+
+class DownloadBuffer:
+    """Collects downloads and writes them in batches.
+
+    The buffer is flushed by a timer thread once the flush interval has
+    passed since the first buffered download, when it is full, and when the
+    process exits.
+
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._timer = None
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, document_id, visitor, day=None):
+        interval = settings.DOCUMENT_DOWNLOAD_FLUSH_INTERVAL
+        with self._lock:
+            self._pending.add((document_id, visitor, day or date.today()))
+            flush_now = interval <= 0 or len(self._pending) >= MAX_BUFFER_SIZE
+            if not flush_now and self._timer is None:
+                self._timer = threading.Timer(interval, self._flush_from_timer)
+                self._timer.daemon = True
+                self._timer.start()
+        if flush_now:
+            self.flush()
+
+    def _flush_from_timer(self):
+        try:
+            self.flush()
+        finally:
+            # The timer thread has its own database connection
+            connection.close()
+
+    def flush(self):
+        """Write all buffered downloads and update the download counters of
+        the affected documents. Returns the number of buffered downloads."""
+        with self._lock:
+            pending, self._pending = self._pending, set()
+            timer, self._timer = self._timer, None
+        if timer is not None:
+            timer.cancel()
+        if not pending:
+            return 0
+
+        document_ids = {document_id for document_id, _, _ in pending}
+        try:
+            with transaction.atomic():
+                # Skip documents which were deleted in the meantime
+                existing = set(
+                    models.Document.objects.filter(pk__in=document_ids).values_list(
+                        "pk", flat=True
+                    )
+                )
+                models.DocumentDownload.objects.bulk_create(
+                    [
+                        models.DocumentDownload(
+                            document_id=document_id, visitor=visitor, day=day
+                        )
+                        for document_id, visitor, day in pending
+                        if document_id in existing
+                    ],
+                    ignore_conflicts=True,
+                )
+                models.DocumentStats.objects.refresh_downloads(existing)
+        except DatabaseError:
+            logger.exception(f"Could not write {len(pending)} document download(s)")
+        return len(pending)
+
+
+buffer = DownloadBuffer()
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        buffer.flush()
+    except Exception:
+        logger.exception("Could not write the buffered document downloads")
+
+
+def record_download(request, document):
+    """Count a download of ``document`` by the visitor of ``request``."""
+    buffer.add(document.pk, visitor_key(request))
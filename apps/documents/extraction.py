@@ -0,0 +1,147 @@
+"""Extraction of the text of uploaded documents for the full-text search.
+
+Text is extracted off the request path by the ``extract_document_text``
+management command, which processes all documents whose file changed since
+the last extraction (see ``DocumentQuerySet.with_outdated_content``).
+
+PDFs are converted with ``pdftotext`` from poppler-utils. Office Open XML and
+OpenDocument files are zip archives of XML documents, their text is read
+directly. Other formats are skipped.
+
+"""
+
+import os
+import re
+import subprocess
+import zipfile
+from xml.etree import ElementTree
+
+# Maximum number of characters per indexed chunk. PostgreSQL limits the size
+# of a single tsvector to 1 MB, which a chunk of this size never reaches.
+CHUNK_SIZE = 20000
+
+PLAIN_TEXT_EXTENSIONS = {".txt", ".md", ".tex", ".csv"}
+
+# Members of the archives containing the text, as regular expressions
+ARCHIVE_MEMBERS = {
+    ".docx": r"word/(document|footnotes|endnotes)\.xml",
+    ".pptx": r"ppt/slides/slide\d+\.xml",
+    ".xlsx": r"xl/sharedStrings\.xml",
+    ".odt": r"content\.xml",
+    ".odp": r"content\.xml",
+    ".ods": r"content\.xml",
+}
+
+# Maximum total uncompressed size of the members read from an archive, so
+# that small uploaded zip bombs can't exhaust the memory of the worker
+MAX_ARCHIVE_SIZE = 50 * 1024 * 1024
+
+# Local names of the XML elements containing a paragraph (or a spreadsheet
+# string) of text
+PARAGRAPH_TAGS = {"p", "h", "si"}
+
+
+class ExtractionError(Exception):
+    """The text of a file could not be extracted."""
+
+
+def can_extract(path):
+    """Return whether text can be extracted from a file with this name."""
+    ext = os.path.splitext(path)[1].lower()
+    return ext == ".pdf" or ext in ARCHIVE_MEMBERS or ext in PLAIN_TEXT_EXTENSIONS
+
+
+def _extract_pdf(path, timeout=None):
+    try:
+        output = subprocess.check_output(
+            ["pdftotext", "-q", "-enc", "UTF-8", path, "-"],
+            stderr=subprocess.STDOUT,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        raise ExtractionError(f"pdftotext timed out after {timeout}s")
+    except (OSError, subprocess.CalledProcessError) as e:
+        output = (getattr(e, "output", None) or b"").decode("utf8", "replace")
+        raise ExtractionError(f"{e}\n{output}".strip())
+    return output.decode("utf8", "replace")
+
+
+def _extract_archive(path, member_pattern):
+    try:
+        with zipfile.ZipFile(path) as archive:
+            names = sorted(
+                (n for n in archive.namelist() if re.fullmatch(member_pattern, n)),
+                key=lambda n: [
+                    int(s) if s.isdigit() else s for s in re.split(r"(\d+)", n)
+                ],
+            )
+            remaining = MAX_ARCHIVE_SIZE
+            if sum(archive.getinfo(name).file_size for name in names) > remaining:
+                raise ExtractionError("Archive too large")
+            parts = []
+            for name in names:
+                # The sizes in the archive may be wrong, read at most the rest
+                with archive.open(name) as member:
+                    data = member.read(remaining + 1)
+                remaining -= len(data)
+                if remaining < 0:
+                    raise ExtractionError("Archive too large")
+                root = ElementTree.fromstring(data)
+                # Paragraphs are separated by newlines, the inline text runs
+                # within a paragraph are joined. Paragraphs containing other
+                # paragraphs (e.g. text boxes) are represented by those.
+                parts.extend(
+                    "".join(element.itertext())
+                    for element in root.iter()
+                    if element.tag.rsplit("}", 1)[-1] in PARAGRAPH_TAGS
+                    and element.find(".//{*}p") is None
+                )
+    except (OSError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+        raise ExtractionError(str(e))
+    return "\n".join(parts)
+
+
+def _extract_plain(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read().decode("utf8", "replace")
+    except OSError as e:
+        raise ExtractionError(str(e))
+
+
+def extract_text(path, timeout=None):
+    """Return the text of a document file.
+    :param path Path of the file
+    :param timeout Seconds after which the extraction of a PDF is aborted
+    :raises ExtractionError
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".pdf":
+        text = _extract_pdf(path, timeout=timeout)
+    elif ext in ARCHIVE_MEMBERS:
+        text = _extract_archive(path, ARCHIVE_MEMBERS[ext])
+    elif ext in PLAIN_TEXT_EXTENSIONS:
+        text = _extract_plain(path)
+    else:
+        raise ExtractionError(f"Unsupported file type: {ext}")
+    # PostgreSQL text columns can't contain NUL characters
+    return text.replace("\x00", "")
+
+
+def split_chunks(text, size=CHUNK_SIZE):
+    """Split a text into chunks of at most ``size`` characters, preferably at
+    paragraph or word boundaries. Whitespace is normalized."""
+    text = re.sub(r"[ \t\r\f\v]+", " ", text)
+    text = re.sub(r"\s*\n\s*", "\n", text).strip()
+    chunks = []
+    while len(text) > size:
+        cut = text.rfind("\n", 0, size + 1)
+        if cut <= 0:
+            cut = text.rfind(" ", 0, size + 1)
+        if cut <= 0:
+            cut = size
+        chunks.append(text[:cut].strip())
+        text = text[cut:].strip()
+    if text:
+        chunks.append(text)
+    return chunks
@@ -41,11 +41,16 @@ class DocumentEditForm(forms.ModelForm):
 
         return cleaned_data
 
-    def save(self, *args, **kwargs):
-        """Override save method, set change_date to now only if pdf is actually updated."""
-        if "document" in self.changed_data:
+    def save(self, commit=True):
+        """Override save method, set change_date to now only if pdf is actually updated.
+        In that case, the generation of a new thumbnail is queued as well."""
+        document_changed = "document" in self.changed_data
+        if document_changed:
             self.instance.change_date = datetime.now()
-        return super().save(*args, **kwargs)
+        instance = super().save(commit=commit)
+        if commit and document_changed and instance.thumbnail():
+            models.ThumbnailJob.objects.enqueue(instance, retry=True)
+        return instance
 
     class Meta:
         model = models.Document
@@ -75,3 +80,31 @@ class DocumentAddForm(DocumentEditForm):
             "license",
             "public",
         )
+
+
+class DocumentFilterForm(forms.Form):
+    """Filters of document lists, bound to the query string."""
+
+    dtype = forms.TypedChoiceField(
+        label="Typ",
+        choices=[("", "Alle Typen")] + models.Document._meta.get_field("dtype").choices,
+        coerce=int,
+        empty_value=None,
+        required=False,
+    )
+    license = forms.TypedChoiceField(
+        label="Lizenz",
+        choices=[("", "Alle Lizenzen")] + list(models.Document.LICENSES),
+        coerce=int,
+        empty_value=None,
+        required=False,
+    )
+
+    def filter(self, queryset):
+        """Apply the filters to a document queryset. Invalid filters are
+        ignored."""
+        if self.is_valid():
+            for name, value in self.cleaned_data.items():
+                if value is not None:
+                    queryset = queryset.filter(**{name: value})
+        return queryset
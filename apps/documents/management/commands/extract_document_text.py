@@ -0,0 +1,108 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from apps.documents import extraction, models
+
+
+class Command(BaseCommand):
+    help = (
+        "Extract the text of all documents which are new or whose file changed "
+        "since the last extraction, and index it for the full-text search."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-j",
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of files processed in parallel (default: CPU count)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=120,
+            help="Seconds after which extracting a single file is aborted "
+            "(default: 120)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Extract the text of all documents, even if it is up to date",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running and look for new documents every INTERVAL seconds",
+        )
+
+    def find_pending(self, force):
+        """Return a list of (document id, change date, path) tuples to
+        process."""
+        documents = models.Document.objects.order_by("pk")
+        if not force:
+            documents = documents.with_outdated_content()
+        storage = models.Document._meta.get_field("document").storage
+        return [
+            (pk, change_date, storage.path(name))
+            for pk, change_date, name in documents.values_list(
+                "pk", "change_date", "document"
+            ).iterator()
+        ]
+
+    def extract(self, path, timeout):
+        """Return the chunks of a file and an error message."""
+        if not extraction.can_extract(path):
+            return [], ""
+        try:
+            text = extraction.extract_text(path, timeout=timeout)
+        except extraction.ExtractionError as e:
+            return [], str(e) or e.__class__.__name__
+        return extraction.split_chunks(text), ""
+
+    def run_once(self, options):
+        pending = self.find_pending(options["force"])
+        total = len(pending)
+        if total or options["interval"] is None:
+            self.stdout.write(f"Extracting the text of {total} document(s).")
+
+        failures = 0
+        # Only the extraction runs in the worker threads (mostly waiting for
+        # pdftotext), the results are stored from the main thread.
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {
+                executor.submit(self.extract, path, options["timeout"]): (
+                    pk,
+                    change_date,
+                    path,
+                )
+                for pk, change_date, path in pending
+            }
+            for i, future in enumerate(as_completed(futures), start=1):
+                pk, change_date, path = futures[future]
+                chunks, error = future.result()
+                if error:
+                    failures += 1
+                    self.stderr.write(f"{path}: {error}")
+                # Failed extractions are stored as well, so they are only
+                # retried once the file changes.
+                if models.Document.objects.filter(pk=pk).exists():
+                    models.DocumentContent.objects.store(
+                        pk, change_date, chunks=chunks, error=error
+                    )
+                if options["verbosity"] > 1 or i % 100 == 0 or i == total:
+                    self.stdout.write(f"[{i}/{total}] {path}")
+
+        if total or options["interval"] is None:
+            self.stdout.write(
+                f"Extracted {total - failures} document(s), {failures} failed."
+            )
+
+    def handle(self, *args, **options):
+        self.run_once(options)
+        while options["interval"] is not None:
+            time.sleep(options["interval"])
+            self.run_once(options)
@@ -0,0 +1,98 @@
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand
+
+from apps.documents import models, thumbnails
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate the thumbnails of all PDF documents whose thumbnail is missing "
+        "or older than the document itself."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "-j",
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Number of thumbnails rendered in parallel (default: CPU count)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds after which rendering a single file is aborted (default: 60)",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Regenerate thumbnails even if they are up to date",
+        )
+
+    def find_pending(self, force):
+        """Return a list of (document id, path) tuples to render."""
+        pending = []
+        skipped = 0
+        storage = models.Document._meta.get_field("document").storage
+        documents = models.Document.objects.order_by("pk").values_list("pk", "document")
+        for pk, name in documents.iterator():
+            if not name.lower().endswith(".pdf"):
+                continue
+            path = storage.path(name)
+            if not os.path.exists(path):
+                self.stderr.write(f"Missing file for document {pk}: {path}")
+                continue
+            if not force and thumbnails.thumbnail_is_current(path):
+                skipped += 1
+                continue
+            pending.append((pk, path))
+        return pending, skipped
+
+    def handle(self, *args, **options):
+        pending, skipped = self.find_pending(options["force"])
+        total = len(pending)
+        self.stdout.write(f"{skipped} thumbnail(s) up to date, {total} to generate.")
+
+        done = []
+        failures = []
+        # The rendering happens in gm subprocesses, so a thread per worker is
+        # enough to keep that many processes busy.
+        with ThreadPoolExecutor(max_workers=options["workers"]) as executor:
+            futures = {
+                executor.submit(
+                    thumbnails.generate_thumbnail,
+                    path,
+                    thumbnails.thumbnail_path(path),
+                    timeout=options["timeout"],
+                ): (pk, path)
+                for pk, path in pending
+            }
+            for i, future in enumerate(as_completed(futures), start=1):
+                pk, path = futures[future]
+                try:
+                    future.result()
+                except subprocess.TimeoutExpired:
+                    failures.append((path, "timeout"))
+                except subprocess.CalledProcessError as e:
+                    output = (e.output or b"").decode("utf8", "replace").strip()
+                    failures.append((path, output or str(e)))
+                except OSError as e:
+                    # E.g. gm is missing or the thumbnail can't be written
+                    failures.append((path, str(e)))
+                else:
+                    done.append(pk)
+                if options["verbosity"] > 1 or i % 100 == 0 or i == total:
+                    self.stdout.write(f"[{i}/{total}] {path}")
+
+        # Queued jobs for these documents are obsolete now
+        models.ThumbnailJob.objects.filter(document_id__in=done).delete()
+
+        self.stdout.write(
+            f"Generated {len(done)} thumbnail(s), {len(failures)} failed."
+        )
+        for path, error in failures:
+            self.stderr.write(f"{path}: {error}")
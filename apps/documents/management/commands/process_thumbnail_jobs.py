@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.documents import thumbnails
+
+
+class Command(BaseCommand):
+    help = "Worker that generates the queued document thumbnails."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Exit as soon as the queue is empty",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=5,
+            help="Seconds to wait before polling an empty queue again (default: 5)",
+        )
+        parser.add_argument(
+            "--timeout",
+            type=float,
+            default=60,
+            help="Seconds after which a thumbnail generation is aborted (default: 60)",
+        )
+
+    def handle(self, *args, **options):
+        processed = 0
+        while True:
+            if thumbnails.process_next_job(timeout=options["timeout"]):
+                processed += 1
+                continue
+            if options["once"]:
+                break
+            time.sleep(options["interval"])
+        self.stdout.write(f"Processed {processed} thumbnail job(s).")
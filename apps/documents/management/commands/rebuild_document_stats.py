@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from apps.documents import models
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the denormalized document statistics (downloads and ratings) "
+        "from the download log (daily rollup and raw downloads) and the ratings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "documents",
+            nargs="*",
+            type=int,
+            metavar="DOCUMENT_ID",
+            help="Only rebuild the statistics of these documents",
+        )
+
+    def handle(self, *args, **options):
+        document_ids = options["documents"] or None
+        count = models.DocumentStats.objects.rebuild(document_ids=document_ids)
+        self.stdout.write(f"Rebuilt statistics of {count} document(s).")
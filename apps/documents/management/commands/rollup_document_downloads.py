@@ -0,0 +1,42 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.documents import models
+
+
+class Command(BaseCommand):
+    help = (
+        "Roll up the downloads of all completed days into daily counts and "
+        "delete the raw downloads older than the retention period."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--retention-days",
+            type=int,
+            default=settings.DOCUMENT_DOWNLOAD_RETENTION_DAYS,
+            help="Keep the raw downloads of this many days (default: "
+            "DOCUMENT_DOWNLOAD_RETENTION_DAYS)",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running and roll up again every INTERVAL seconds",
+        )
+
+    def run_once(self, retention_days):
+        written = models.DocumentDownloadDay.objects.rollup()
+        deleted = models.DocumentDownloadDay.objects.prune(retention_days)
+        until = models.DocumentDownloadDay.objects.rolled_up_until()
+        self.stdout.write(
+            f"Rolled up downloads until {until}: {written} daily count(s) "
+            f"written, {deleted} raw download(s) deleted."
+        )
+
+    def handle(self, *args, **options):
+        self.run_once(options["retention_days"])
+        while options["interval"] is not None:
+            time.sleep(options["interval"])
+            self.run_once(options["retention_days"])
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.documents import models
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalculate the full-text search index of all documents, e.g. after "
+        "loading fixtures."
+    )
+
+    def handle(self, *args, **options):
+        count = models.Document.objects.update_search_vector()
+        self.stdout.write(f"Updated the search index of {count} document(s).")
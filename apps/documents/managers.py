@@ -0,0 +1,341 @@
+from datetime import date, timedelta
+from itertools import islice
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import models, transaction
+from django.db.models import (
+    Count,
+    F,
+    FloatField,
+    IntegerField,
+    Max,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce
+
+from apps.front.managers import UserOverlayQuerySet
+
+SEARCH_CONFIG = "german"
+
+# Weight of matches in the extracted file contents relative to the metadata
+CONTENT_RANK_WEIGHT = 0.5
+
+
+def _batched(iterable, size):
+    """Yield lists of up to ``size`` items of ``iterable``."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def _count_subquery(queryset, field="pk", aggregate=Count):
+    """Return a scalar subquery aggregating ``queryset`` per document."""
+    return Coalesce(
+        Subquery(
+            queryset.order_by()
+            .values("document")
+            .annotate(value=aggregate(field))
+            .values("value"),
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def _download_count(document):
+    """Return an expression counting the downloads of ``document`` (an outer
+    reference): the daily rollup plus the raw downloads which haven't been
+    rolled up yet.
+
+    The last rolled up day is a subquery of the same statement, so a rollup
+    committed concurrently is either counted completely in the daily rows or
+    not at all.
+    """
+    from apps.documents.models import DocumentDownload, DocumentDownloadDay
+
+    rolled_up_until = Subquery(
+        DocumentDownloadDay.objects.order_by("-day").values("day")[:1]
+    )
+    days = DocumentDownloadDay.objects.filter(document=document)
+    tail = DocumentDownload.objects.filter(document=document).filter(
+        day__gt=Coalesce(rolled_up_until, Value(date.min))
+    )
+    return _count_subquery(days, "count", Sum) + _count_subquery(tail)
+
+
+def search_vector(category_model):
+    """Return the expression that computes the full-text search vector of a
+    document, including the name and description of its category."""
+    category = category_model.objects.filter(pk=OuterRef("category"))
+    return (
+        SearchVector("name", weight="A", config=SEARCH_CONFIG)
+        + SearchVector("original_filename", weight="B", config=SEARCH_CONFIG)
+        + SearchVector(
+            Subquery(category.values("name")),
+            Subquery(category.values("description")),
+            weight="B",
+            config=SEARCH_CONFIG,
+        )
+        + SearchVector("description", weight="C", config=SEARCH_CONFIG)
+    )
+
+
+class DocumentCategoryQuerySet(models.QuerySet):
+    def with_counts(self):
+        """Annotate the number of documents, in total and per type group.
+
+        The annotations are picked up by ``DocumentCategory.summary_count``,
+        ``exam_count`` and ``other_count``.
+        """
+        from apps.documents.models import Document
+
+        summary = Q(Document__dtype=Document.DTypes.SUMMARY)
+        exam = Q(Document__dtype=Document.DTypes.EXAM)
+        return self.annotate(
+            document_count=Count("Document"),
+            summary_document_count=Count("Document", filter=summary),
+            exam_document_count=Count("Document", filter=exam),
+            other_document_count=Count("Document", filter=~summary & ~exam),
+        )
+
+
+class DocumentQuerySet(models.QuerySet):
+    def update_search_vector(self):
+        """Recalculate the stored full-text search vector of the documents."""
+        from apps.documents.models import DocumentCategory
+
+        return self.update(search_vector=search_vector(DocumentCategory))
+
+    def search(self, query):
+        """Return the documents matching a (web search style) query, ordered by
+        relevance. Both the metadata of the documents and the text extracted
+        from their files are searched, using the GIN indexes on the
+        ``search_vector`` columns. Matches in the metadata rank higher.
+
+        The matching documents are selected with a union of the matches of
+        both indexes, an OR of the two conditions can't use them.
+        """
+        from apps.documents.models import DocumentContentChunk
+
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        chunks = DocumentContentChunk.objects.filter(search_vector=search_query)
+        matches = (
+            self.model.objects.filter(search_vector=search_query)
+            .order_by()
+            .values("pk")
+            .union(chunks.order_by().values("content_id"))
+        )
+        chunk_rank = (
+            chunks.filter(content=OuterRef("pk"))
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank")
+            .values("rank")[:1]
+        )
+        return (
+            self.filter(pk__in=matches)
+            .annotate(
+                rank=Coalesce(SearchRank(F("search_vector"), search_query), 0.0)
+                + Coalesce(Subquery(chunk_rank, output_field=FloatField()), 0.0)
+                * CONTENT_RANK_WEIGHT
+            )
+            .order_by("-rank", "-change_date", "-pk")
+        )
+
+    def with_outdated_content(self):
+        """Return the documents whose text has never been extracted or whose
+        file changed since the last extraction."""
+        return self.filter(
+            Q(content__isnull=True)
+            | Q(content__source_change_date__lt=F("change_date"))
+        )
+
+    def with_stats(self):
+        """Join in the denormalized ``DocumentStats`` row of each document.
+
+        The annotated values are picked up by ``Document.downloadcount()``,
+        ``Document.rating()`` and ``Document.rating_count()``, so rendering a
+        list of documents doesn't issue any per-row queries.
+        """
+        return self.annotate(
+            stats_download_count=Coalesce("stats__download_count", 0),
+            stats_rating_sum=Coalesce("stats__rating_sum", 0),
+            stats_rating_count=Coalesce("stats__rating_count", 0),
+        )
+
+
+class DocumentRatingQuerySet(UserOverlayQuerySet):
+    overlay_relation = "document"
+    overlay_field = "rating"
+
+
+class DocumentStatsManager(models.Manager):
+    """Keeps the denormalized per-document statistics up to date."""
+
+    def record_download(self, document_id):
+        """Increment the download counter of a document. Returns whether a
+        statistics row was updated."""
+        return bool(
+            self.filter(document_id=document_id).update(
+                download_count=F("download_count") + 1
+            )
+        )
+
+    def refresh_downloads(self, document_ids):
+        """Recount the downloads of several documents, e.g. after downloads
+        were inserted in bulk."""
+        return self.filter(document_id__in=document_ids).update(
+            download_count=_download_count(OuterRef("document"))
+        )
+
+    def refresh_ratings(self, document_id):
+        """Recalculate the rating sum and count of a document. Returns
+        whether a statistics row was updated."""
+        from apps.documents.models import DocumentRating
+
+        ratings = DocumentRating.objects.filter(document=OuterRef("document"))
+        return bool(
+            self.filter(document_id=document_id).update(
+                rating_sum=_count_subquery(ratings, "rating", Sum),
+                rating_count=_count_subquery(ratings),
+            )
+        )
+
+    def rebuild(self, document_ids=None, batch_size=1000):
+        """Recalculate the statistics from the downloads (see
+        ``_download_count``) and ``DocumentRating``. If ``document_ids`` is
+        None, all documents are processed. Returns the number of statistics
+        rows written."""
+        from apps.documents.models import Document, DocumentRating
+
+        documents = Document.objects.order_by("pk")
+        if document_ids is not None:
+            documents = documents.filter(pk__in=document_ids)
+        ratings = DocumentRating.objects.filter(document=OuterRef("pk"))
+        rows = documents.annotate(
+            download_count=_download_count(OuterRef("pk")),
+            rating_sum=_count_subquery(ratings, "rating", Sum),
+            rating_count=_count_subquery(ratings),
+        ).values_list("pk", "download_count", "rating_sum", "rating_count")
+
+        stats = [
+            self.model(
+                document_id=pk,
+                download_count=download_count,
+                rating_sum=rating_sum,
+                rating_count=rating_count,
+            )
+            for pk, download_count, rating_sum, rating_count in rows
+        ]
+        with transaction.atomic():
+            self.bulk_create(
+                stats,
+                batch_size=batch_size,
+                update_conflicts=True,
+                unique_fields=["document"],
+                update_fields=["download_count", "rating_sum", "rating_count"],
+            )
+        return len(stats)
+
+
+class DocumentDownloadDayManager(models.Manager):
+    """Rolls up the raw ``DocumentDownload`` rows into daily counts."""
+
+    def rolled_up_until(self):
+        """Return the last day whose downloads have been rolled up, or None.
+
+        Days are always rolled up completely and for all documents, so every
+        raw download up to this day is included in the rollup.
+        """
+        return self.aggregate(day=Max("day"))["day"]
+
+    def rollup(self, until=None, batch_size=1000):
+        """Roll up the downloads of all days before ``until`` (default:
+        today). The last rolled up day is recounted, in case downloads were
+        written late. Returns the number of daily rows written."""
+        from apps.documents.models import DocumentDownload
+
+        until = until or date.today()
+        downloads = DocumentDownload.objects.filter(day__lt=until)
+        rolled_up_until = self.rolled_up_until()
+        if rolled_up_until is not None:
+            downloads = downloads.filter(day__gte=rolled_up_until)
+        rows = (
+            downloads.order_by()
+            .values_list("document", "day")
+            .annotate(count=Count("pk"))
+        )
+
+        written = 0
+        with transaction.atomic():
+            for batch in _batched(rows.iterator(), batch_size):
+                self.bulk_create(
+                    [
+                        self.model(document_id=document_id, day=day, count=count)
+                        for document_id, day, count in batch
+                    ],
+                    update_conflicts=True,
+                    unique_fields=["document", "day"],
+                    update_fields=["count"],
+                )
+                written += len(batch)
+        return written
+
+    def prune(self, retention_days):
+        """Delete the raw downloads older than ``retention_days`` days which
+        have been rolled up. The downloads of the last rolled up day are kept,
+        as it is recounted by the next ``rollup()``. Returns the number of
+        deleted rows."""
+        from apps.documents.models import DocumentDownload
+
+        rolled_up_until = self.rolled_up_until()
+        if rolled_up_until is None:
+            return 0
+        cutoff = min(date.today() - timedelta(days=retention_days), rolled_up_until)
+        deleted, _ = DocumentDownload.objects.filter(day__lt=cutoff).delete()
+        return deleted
+
+
+class ThumbnailJobManager(models.Manager):
+    def enqueue(self, document, retry=False):
+        """Queue the thumbnail generation for a document. Concurrent requests
+        for the same document result in a single job. If ``retry`` is set
+        (e.g. because a new file was uploaded), the failed attempts of an
+        existing job are reset, and a job that is being processed is
+        processed again."""
+        job = self.model(document=document)
+        if retry:
+            self.bulk_create(
+                [job],
+                update_conflicts=True,
+                unique_fields=["document"],
+                update_fields=["attempts", "last_error", "claimed"],
+            )
+        else:
+            self.bulk_create([job], ignore_conflicts=True)
+
+
+class DocumentContentManager(models.Manager):
+    def store(self, document_id, change_date, chunks=(), error=""):
+        """Replace the extracted text of a document with ``chunks`` and index
+        them for full-text search. ``change_date`` is the change date of the
+        document the text was extracted from."""
+        from apps.documents.models import DocumentContentChunk
+
+        with transaction.atomic():
+            content, _ = self.update_or_create(
+                document_id=document_id,
+                defaults={"source_change_date": change_date, "error": error},
+            )
+            content.chunks.all().delete()
+            DocumentContentChunk.objects.bulk_create(
+                DocumentContentChunk(content=content, number=number, text=text)
+                for number, text in enumerate(chunks)
+            )
+            content.chunks.update(
+                search_vector=SearchVector("text", config=SEARCH_CONFIG)
+            )
+        return content
@@ -0,0 +1,50 @@
+# Generated by Django 5.0 on 2026-10-18 22:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        (
+            "documents",
+            "0007_rename_documentdownload_document_timestamp_documents_d_documen_d84a7d_idx",
+        ),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentStats",
+            fields=[
+                (
+                    "document",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="stats",
+                        serialize=False,
+                        to="documents.document",
+                    ),
+                ),
+                ("download_count", models.PositiveIntegerField(default=0)),
+                ("rating_sum", models.PositiveIntegerField(default=0)),
+                ("rating_count", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunSQL(
+            """
+            INSERT INTO documents_documentstats
+                (document_id, download_count, rating_sum, rating_count)
+            SELECT d.id,
+                (SELECT COUNT(*) FROM documents_documentdownload dl
+                 WHERE dl.document_id = d.id),
+                (SELECT COALESCE(SUM(r.rating), 0) FROM documents_documentrating r
+                 WHERE r.document_id = d.id),
+                (SELECT COUNT(*) FROM documents_documentrating r
+                 WHERE r.document_id = d.id)
+            FROM documents_document d
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0 on 2026-10-18 22:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0008_documentstats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ThumbnailJob",
+            fields=[
+                (
+                    "document",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="thumbnail_job",
+                        serialize=False,
+                        to="documents.document",
+                    ),
+                ),
+                ("queued", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+                ("last_error", models.TextField(blank=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.0 on 2026-10-18 22:34
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.conf import settings
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations
+from django.db.models import OuterRef, Subquery
+
+
+def update_search_vectors(apps, schema_editor):
+    # A copy of apps.documents.managers.search_vector() at the time of this
+    # migration
+    Document = apps.get_model("documents", "Document")
+    DocumentCategory = apps.get_model("documents", "DocumentCategory")
+    category = DocumentCategory.objects.filter(pk=OuterRef("category"))
+    Document.objects.update(
+        search_vector=SearchVector("name", weight="A", config="german")
+        + SearchVector("original_filename", weight="B", config="german")
+        + SearchVector(
+            Subquery(category.values("name")),
+            Subquery(category.values("description")),
+            weight="B",
+            config="german",
+        )
+        + SearchVector("description", weight="C", config="german")
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0009_thumbnailjob"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="document",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="documents_search_idx"
+            ),
+        ),
+        migrations.RunPython(update_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.0 on 2026-10-18 22:38
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0010_document_search_vector"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentContent",
+            fields=[
+                (
+                    "document",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="content",
+                        serialize=False,
+                        to="documents.document",
+                    ),
+                ),
+                ("source_change_date", models.DateTimeField()),
+                ("extracted", models.DateTimeField(auto_now=True)),
+                ("error", models.TextField(blank=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="DocumentContentChunk",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("number", models.PositiveIntegerField()),
+                ("text", models.TextField()),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        editable=False, null=True
+                    ),
+                ),
+                (
+                    "content",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="chunks",
+                        to="documents.documentcontent",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ("content", "number"),
+                "indexes": [
+                    django.contrib.postgres.indexes.GinIndex(
+                        fields=["search_vector"], name="documents_content_search_idx"
+                    )
+                ],
+                "unique_together": {("content", "number")},
+            },
+        ),
+    ]
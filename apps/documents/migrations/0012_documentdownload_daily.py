@@ -0,0 +1,38 @@
+# Generated by Django 5.0 on 2026-10-18 22:40
+
+import datetime
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0011_documentcontent"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="documentdownload",
+            name="day",
+            field=models.DateField(default=datetime.date.today, editable=False),
+        ),
+        migrations.RunSQL(
+            "UPDATE documents_documentdownload SET day = timestamp::date",
+            migrations.RunSQL.noop,
+        ),
+        migrations.AddField(
+            model_name="documentdownload",
+            name="visitor",
+            field=models.CharField(
+                blank=True, editable=False, max_length=64, null=True
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="documentdownload",
+            constraint=models.UniqueConstraint(
+                fields=("document", "visitor", "day"),
+                name="documents_download_daily_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.0 on 2026-10-18 22:43
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0012_documentdownload_daily"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DocumentDownloadDay",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField()),
+                ("count", models.PositiveIntegerField()),
+                (
+                    "document",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="DocumentDownloadDay",
+                        to="documents.document",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("document", "day")},
+            },
+        ),
+    ]
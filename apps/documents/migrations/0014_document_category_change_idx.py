@@ -0,0 +1,22 @@
+# Generated by Django 5.0 on 2026-10-18 23:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0013_documentdownloadday"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="document",
+            index=models.Index(
+                fields=["category", "-change_date", "id"],
+                name="documents_category_change_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.0 on 2026-10-18 23:08
+
+from django.db import migrations, models
+
+
+def store_file_sizes(apps, schema_editor):
+    Document = apps.get_model("documents", "Document")
+    documents = []
+    for document in Document.objects.exclude(document="").only("id", "document"):
+        try:
+            document.file_size = document.document.size
+        except OSError:
+            # Missing files keep an unknown size
+            continue
+        documents.append(document)
+    Document.objects.bulk_update(documents, ["file_size"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0014_document_category_change_idx"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="document",
+            name="file_size",
+            field=models.PositiveBigIntegerField(
+                editable=False, null=True, verbose_name="Dateigrösse"
+            ),
+        ),
+        migrations.RunPython(store_file_sizes, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 00:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("documents", "0015_document_file_size"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="thumbnailjob",
+            name="claimed",
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -1,15 +1,17 @@
 import os
-from datetime import datetime
+from datetime import date, datetime
 
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.db.models.functions import Coalesce, Round
 from django.template.defaultfilters import slugify
 from django.utils.safestring import mark_safe
 from model_utils import Choices
 
+from apps.documents import managers
 from apps.front import fields
 from apps.lecturers import models as lecturer_models
 
@@ -30,19 +32,36 @@ class DocumentCategory(models.Model):
     courses = models.ManyToManyField(lecturer_models.Course, blank=True)
     lecturers = models.ManyToManyField(lecturer_models.Lecturer, blank=True)
 
+    objects = managers.DocumentCategoryQuerySet.as_manager()
+
+    # The counts are annotated by ``with_counts()``, otherwise they are queried
+
     @property
     def summary_count(self):
+        if hasattr(self, "summary_document_count"):
+            return self.summary_document_count
         return self.Document.filter(dtype=Document.DTypes.SUMMARY).count()
 
     @property
     def exam_count(self):
+        if hasattr(self, "exam_document_count"):
+            return self.exam_document_count
         return self.Document.filter(dtype=Document.DTypes.EXAM).count()
 
     @property
     def other_count(self):
+        if hasattr(self, "other_document_count"):
+            return self.other_document_count
         excludes = [Document.DTypes.EXAM, Document.DTypes.SUMMARY]
         return self.Document.exclude(dtype__in=excludes).count()
 
+    def save(self, *args, **kwargs):
+        """Override save method to keep the search index of the documents in
+        this category up to date."""
+        result = super().save(*args, **kwargs)
+        self.Document.all().update_search_vector()
+        return result
+
     def __str__(self):
         return self.name
 
@@ -113,6 +132,7 @@ class Document(models.Model):
     original_filename = models.CharField(
         "Originaler Dateiname", max_length=255, blank=True
     )
+    file_size = models.PositiveBigIntegerField("Dateigrösse", null=True, editable=False)
     uploader = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         related_name="Document",
@@ -138,13 +158,33 @@ class Document(models.Model):
         help_text="Soll man dieses Dokument ohne Login downloaden können?",
     )
 
+    # Full-text search index, maintained in save()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = managers.DocumentQuerySet.as_manager()
+
+    def get_stats(self):
+        """Return the statistics of this document. If the document was
+        fetched using ``with_stats()``, no additional query is needed."""
+        if hasattr(self, "stats_download_count"):
+            return DocumentStats(
+                document_id=self.pk,
+                download_count=self.stats_download_count,
+                rating_sum=self.stats_rating_sum,
+                rating_count=self.stats_rating_count,
+            )
+        try:
+            return DocumentStats.objects.get(document_id=self.pk)
+        except DocumentStats.DoesNotExist:
+            return DocumentStats(document_id=self.pk)
+
     def rating(self):
         """Return rounded rating average."""
-        return int(
-            self.DocumentRating.all()
-            .aggregate(avg=Coalesce(Round(models.Avg("rating")), models.Value(0.0)))
-            .get("avg", 0)
-        )
+        return self.get_stats().rating_avg()
+
+    def rating_count(self):
+        """Return the number of ratings."""
+        return self.get_stats().rating_count
 
     def filename(self):
         """Return filename of uploaded file without directories."""
@@ -161,7 +201,13 @@ class Document(models.Model):
     def thumbnail(self):
         """Check wether current document can have a thumbnail by checking
         wether the file extension is a PDF."""
-        return self.fileext() == ".pdf"
+        return self.fileext().lower() == ".pdf"
+
+    def thumbnail_version(self):
+        """Return a version identifier for the thumbnail URL. It changes
+        whenever a new file is uploaded, so the thumbnail can be cached
+        forever by clients."""
+        return int(self.change_date.timestamp())
 
     def github(self):
         """Check whether the url is associated with github by simply checking if "github"
@@ -171,7 +217,7 @@ class Document(models.Model):
 
     def downloadcount(self):
         """Return the download count."""
-        return self.DocumentDownload.count()
+        return self.get_stats().download_count
 
     def license_details(self):
         """Return the URL to the license and the appropriate license icon."""
@@ -189,10 +235,17 @@ class Document(models.Model):
         return {"url": url, "icon": icon, "name": self.get_license_display()}
 
     def save(self, *args, **kwargs):
-        """Override save method to automatically set change_date at creation."""
+        """Override save method to automatically set change_date at creation,
+        to store the file size and to update the full-text search index."""
         if not self.change_date:
             self.change_date = datetime.now()
-        return super().save(*args, **kwargs)
+        # Only look at the file if it is new, the size of stored files is
+        # filled in by the migration.
+        if self.document and not self.document._committed:
+            self.file_size = self.document.size
+        result = super().save(*args, **kwargs)
+        Document.objects.filter(pk=self.pk).update_search_vector()
+        return result
 
     def __str__(self):
         return self.name
@@ -200,10 +253,24 @@ class Document(models.Model):
     class Meta:
         ordering = ("-change_date",)
         get_latest_by = "change_date"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="documents_search_idx"),
+            # Keyset pagination of the documents of a category
+            models.Index(
+                fields=["category", "-change_date", "id"],
+                name="documents_category_change_idx",
+            ),
+        ]
 
 
 class DocumentDownload(models.Model):
-    """Tracks a download of a document."""
+    """Tracks a download of a document.
+
+    Downloads are counted once per visitor and day. ``visitor`` identifies a
+    user or an anonymous session (see ``downloads.py``), rows without one
+    aren't deduplicated.
+
+    """
 
     document = models.ForeignKey(
         Document,
@@ -212,11 +279,42 @@ class DocumentDownload(models.Model):
         on_delete=models.CASCADE,
     )
     timestamp = models.DateTimeField(auto_now_add=True, editable=False)
+    day = models.DateField(default=date.today, editable=False)
+    visitor = models.CharField(max_length=64, null=True, blank=True, editable=False)
 
     class Meta:
         indexes = [
             models.Index(fields=["document", "timestamp"]),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["document", "visitor", "day"],
+                name="documents_download_daily_unique",
+            ),
+        ]
+
+
+class DocumentDownloadDay(models.Model):
+    """The number of downloads of a document on a day.
+
+    Populated from ``DocumentDownload`` by the ``rollup_document_downloads``
+    management command, which also prunes old raw downloads.
+
+    """
+
+    document = models.ForeignKey(
+        Document, related_name="DocumentDownloadDay", on_delete=models.CASCADE
+    )
+    day = models.DateField()
+    count = models.PositiveIntegerField()
+
+    objects = managers.DocumentDownloadDayManager()
+
+    class Meta:
+        unique_together = ("document", "day")
+
+    def __str__(self):
+        return f"{self.count} downloads of document {self.document_id} on {self.day}"
 
 
 class DocumentRating(models.Model):
@@ -238,6 +336,8 @@ class DocumentRating(models.Model):
     )
     rating = models.PositiveSmallIntegerField(validators=RATING_VALIDATORS)
 
+    objects = managers.DocumentRatingQuerySet.as_manager()
+
     # Custom model validation
     def clean(self):
         if self.user == self.document.uploader:
@@ -249,3 +349,98 @@ class DocumentRating(models.Model):
 
     class Meta:
         unique_together = ("user", "document")
+
+
+class DocumentStats(models.Model):
+    """Denormalized statistics of a document.
+
+    Kept up to date on every download and rating (see ``signals.py``), so
+    document lists don't have to aggregate downloads and ratings per row. Use
+    the ``rebuild_document_stats`` management command to repair drift.
+
+    """
+
+    document = models.OneToOneField(
+        Document, primary_key=True, related_name="stats", on_delete=models.CASCADE
+    )
+    download_count = models.PositiveIntegerField(default=0)
+    rating_sum = models.PositiveIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+
+    objects = managers.DocumentStatsManager()
+
+    def rating_avg(self):
+        """Return the rating average, rounded half up like PostgreSQL does."""
+        if not self.rating_count:
+            return 0
+        return (2 * self.rating_sum + self.rating_count) // (2 * self.rating_count)
+
+    def __str__(self):
+        return f"Stats for document {self.document_id}"
+
+
+class ThumbnailJob(models.Model):
+    """A pending thumbnail generation, processed by the
+    ``process_thumbnail_jobs`` management command."""
+
+    document = models.OneToOneField(
+        Document,
+        primary_key=True,
+        related_name="thumbnail_job",
+        on_delete=models.CASCADE,
+    )
+    queued = models.DateTimeField(auto_now_add=True, db_index=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    # Set while a worker generates the thumbnail
+    claimed = models.DateTimeField(null=True, blank=True)
+
+    objects = managers.ThumbnailJobManager()
+
+    def __str__(self):
+        return f"Thumbnail job for document {self.document_id}"
+
+
+class DocumentContent(models.Model):
+    """The text extracted from the file of a document.
+
+    ``source_change_date`` is the ``change_date`` of the document at the time
+    of the extraction, so documents with a new file can be found by the
+    ``extract_document_text`` management command.
+
+    """
+
+    document = models.OneToOneField(
+        Document, primary_key=True, related_name="content", on_delete=models.CASCADE
+    )
+    source_change_date = models.DateTimeField()
+    extracted = models.DateTimeField(auto_now=True)
+    error = models.TextField(blank=True)
+
+    objects = managers.DocumentContentManager()
+
+    def __str__(self):
+        return f"Content of document {self.document_id}"
+
+
+class DocumentContentChunk(models.Model):
+    """A part of the extracted text of a document, indexed for full-text
+    search. Long texts are split into chunks to keep the size of the single
+    search vectors within the limits of PostgreSQL."""
+
+    content = models.ForeignKey(
+        DocumentContent, related_name="chunks", on_delete=models.CASCADE
+    )
+    number = models.PositiveIntegerField()
+    text = models.TextField()
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        ordering = ("content", "number")
+        unique_together = ("content", "number")
+        indexes = [
+            GinIndex(fields=["search_vector"], name="documents_content_search_idx")
+        ]
+
+    def __str__(self):
+        return f"Chunk {self.number} of document {self.content_id}"
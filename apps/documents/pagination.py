@@ -0,0 +1,48 @@
+"""Keyset pagination of documents.
+
+Documents are listed newest first, ordered by ``(change_date, id)``. A page
+starts after the key of the last document of the previous page, which is
+passed around as an opaque cursor. Together with the
+``documents_category_change_idx`` index, the database only reads the rows of
+the requested page, no matter how many documents a category has.
+
+"""
+
+from datetime import datetime
+
+from django.utils.encoding import force_str
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+PAGE_SIZE = 50
+ORDERING = ("-change_date", "id")
+
+
+def encode_cursor(document):
+    """Return the cursor of the page following ``document``."""
+    key = f"{document.change_date.isoformat()}|{document.pk}"
+    return urlsafe_base64_encode(key.encode())
+
+
+def decode_cursor(cursor):
+    """Return the ``(change_date, id)`` key of a cursor. Raises
+    ``ValueError`` if the cursor is invalid."""
+    change_date, _, pk = force_str(urlsafe_base64_decode(cursor)).partition("|")
+    return datetime.fromisoformat(change_date), int(pk)
+
+
+def paginate(queryset, cursor=None, size=PAGE_SIZE):
+    """Return a list of up to ``size`` documents of ``queryset`` following
+    ``cursor`` and the cursor of the next page, which is None on the last
+    page. Raises ``ValueError`` if the cursor is invalid."""
+    if cursor:
+        change_date, pk = decode_cursor(cursor)
+        # The range condition on change_date alone can be answered from the
+        # index, the exclusion only removes the rows before the cursor with
+        # the same change_date.
+        queryset = queryset.filter(change_date__lte=change_date).exclude(
+            change_date=change_date, pk__lte=pk
+        )
+    documents = list(queryset.order_by(*ORDERING)[: size + 1])
+    if len(documents) > size:
+        return documents[:size], encode_cursor(documents[size - 1])
+    return documents, None
@@ -0,0 +1,49 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from apps.documents import models
+from apps.documents.cache import invalidate_category_list
+from apps.lecturers import models as lecturer_models
+from apps.lecturers.signals import photos_updated
+
+
+@receiver(post_save, sender=models.Document)
+def create_document_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        models.DocumentStats.objects.get_or_create(document=instance)
+
+
+@receiver(post_save, sender=models.DocumentDownload)
+def count_document_download(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        if not models.DocumentStats.objects.record_download(instance.document_id):
+            models.DocumentStats.objects.rebuild(document_ids=[instance.document_id])
+
+
+@receiver(post_save, sender=models.DocumentRating)
+def update_document_rating_stats(sender, instance, raw=False, **kwargs):
+    if not raw:
+        if not models.DocumentStats.objects.refresh_ratings(instance.document_id):
+            models.DocumentStats.objects.rebuild(document_ids=[instance.document_id])
+
+
+@receiver(post_delete, sender=models.DocumentRating)
+def remove_document_rating_stats(sender, instance, **kwargs):
+    # Don't recreate missing rows here, the document itself might be in the
+    # process of being deleted.
+    models.DocumentStats.objects.refresh_ratings(instance.document_id)
+
+
+@receiver(post_save, sender=models.Document)
+@receiver(post_save, sender=models.DocumentCategory)
+@receiver(post_save, sender=lecturer_models.Lecturer)
+@receiver(post_save, sender=lecturer_models.Course)
+@receiver(post_delete, sender=models.Document)
+@receiver(post_delete, sender=models.DocumentCategory)
+@receiver(post_delete, sender=lecturer_models.Lecturer)
+@receiver(post_delete, sender=lecturer_models.Course)
+@receiver(m2m_changed, sender=models.DocumentCategory.lecturers.through)
+@receiver(m2m_changed, sender=models.DocumentCategory.courses.through)
+@receiver(photos_updated, sender=lecturer_models.Lecturer)
+def invalidate_category_list_on_change(sender, **kwargs):
+    invalidate_category_list()
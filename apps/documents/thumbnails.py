@@ -0,0 +1,131 @@
+"""Generation of PDF thumbnails.
+
+Thumbnails are rendered off the request path: views and forms only enqueue a
+``ThumbnailJob``, which is processed by the ``process_thumbnail_jobs``
+management command.
+
+"""
+
+import logging
+import os
+import subprocess
+from datetime import datetime, timedelta
+from functools import lru_cache
+
+from django.contrib.staticfiles import finders
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.db.models import Q
+
+from apps.documents import models
+
+logger = logging.getLogger(__name__)
+
+# Give up on a document after this many attempts
+MAX_ATTEMPTS = 3
+
+# Jobs claimed longer ago than this are assumed to belong to a crashed worker
+# and are claimed again
+CLAIM_TIMEOUT = timedelta(minutes=10)
+
+# Static file served until the thumbnail of a document is generated
+PLACEHOLDER = "img/120x160.gif"
+
+
+@lru_cache(maxsize=None)
+def placeholder():
+    """Return the content of the placeholder image."""
+    path = finders.find(PLACEHOLDER)
+    if path is None:
+        raise ImproperlyConfigured(f"Thumbnail placeholder {PLACEHOLDER} not found")
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def thumbnail_path(document_path):
+    """Return the path of the thumbnail belonging to a document file."""
+    return f"{document_path}.png"
+
+
+def thumbnail_is_current(document_path):
+    """Return whether the thumbnail of a document file exists and is not older
+    than the file itself."""
+    try:
+        return os.path.getmtime(thumbnail_path(document_path)) >= os.path.getmtime(
+            document_path
+        )
+    except OSError:
+        return False
+
+
+def generate_thumbnail(document_path, thumbnail_path, timeout=None):
+    """Generate a thumbnail of the first page of a PDF by using graphicsmagick.
+    :param document_path Path of the PDF to create thumbnail from
+    :param thumbnail_path Path where to save the thumbnail
+    :param timeout Seconds after which the conversion is aborted
+    :raises subprocess.CalledProcessError, subprocess.TimeoutExpired
+    """
+    params = ["-thumbnail", "400", document_path + "[0]", "-trim", thumbnail_path]
+    subprocess.check_output(
+        ["gm", "convert"] + params, stderr=subprocess.STDOUT, timeout=timeout
+    )
+
+
+def claim_next_job():
+    """Claim the oldest pending thumbnail job and return it, or None.
+
+    The job is locked with ``SKIP LOCKED`` only while it is claimed, so
+    several workers can run in parallel without holding a transaction during
+    the conversion. Claiming counts as an attempt, so that documents that
+    crash the worker are given up as well.
+    """
+    now = datetime.now()
+    with transaction.atomic():
+        job = (
+            models.ThumbnailJob.objects.select_for_update(skip_locked=True)
+            .filter(attempts__lt=MAX_ATTEMPTS)
+            .filter(Q(claimed__isnull=True) | Q(claimed__lt=now - CLAIM_TIMEOUT))
+            .select_related("document")
+            .order_by("queued")
+            .first()
+        )
+        if job is not None:
+            job.claimed = now
+            job.attempts += 1
+            job.save(update_fields=["claimed", "attempts"])
+    return job
+
+
+def process_next_job(timeout=None):
+    """Claim the oldest pending thumbnail job and process it. Returns False if
+    there was no job to process."""
+    job = claim_next_job()
+    if job is None:
+        return False
+    # Jobs that were queued again while they were processed (e.g. because a
+    # new file was uploaded) are not claimed anymore and are kept
+    claimed = models.ThumbnailJob.objects.filter(pk=job.pk, claimed=job.claimed)
+
+    doc = job.document
+    if (
+        not doc.thumbnail()
+        or not os.path.exists(doc.document.path)
+        or thumbnail_is_current(doc.document.path)
+    ):
+        claimed.delete()
+        return True
+
+    try:
+        generate_thumbnail(
+            doc.document.path, thumbnail_path(doc.document.path), timeout=timeout
+        )
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        output = getattr(e, "output", None) or b""
+        logger.error(f"Thumbnail for {doc.document.path} could not be created: {e}")
+        claimed.update(
+            claimed=None,
+            last_error=f"{e}\n{output.decode('utf8', 'replace')}".strip(),
+        )
+    else:
+        claimed.delete()
+    return True
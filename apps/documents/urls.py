@@ -13,6 +13,7 @@ urlpatterns = [
     re_path(
         r"^add/$", views.DocumentcategoryAdd.as_view(), name="documentcategory_add"
     ),
+    re_path(r"^suche/$", views.DocumentSearch.as_view(), name="document_search"),
     re_path(
         r"^(?P<category>[^\/]+)/$", views.DocumentList.as_view(), name="document_list"
     ),
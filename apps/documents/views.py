@@ -1,15 +1,17 @@
-import datetime
 import logging
 import os
-import subprocess
 import unicodedata
 from collections import defaultdict
+from urllib.parse import urlencode
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.syndication.views import Feed
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
+from django.db import transaction
 from django.db.models import Count
 from django.http import (
+    Http404,
     HttpResponse,
     HttpResponseBadRequest,
     HttpResponseForbidden,
@@ -18,7 +20,10 @@ from django.http import (
 from django.shortcuts import get_object_or_404, redirect, render
 from django.template.defaultfilters import slugify
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
 from django.utils.decorators import method_decorator
+from django.utils.functional import cached_property
+from django.utils.http import http_date, quote_etag
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView, View
 from django.views.generic.edit import (
@@ -33,24 +38,26 @@ from django_downloadview.shortcuts import sendfile
 from apps.front.message_levels import EVENT
 from apps.front.mixins import LoginRequiredMixin
 
-from . import forms, models
+from . import cache, downloads, forms, models, pagination, thumbnails
 
 logger = logging.getLogger(__name__)
 
 
 class DocumentcategoryList(TemplateView):
+    """Overview of all categories. The grid is rendered from a fragment cache,
+    ``categories`` and ``counts`` are only queried when the template misses
+    it (see ``apps.documents.cache``)."""
+
     template_name = "documents/documentcategory_list.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        context["cache_version"] = cache.category_list_version()
+        context["cache_timeout"] = settings.DOCUMENT_CATEGORY_LIST_CACHE_TIMEOUT
+        return context
 
-        # Get all categories
-        categories = list(
-            models.DocumentCategory.objects.all()
-            .prefetch_related("lecturers")
-            .prefetch_related("courses")
-        )
-
+    @cached_property
+    def dtype_counts(self):
         # To reduce number of queries, prefetch aggregated count values from the
         # document model. The query returns the count for each (category, dtype) pair.
         category_counts = (
@@ -65,31 +72,40 @@ class DocumentcategoryList(TemplateView):
             category = item["category"]
             dtype = item["dtype"]
             counts[category][dtype] = item["count"]
+        return counts
+
+    @cached_property
+    def categories(self):
+        # Get all categories
+        categories = list(
+            models.DocumentCategory.objects.all()
+            .prefetch_related("lecturers")
+            .prefetch_related("courses")
+        )
 
         # Add counts to category objects
-        simplecounts = defaultdict(dict)
         empty_categories = []
         nonempty_categories = []
         for c in categories:
-            d = simplecounts[c.pk]
-            d["summary"] = counts[c.pk][models.Document.DTypes.SUMMARY]
-            d["exam"] = counts[c.pk][models.Document.DTypes.EXAM]
-            d["other"] = (
-                counts[c.pk][models.Document.DTypes.SOFTWARE]
-                + counts[c.pk][models.Document.DTypes.LEARNING_AID]
-                + counts[c.pk][models.Document.DTypes.ATTESTATION]
-            )
-            d["total"] = sum(d.values())
+            counts = self.dtype_counts[c.pk]
+            c.counts = {
+                "summary": counts[models.Document.DTypes.SUMMARY],
+                "exam": counts[models.Document.DTypes.EXAM],
+                "other": (
+                    counts[models.Document.DTypes.SOFTWARE]
+                    + counts[models.Document.DTypes.LEARNING_AID]
+                    + counts[models.Document.DTypes.ATTESTATION]
+                ),
+            }
+            c.counts["total"] = sum(c.counts.values())
 
             # Sort by category activity
-            if d["total"] == 0:
+            if c.counts["total"] == 0:
                 empty_categories.append(c)
             else:
                 nonempty_categories.append(c)
 
-        context["categories"] = nonempty_categories + empty_categories
-        context["counts"] = simplecounts
-        return context
+        return nonempty_categories + empty_categories
 
 
 class DocumentcategoryAdd(LoginRequiredMixin, CreateView):
@@ -122,19 +138,65 @@ class DocumentcategoryMixin:
 
 
 class DocumentList(DocumentcategoryMixin, ListView):
+    """Documents of a category, newest first. The list is paginated by keyset
+    (see ``pagination.py``) and can be filtered by type and license."""
+
     template_name = "documents/document_list.html"
     context_object_name = "documents"
 
     def get_queryset(self):
-        return models.Document.objects.filter(category=self.category)
+        self.filter_form = forms.DocumentFilterForm(self.request.GET)
+        return self.filter_form.filter(
+            models.Document.objects.filter(category=self.category)
+            .select_related("category", "uploader")
+            .with_stats()
+        )
+
+    def get_context_data(self, **kwargs):
+        cursor = self.request.GET.get("cursor")
+        try:
+            documents, next_cursor = pagination.paginate(self.object_list, cursor)
+        except ValueError:
+            raise Http404("Ungültige Seite.")
+        context = super().get_context_data(object_list=documents, **kwargs)
+        context["filter_form"] = self.filter_form
+        query = self.request.GET.copy()
+        query.pop("cursor", None)
+        if cursor:
+            context["first_page_url"] = "?" + query.urlencode()
+        if next_cursor:
+            query["cursor"] = next_cursor
+            context["next_page_url"] = "?" + query.urlencode()
+        context["ratings"] = models.DocumentRating.objects.overlay(
+            documents, self.request.user, "self_rating"
+        )
+        return context
+
+
+class DocumentSearch(ListView):
+    """Full-text search over all documents."""
+
+    template_name = "documents/document_search.html"
+    context_object_name = "documents"
+    paginate_by = 25
+
+    def get_queryset(self):
+        self.query = self.request.GET.get("q", "").strip()
+        if not self.query:
+            return models.Document.objects.none()
+        return (
+            models.Document.objects.search(self.query)
+            .select_related("category", "uploader")
+            .with_stats()
+        )
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        if self.request.user.is_authenticated:
-            ratings = models.DocumentRating.objects.filter(user=self.request.user)
-            context["ratings"] = {r.document.pk: r.rating for r in ratings}
-            for document in context["documents"]:
-                document.self_rating = context["ratings"].get(document.pk, None)
+        context["query"] = self.query
+        context["query_params"] = urlencode({"q": self.query})
+        context["ratings"] = models.DocumentRating.objects.overlay(
+            context["documents"], self.request.user, "self_rating"
+        )
         return context
 
 
@@ -176,6 +238,29 @@ class DocumentFeed(Feed):
         ]
 
 
+def file_validators(path, version):
+    """Return the ETag and the Last-Modified timestamp of a file. The version
+    (e.g. the document's change date) is part of the ETag."""
+    stat = os.stat(path)
+    etag = quote_etag(f"{version}-{int(stat.st_mtime)}-{stat.st_size}")
+    return etag, int(stat.st_mtime)
+
+
+def conditional_response(request, response, etag, last_modified):
+    """Return a 304 response if the client's copy is still valid. Otherwise,
+    if ``response`` is given, add the validators to it. Returns None if the
+    client's copy is outdated and no response was given."""
+    not_modified = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if not_modified is not None:
+        response = not_modified
+    if response is not None:
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+    return response
+
+
 class DocumentDownload(View):
     def get(self, request, *args, **kwargs):
         # Get document or raise HTTP404
@@ -193,11 +278,17 @@ class DocumentDownload(View):
                         ),
                     )
                 )
-        # Log download
-        timerange = datetime.datetime.now() - datetime.timedelta(1)
-        filters = {"document": doc, "timestamp__gt": timerange}
-        if not models.DocumentDownload.objects.filter(**filters).exists():
-            models.DocumentDownload.objects.create(document=doc)
+        # Answer conditional requests before logging the download
+        validators = None
+        if os.path.exists(doc.document.path):
+            change_date = int(doc.change_date.timestamp())
+            etag, mtime = file_validators(doc.document.path, change_date)
+            validators = etag, max(mtime, change_date)
+            not_modified = conditional_response(request, None, *validators)
+            if not_modified is not None:
+                return not_modified
+        # Log download (once per visitor and day)
+        downloads.record_download(request, doc)
         # Serve file
         filename = unicodedata.normalize("NFKD", doc.original_filename).encode(
             "ascii", "ignore"
@@ -208,21 +299,16 @@ class DocumentDownload(View):
         # filenames, but we've made sure the filename only contains ASCII
         # above.
         response["Content-Disposition"] = b'%s; filename="%s"' % (attachment, filename)
+        if validators is not None:
+            conditional_response(request, response, *validators)
 
         return response
 
 
 class DocumentThumbnail(View):
-    def generate_thumbnail(self, document_path, thumbnail_path):
-        """Generate a thumbnail of the first page of a PDF by using imagemagick.
-        :param document_path Path of the PDF to create thumbnail from
-        :param thumbnail_path Path where to save the thumbnail
-        :returns Tuple with whether operation was successful and message from stdout
-        """
-        params = ["-thumbnail", "400", document_path + "[0]", "-trim", thumbnail_path]
-        proc = subprocess.check_output(
-            ["gm", "convert"] + params, stderr=subprocess.STDOUT
-        )
+    # Lifetime of thumbnails requested through a versioned URL, see
+    # Document.thumbnail_version()
+    versioned_max_age = 60 * 60 * 24 * 365
 
     def get(self, request, *args, **kwargs):
         doc = get_object_or_404(models.Document, pk=self.kwargs.get("pk"))
@@ -231,21 +317,29 @@ class DocumentThumbnail(View):
         if not doc.document.path.lower().endswith(".pdf"):
             return HttpResponseBadRequest("File has to be a PDF to create a thumbnail")
 
-        thumbnail_path = f"{doc.document.path}.png"
+        thumbnail_path = thumbnails.thumbnail_path(doc.document.path)
         if not os.path.exists(thumbnail_path):
-            try:
-                self.generate_thumbnail(doc.document.path, thumbnail_path)
-            except subprocess.CalledProcessError as e:
-                logger.error(
-                    "Thumbnail for {} could not be created: {}".format(
-                        doc.document.path, e
-                    )
-                )
-
-        filename = unicodedata.normalize("NFKD", thumbnail_path)
-        return sendfile(
-            request, thumbnail_path, attachment=False, attachment_filename=filename
-        )
+            # The thumbnail is generated in the background, serve a
+            # placeholder until it's ready.
+            models.ThumbnailJob.objects.enqueue(doc)
+            response = HttpResponse(thumbnails.placeholder(), content_type="image/gif")
+            patch_cache_control(response, max_age=30)
+            return response
+
+        version = doc.thumbnail_version()
+        validators = file_validators(thumbnail_path, version)
+        response = conditional_response(request, None, *validators)
+        if response is None:
+            filename = unicodedata.normalize("NFKD", thumbnail_path)
+            response = sendfile(
+                request, thumbnail_path, attachment=False, attachment_filename=filename
+            )
+            conditional_response(request, response, *validators)
+        if request.GET.get("v") == str(version):
+            patch_cache_control(
+                response, public=True, max_age=self.versioned_max_age, immutable=True
+            )
+        return response
 
 
 class DocumentAddEditMixin:
@@ -280,6 +374,8 @@ class DocumentAdd(
         self.object.uploader = self.request.user
         self.object.category = self.category
         self.object.save()
+        if self.object.thumbnail():
+            models.ThumbnailJob.objects.enqueue(self.object, retry=True)
         return super().form_valid(form)
 
 
@@ -343,7 +439,8 @@ class DocumentRate(LoginRequiredMixin, SingleObjectMixin, View):
             rating.full_clean()  # validation
         except ValidationError:
             return HttpResponseServerError("Validierungsfehler")
-        rating.save()
+        with transaction.atomic():
+            rating.save()
         return HttpResponse("Bewertung wurde aktualisiert.")
 
 
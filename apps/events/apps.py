@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class EventsConfig(AppConfig):
+    name = "apps.events"
+
+    def ready(self):
+        from apps.events import signals  # noqa: F401
@@ -0,0 +1,59 @@
+"""Versioned cache of the iCalendar feed.
+
+The serialized feed is cached under a version, which is the time of the last
+change of an event in nanoseconds. It is cached while it is streamed to the
+first client that requests it. Saving or deleting an event sets a new
+version (see ``signals.py``), so the feed is only regenerated after a change.
+The version also provides the ETag and Last-Modified headers of the feed, so
+that polling calendar clients get a 304 response until an event changes.
+The feed is cached per process, the version is in the shared cache, so a new
+version invalidates the feeds of all processes.
+
+Only the complete feed, which calendar clients subscribe to, is cached. Feeds
+limited to a date window are cheap to read from the occurrence table, and
+caching every requested window would crowd out the other cache entries.
+
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import cache, caches
+
+CALENDAR_VERSION_KEY = "events:calendar_version"
+
+
+def calendar_version():
+    """Return the current version of the feed."""
+    shared = caches["shared"]
+    version = shared.get(CALENDAR_VERSION_KEY)
+    if version is None:
+        shared.add(CALENDAR_VERSION_KEY, time.time_ns(), None)
+        version = shared.get(CALENDAR_VERSION_KEY)
+    return version
+
+
+def invalidate_calendar():
+    """Set a new version of the feed."""
+    caches["shared"].set(CALENDAR_VERSION_KEY, time.time_ns(), None)
+
+
+def calendar_key(version):
+    return f"events:calendar:{version}"
+
+
+def get_calendar(version):
+    """Return the cached feed of a version, or None."""
+    return cache.get(calendar_key(version))
+
+
+def caching_stream(chunks, version):
+    """Pass through the chunks of a feed and cache it once it is complete.
+    Nothing is cached if the stream is aborted."""
+    parts = []
+    for chunk in chunks:
+        parts.append(chunk)
+        yield chunk
+    cache.set(
+        calendar_key(version), "".join(parts), settings.EVENT_CALENDAR_CACHE_TIMEOUT
+    )
@@ -18,4 +18,8 @@ class EventForm(forms.ModelForm):
             raise forms.ValidationError(
                 'Für wiederholende Events müssen "Tage" (>0) und "Wiederholungsende" angegeben werden.'
             )
+        if cleaned_data.get("repeats") and cleaned_data.get("rrule"):
+            raise forms.ValidationError(
+                'Entweder "Tage" und "Wiederholungsende" oder eine "Wiederholungsregel" angeben, nicht beides.'
+            )
         return cleaned_data
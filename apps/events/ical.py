@@ -0,0 +1,140 @@
+"""Streaming iCalendar (RFC 5545) writer.
+
+``iter_calendar()`` yields the feed in chunks of a few events, so that it
+can be sent with a ``StreamingHttpResponse`` while the events are read from
+the database. Only the few properties of the feed are supported, values are
+escaped and long lines folded as required by the RFC.
+
+"""
+
+import datetime
+
+CALENDAR_NAME = "Studentenportal Events"
+CALENDAR_TIMEZONE = "Europe/Zurich"
+PRODID = "-//Studentenportal//Events//DE"
+UID_DOMAIN = "studentenportal.ch"
+
+# Events per chunk
+CHUNK_SIZE = 100
+
+# Maximum length of a line in octets, without the line break
+LINE_LENGTH = 75
+
+
+def escape(text):
+    """Escape a text value."""
+    return (
+        text.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def fold(line):
+    """Split a content line into lines of at most 75 octets, continued by a
+    space. Multi-byte characters are never split."""
+    parts = []
+    start = 0
+    length = 0
+    for i, char in enumerate(line):
+        size = len(char.encode())
+        if length + size > LINE_LENGTH:
+            parts.append(line[start:i])
+            start = i
+            # The continuation lines start with a space
+            length = 1
+        length += size
+    parts.append(line[start:])
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_value(value):
+    """Return the parameters and the value of a date or (floating) date and
+    time."""
+    if isinstance(value, datetime.datetime):
+        return "", value.strftime("%Y%m%dT%H%M%S")
+    return ";VALUE=DATE", value.strftime("%Y%m%d")
+
+
+def date_property(name, value):
+    params, value = format_value(value)
+    return fold(f"{name}{params}:{value}")
+
+
+def text_property(name, value):
+    return fold(f"{name}:{escape(value)}")
+
+
+def event_times(event):
+    """Return the DTSTART and DTEND values of an event. The end is None if
+    the event has neither an end date nor an end time. Events with an end
+    date but no end time end at midnight."""
+    if event.start_time:
+        start = datetime.datetime.combine(event.start_date, event.start_time)
+    else:
+        start = event.start_date
+    end = None
+    if event.end_date or event.end_time:
+        end = datetime.datetime.combine(
+            event.end_date or event.start_date,
+            event.end_time or datetime.time(23, 59, 59),
+        )
+    return start, end
+
+
+def exdate_property(dates, start):
+    """Return the EXDATE property of excluded dates of an event starting at
+    ``start``. The dates get the start time of the event, if it has one."""
+    if isinstance(start, datetime.datetime):
+        dates = [datetime.datetime.combine(date, start.time()) for date in dates]
+    values = [format_value(date) for date in dates]
+    return fold("EXDATE{}:{}".format(values[0][0], ",".join(v for _, v in values)))
+
+
+def serialize_event(event, dtstamp):
+    """Return the VEVENT block of an event. Repeated events are written
+    once, with their recurrence rule and excluded dates."""
+    start, end = event_times(event)
+    lines = [
+        "BEGIN:VEVENT\r\n",
+        fold(f"UID:{event.pk}@{UID_DOMAIN}"),
+        fold(f"DTSTAMP:{dtstamp}"),
+        date_property("DTSTART", start),
+    ]
+    if end is not None:
+        lines.append(date_property("DTEND", end))
+    rule = event.recurrence_rule()
+    if rule is not None:
+        lines.append(fold(f"RRULE:{rule}"))
+        if event.exdates:
+            lines.append(exdate_property(event.exdates, start))
+    lines.append(text_property("SUMMARY", event.summary))
+    lines.append(text_property("DESCRIPTION", event.description))
+    if event.author:
+        lines.append(text_property("COMMENT", "Erfasst von %s" % event.author.name()))
+    lines.append("END:VEVENT\r\n")
+    return "".join(lines)
+
+
+def iter_calendar(events, chunk_size=CHUNK_SIZE):
+    """Yield the calendar of ``events`` in chunks of ``chunk_size`` events."""
+    dtstamp = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    yield "".join(
+        [
+            "BEGIN:VCALENDAR\r\n",
+            "VERSION:2.0\r\n",
+            fold(f"PRODID:{PRODID}"),
+            text_property("X-WR-CALNAME", CALENDAR_NAME),
+            text_property("X-WR-TIMEZONE", CALENDAR_TIMEZONE),
+        ]
+    )
+    chunk = []
+    for event in events:
+        chunk.append(serialize_event(event, dtstamp))
+        if len(chunk) >= chunk_size:
+            yield "".join(chunk)
+            chunk = []
+    chunk.append("END:VCALENDAR\r\n")
+    yield "".join(chunk)
@@ -0,0 +1,94 @@
+from itertools import islice
+
+from django.db import models, transaction
+from django.db.models import Exists, F, OuterRef, Q
+from django.db.models.query import ModelIterable
+
+
+def _batched(iterable, size):
+    """Yield lists of up to ``size`` items of ``iterable``."""
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class OccurrenceIterable(ModelIterable):
+    """Yields the events with the dates of the joined occurrence, see
+    ``EventQuerySet.occurrences()``."""
+
+    def __iter__(self):
+        for event in super().__iter__():
+            event.start_date = event.occurrence_start_date
+            if event.end_date is not None:
+                event.end_date = event.occurrence_end_date
+            yield event
+
+
+class EventQuerySet(models.QuerySet):
+    def overlapping(self, start=None, end=None):
+        """Return the events with an occurrence that overlaps the days from
+        ``start`` to ``end`` (both optional and inclusive)."""
+        from apps.events.models import EventOccurrence
+
+        if start is None and end is None:
+            return self.all()
+        occurrences = EventOccurrence.objects.filter(event=OuterRef("pk"))
+        if start is not None:
+            occurrences = occurrences.filter(end_date__gte=start)
+        if end is not None:
+            occurrences = occurrences.filter(start_date__lte=end)
+        return self.filter(Exists(occurrences))
+
+    def occurrences(self, start=None, end=None):
+        """Return the occurrences of the events that overlap the days from
+        ``start`` to ``end`` (both optional and inclusive), ordered by date.
+
+        A repeated event is returned once per occurrence, with the
+        ``start_date`` and ``end_date`` of that occurrence. The range is
+        queried on the indexed ``EventOccurrence`` table.
+        """
+        overlap = Q(occurrences__isnull=False)
+        if start is not None:
+            overlap &= Q(occurrences__end_date__gte=start)
+        if end is not None:
+            overlap &= Q(occurrences__start_date__lte=end)
+        queryset = (
+            self.filter(overlap)
+            .annotate(
+                occurrence_start_date=F("occurrences__start_date"),
+                occurrence_end_date=F("occurrences__end_date"),
+            )
+            .order_by("occurrence_start_date", "start_time", "pk")
+        )
+        queryset._iterable_class = OccurrenceIterable
+        return queryset
+
+
+class EventOccurrenceManager(models.Manager):
+    def refresh(self, event_ids=None, batch_size=1000):
+        """Recalculate the occurrences of the given events, or of all events
+        if ``event_ids`` is None (see ``Event.occurrence_dates()``). The end
+        date of an occurrence is moved along with its start date."""
+        from apps.events.models import Event
+
+        events = Event.objects.order_by("pk")
+        occurrences = self.all()
+        if event_ids is not None:
+            events = events.filter(pk__in=event_ids)
+            occurrences = occurrences.filter(event_id__in=event_ids)
+
+        with transaction.atomic(using=self.db):
+            occurrences.delete()
+            for batch in _batched(events.iterator(), batch_size):
+                self.bulk_create(
+                    [
+                        self.model(
+                            event=event,
+                            start_date=start_date,
+                            end_date=start_date + event.duration(),
+                        )
+                        for event in batch
+                        for start_date in event.occurrence_dates()
+                    ],
+                    batch_size=batch_size,
+                )
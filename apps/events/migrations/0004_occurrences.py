@@ -0,0 +1,63 @@
+# Generated by Django 5.0 on 2026-10-18 23:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The occurrences of the existing events, one every repeat_days days
+INSERT_OCCURRENCES = """
+INSERT INTO events_eventoccurrence (event_id, start_date, end_date)
+SELECT e.id, day::date, day::date + COALESCE(e.end_date - e.start_date, 0)
+FROM events_event e
+CROSS JOIN LATERAL generate_series(
+    e.start_date,
+    CASE WHEN e.repeats AND e.repeat_days > 0 AND e.repeat_ends IS NOT NULL
+         THEN GREATEST(e.repeat_ends, e.start_date)
+         ELSE e.start_date
+    END,
+    make_interval(days => GREATEST(COALESCE(e.repeat_days, 1), 1))
+) AS day
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0003_event_repeat_days_event_repeat_ends_event_repeats"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="EventOccurrence",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField()),
+                (
+                    "event",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="occurrences",
+                        to="events.event",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["start_date"], name="events_occurrence_start_idx"
+                    ),
+                    models.Index(fields=["end_date"], name="events_occurrence_end_idx"),
+                ],
+                "unique_together": {("event", "start_date")},
+            },
+        ),
+        migrations.RunSQL(INSERT_OCCURRENCES, migrations.RunSQL.noop),
+    ]
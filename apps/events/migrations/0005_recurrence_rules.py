@@ -0,0 +1,40 @@
+# Generated by Django 5.0 on 2026-10-18 23:53
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+import apps.events.recurrence
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("events", "0004_occurrences"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="event",
+            name="exdates",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.DateField(),
+                blank=True,
+                default=list,
+                help_text="Daten, an denen das Event nicht stattfindet, durch Kommas getrennt. Format: dd.mm.YYYY",
+                size=None,
+                verbose_name="Ausnahmen",
+            ),
+        ),
+        migrations.AddField(
+            model_name="event",
+            name="rrule",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text='Statt Tagen und Wiederholungsende, Regel nach RFC 5545, zB "FREQ=WEEKLY;BYDAY=TU;UNTIL=20241220" für jeden Dienstag bis zum 20.12.2024',
+                max_length=255,
+                validators=[apps.events.recurrence.validate_rule],
+                verbose_name="Wiederholungsregel",
+            ),
+        ),
+    ]
@@ -1,8 +1,11 @@
-from datetime import date
+from datetime import date, datetime, timedelta
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
 from django.db import models
 
+from apps.events import managers, recurrence
+
 
 def picture_file_name(instance, filename):
     """Where to put a newly uploaded picture."""
@@ -48,6 +51,24 @@ class Event(models.Model):
     repeat_ends = models.DateField(
         "Wiederholungsende", null=True, blank=True, help_text="Format: dd.mm.YYYY"
     )
+    rrule = models.CharField(
+        "Wiederholungsregel",
+        max_length=255,
+        blank=True,
+        default="",
+        validators=[recurrence.validate_rule],
+        help_text="Statt Tagen und Wiederholungsende, Regel nach RFC 5545, "
+        'zB "FREQ=WEEKLY;BYDAY=TU;UNTIL=20241220" für jeden Dienstag bis '
+        "zum 20.12.2024",
+    )
+    exdates = ArrayField(
+        models.DateField(),
+        verbose_name="Ausnahmen",
+        default=list,
+        blank=True,
+        help_text="Daten, an denen das Event nicht stattfindet, durch Kommas "
+        "getrennt. Format: dd.mm.YYYY",
+    )
 
     location = models.CharField(
         "Ort",
@@ -67,6 +88,8 @@ class Event(models.Model):
         help_text="Bild oder Flyer",
     )
 
+    objects = managers.EventQuerySet.as_manager()
+
     def is_over(self):
         """Return whether the start_date has already passed or not.
         On the start_date day itself, is_over() will return False."""
@@ -78,6 +101,50 @@ class Event(models.Model):
         This is the case if start_time and end_time are not set."""
         return self.start_time is None and self.end_time is None
 
+    def duration(self):
+        """Return the time from the start date to the end date."""
+        if self.end_date is None:
+            return timedelta()
+        return self.end_date - self.start_date
+
+    def recurrence_rule(self):
+        """Return the RRULE value of the event, or None if it doesn't repeat.
+        Events can also repeat every ``repeat_days`` days, which is turned
+        into an equivalent rule."""
+        if self.rrule:
+            rule = self.rrule
+        elif self.repeats and self.repeat_days and self.repeat_ends:
+            rule = "FREQ=DAILY;INTERVAL=%d;UNTIL=%s" % (
+                self.repeat_days,
+                self.repeat_ends.strftime("%Y%m%d"),
+            )
+        else:
+            return None
+        return recurrence.normalize_rule(rule, all_day=self.start_time is None)
+
+    def recurrence_start(self):
+        """Return the start (DTSTART) of the recurrence rule, a date for
+        all-day events."""
+        if self.start_time is not None:
+            return datetime.combine(self.start_date, self.start_time)
+        return self.start_date
+
+    def occurrence_dates(self):
+        """Return the start dates of all occurrences of the event."""
+        rule = self.recurrence_rule()
+        if rule is None:
+            return [self.start_date]
+        return recurrence.occurrence_dates(rule, self.recurrence_start(), self.exdates)
+
+    def clean(self):
+        rule = self.recurrence_rule()
+        if rule is None or self.start_date is None:
+            return
+        try:
+            recurrence.validate_occurrences(rule, self.recurrence_start(), self.exdates)
+        except (ValueError, TypeError):
+            pass  # Invalid rules are reported by the validator of the field
+
     def days_until(self):
         """Return how many days are left until the day of the event."""
         delta = self.start_date - date.today()
@@ -85,3 +152,32 @@ class Event(models.Model):
 
     def __str__(self):
         return f"{self.start_date} {self.summary}"
+
+
+class EventOccurrence(models.Model):
+    """A day on which an event starts, one per repetition.
+
+    Maintained by the ``post_save`` signal of ``Event`` (see ``signals.py``),
+    so that event lists can query a date range instead of expanding the
+    recurrence rules of all events. ``end_date`` is the last day of the
+    occurrence.
+
+    """
+
+    event = models.ForeignKey(
+        Event, related_name="occurrences", on_delete=models.CASCADE
+    )
+    start_date = models.DateField()
+    end_date = models.DateField()
+
+    objects = managers.EventOccurrenceManager()
+
+    class Meta:
+        unique_together = ("event", "start_date")
+        indexes = [
+            models.Index(fields=["start_date"], name="events_occurrence_start_idx"),
+            models.Index(fields=["end_date"], name="events_occurrence_end_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.start_date} {self.event_id}"
@@ -0,0 +1,103 @@
+"""Recurrence rules (RFC 5545 RRULE) of events.
+
+Events store the value of an RRULE property, e.g.
+``FREQ=WEEKLY;BYDAY=TU;UNTIL=20241220``, and a list of excluded dates
+(EXDATE). The rules are expanded with ``dateutil.rrule``. Rules need an end
+(UNTIL or COUNT) and may have at most ``MAX_OCCURRENCES`` occurrences, as
+many as are stored per event. Events repeat at most daily, an occurrence is
+a day.
+
+"""
+
+import datetime
+import re
+from itertools import islice
+
+from dateutil.rrule import rruleset, rrulestr
+from django.core.exceptions import ValidationError
+
+MAX_OCCURRENCES = 1000
+
+UNTIL_RE = re.compile(r"UNTIL=(\d{8})(T\d{6}Z?)?")
+
+# A single rule, without other properties (e.g. "EXDATE:...") or lines
+RULE_RE = re.compile(r"[A-Z0-9=;,+-]+")
+
+TOO_MANY_OCCURRENCES = (
+    f"Die Wiederholungsregel darf höchstens {MAX_OCCURRENCES} Termine ergeben."
+)
+
+# Rule parts that would start several occurrences on the same day
+SUB_DAILY_FREQUENCIES = {"HOURLY", "MINUTELY", "SECONDLY"}
+TIME_PARTS = {"BYHOUR", "BYMINUTE", "BYSECOND"}
+
+
+def normalize_rule(rule, all_day):
+    """Return the rule in upper case without an ``RRULE:`` prefix. UNTIL is
+    made a date for all-day events and the end of the day for events with
+    a start time, as RFC 5545 requires it to be of the type of DTSTART."""
+    rule = rule.strip().upper()
+    if rule.startswith("RRULE:"):
+        rule = rule[len("RRULE:") :]
+
+    def until(match):
+        date, time = match.groups()
+        if all_day:
+            return f"UNTIL={date}"
+        return f"UNTIL={date}{(time or 'T235959').rstrip('Z')}"
+
+    return UNTIL_RE.sub(until, rule)
+
+
+def parse_rule(rule, dtstart):
+    """Return the ``dateutil.rrule.rrule`` of a normalized rule."""
+    return rrulestr(rule, dtstart=dtstart, forceset=False)
+
+
+def validate_rule(rule):
+    """Validator of the recurrence rule field."""
+    rule = normalize_rule(rule, all_day=False)
+    if not RULE_RE.fullmatch(rule):
+        raise ValidationError("Ungültige Wiederholungsregel.")
+    try:
+        parse_rule(rule, datetime.datetime(2000, 1, 1))
+    except (ValueError, TypeError):
+        raise ValidationError("Ungültige Wiederholungsregel.")
+    parts = dict(part.partition("=")[::2] for part in rule.split(";"))
+    if parts.get("FREQ") in SUB_DAILY_FREQUENCIES or TIME_PARTS & parts.keys():
+        raise ValidationError("Events können höchstens täglich wiederholt werden.")
+    if "UNTIL" not in parts and "COUNT" not in parts:
+        raise ValidationError(
+            "Die Wiederholungsregel braucht ein Ende (UNTIL oder COUNT)."
+        )
+    if parts.get("COUNT", "").isdigit() and int(parts["COUNT"]) > MAX_OCCURRENCES:
+        raise ValidationError(TOO_MANY_OCCURRENCES)
+
+
+def validate_occurrences(rule, start, exdates=()):
+    """Raise a ValidationError if the rule has more occurrences from
+    ``start`` on than are stored. Only the number of rules with an UNTIL
+    depends on the start, so this is checked with the whole event."""
+    occurrences = islice(_occurrences(rule, start, exdates), MAX_OCCURRENCES + 1)
+    if len(list(occurrences)) > MAX_OCCURRENCES:
+        raise ValidationError(TOO_MANY_OCCURRENCES)
+
+
+def _occurrences(rule, start, exdates):
+    all_day = not isinstance(start, datetime.datetime)
+    dtstart = datetime.datetime.combine(start, datetime.time()) if all_day else start
+    occurrences = rruleset()
+    occurrences.rrule(parse_rule(normalize_rule(rule, all_day), dtstart))
+    for date in exdates:
+        occurrences.exdate(datetime.datetime.combine(date, dtstart.time()))
+    return occurrences
+
+
+def occurrence_dates(rule, start, exdates=()):
+    """Return the start dates of the occurrences of a rule. ``start`` is
+    the start date or date and time of the event (DTSTART). As in RFC 5545,
+    it counts as an occurrence if it matches the rule. Dates in ``exdates``
+    are skipped."""
+    occurrences = islice(_occurrences(rule, start, exdates), MAX_OCCURRENCES)
+    # Rules that weren't validated might repeat more often than daily
+    return list(dict.fromkeys(dt.date() for dt in occurrences))
@@ -0,0 +1,17 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.events import models
+from apps.events.cache import invalidate_calendar
+
+
+@receiver(post_save, sender=models.Event)
+def refresh_event_occurrences(sender, instance, **kwargs):
+    # Also for fixtures, the occurrences aren't part of them
+    models.EventOccurrence.objects.refresh(event_ids=[instance.pk])
+
+
+@receiver(post_save, sender=models.Event)
+@receiver(post_delete, sender=models.Event)
+def invalidate_calendar_on_change(sender, **kwargs):
+    invalidate_calendar()
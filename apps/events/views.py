@@ -1,17 +1,23 @@
-import copy
 import datetime
 from urllib.parse import urlsplit, urlunsplit
 
-import vobject
 from dateutil.relativedelta import relativedelta
 from django.contrib import messages
-from django.http import HttpResponse, HttpResponseForbidden, HttpResponseRedirect
+from django.http import (
+    HttpResponse,
+    HttpResponseBadRequest,
+    HttpResponseForbidden,
+    HttpResponseRedirect,
+    StreamingHttpResponse,
+)
 from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
 from django.views.generic import TemplateView, View
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import CreateView, DeleteView, UpdateView
 
-from apps.events import forms, models
+from apps.events import cache, forms, ical, models
 from apps.front.mixins import LoginRequiredMixin
 
 
@@ -71,101 +77,86 @@ class EventDelete(LoginRequiredMixin, DeleteView):
         return reverse("events:event_list")
 
 
-def repeat_dates(start_date, interval_days, end_date):
-    dates = []
-    d = start_date
-    while d <= end_date:
-        dates.append(d)
-        d = d + datetime.timedelta(days=interval_days)
-    return dates
-
-
-def add_recurring_events(events):
-    future = []
-    past = []
-    for e in events:
-        if e.start_date > datetime.date.today():
-            future.append(e)
-        else:
-            past.append(e)
-        if (
-            e.repeats
-            and e.repeat_days is not None
-            and e.repeat_days > 0
-            and e.repeat_ends is not None
-        ):
-            dates = repeat_dates(e.start_date, e.repeat_days, e.repeat_ends)
-            for date in dates[1:]:
-                new_e = copy.copy(e)
-                new_e.start_date = date
-                new_e.end_date = (
-                    date + (e.start_date - e.end_date)
-                    if e.end_date is not None
-                    else None
-                )
-                if date > datetime.date.today():
-                    future.append(new_e)
-                else:
-                    past.append(new_e)
-    return sorted(
-        future, key=lambda e: (e.start_date, e.start_time or datetime.time.min)
-    ), sorted(
-        past,
-        key=lambda e: (-e.start_date.toordinal(), e.start_time or datetime.time.min),
-    )
-
-
 class EventList(TemplateView):
     template_name = "events/event_list.html"
 
     def get_context_data(self, **kwargs):
-        model = models.Event
         context = super().get_context_data(**kwargs)
 
-        future, past = add_recurring_events(model.objects.all())
+        # TODO: let user input the timeframe
+        today = datetime.date.today()
+        occurrences = models.Event.objects.select_related("author").occurrences(
+            start=today - relativedelta(years=10)
+        )
+        future, past = [], []
+        for event in occurrences:
+            if event.start_date > today:
+                future.append(event)
+            elif event.start_date > today - relativedelta(years=10):
+                past.append(event)
+        past.sort(
+            key=lambda e: (-e.start_date.toordinal(), e.start_time or datetime.time.min)
+        )
 
         context["events_future"] = future
-        # TODO: let user input the timeframe
-        context["events_past"] = [
-            e
-            for e in past
-            if e.start_date > datetime.date.today() - relativedelta(years=10)
-        ]
+        context["events_past"] = past
         http_url = self.request.build_absolute_uri(reverse("events:event_calendar"))
-        context["current_year"] = datetime.date.today().year
+        context["current_year"] = today.year
         context["webcal_url"] = urlunsplit(urlsplit(http_url)._replace(scheme="webcal"))
         return context
 
 
+def calendar_window(request):
+    """Return the dates of the ``from`` and ``to`` parameters of a request,
+    None if they are missing. Raises ValueError for invalid dates."""
+    dates = []
+    for param in ("from", "to"):
+        value = request.GET.get(param)
+        dates.append(datetime.date.fromisoformat(value) if value else None)
+    return dates
+
+
 class EventCalendar(View):
+    """The iCalendar feed of all events, optionally limited to the events
+    between the ``from`` and ``to`` dates (YYYY-MM-DD). The feed is streamed
+    while it is generated. The complete feed is cached until an event changes
+    (see ``apps.events.cache``)."""
+
     http_method_names = ["get", "head", "options"]
 
     def get(self, request, *args, **kwargs):
-        cal = vobject.iCalendar()
-        cal.add("x-wr-calname").value = "Studentenportal Events"
-        cal.add("x-wr-timezone").value = "Europe/Zurich"
-
-        future, past = add_recurring_events(models.Event.objects.all())
-
-        for event in reversed(future + past):
-            vevent = cal.add("vevent")
-            vevent.add("summary").value = event.summary
-            vevent.add("description").value = event.description
-            if event.start_time:
-                dtstart = datetime.datetime.combine(event.start_date, event.start_time)
+        try:
+            start, end = calendar_window(request)
+        except ValueError:
+            return HttpResponseBadRequest("Ungültiges Datum, erwartet wird YYYY-MM-DD.")
+
+        version = cache.calendar_version()
+        etag = quote_etag(f"{version}-{start or ''}-{end or ''}")
+        last_modified = version // 10**9
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            windowed = start is not None or end is not None
+            content = None if windowed else cache.get_calendar(version)
+            if content is not None:
+                response = HttpResponse(content, content_type="text/calendar")
             else:
-                dtstart = event.start_date
-            vevent.add("dtstart").value = dtstart
-            if event.end_date or event.end_time:
-                if not event.end_date:
-                    dtend = datetime.datetime.combine(event.start_date, event.end_time)
-                elif event.end_time:
-                    dtend = datetime.datetime.combine(event.end_date, event.end_time)
-                else:
-                    dtend = datetime.datetime.combine(
-                        event.end_date, datetime.time(23, 59, 59)
-                    )
-                vevent.add("dtend").value = dtend
-            if event.author:
-                vevent.add("comment").value = "Erfasst von %s" % event.author.name()
-        return HttpResponse(cal.serialize(), content_type="text/calendar")
+                chunks = ical.iter_calendar(self.events(start, end))
+                if not windowed:
+                    chunks = cache.caching_stream(chunks, version)
+                response = StreamingHttpResponse(chunks, content_type="text/calendar")
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def events(self, start, end):
+        """Read the events overlapping the window in batches, so that memory
+        use stays flat. Repeated events are written once, with their
+        recurrence rule."""
+        return (
+            models.Event.objects.select_related("author")
+            .overlapping(start, end)
+            .order_by("start_date", "start_time", "pk")
+            .iterator()
+        )
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class FrontConfig(AppConfig):
+    name = "apps.front"
+
+    def ready(self):
+        from apps.front import signals  # noqa: F401
@@ -1,17 +1,59 @@
+import time
+
 from django.conf import settings
+from django.core.cache import cache, caches
+from django.utils.functional import lazy
 
 from apps.documents import models as document_models
 from apps.front import models
 from apps.lecturers import models as lecturer_models
 
+GLOBAL_STATS_CACHE_KEY = "front:global_stats"
+GLOBAL_STATS_VERSION_KEY = "front:global_stats_version"
+
+
+def global_stats_version():
+    """Return the current version of the counters. The counters are cached
+    per process, the version is in the shared cache, so that invalidating
+    it affects all processes."""
+    shared = caches["shared"]
+    version = shared.get(GLOBAL_STATS_VERSION_KEY)
+    if version is None:
+        shared.add(GLOBAL_STATS_VERSION_KEY, time.time_ns(), None)
+        version = shared.get(GLOBAL_STATS_VERSION_KEY)
+    return version
+
+
+def get_global_stats():
+    """Return the global counters, either from the cache or freshly counted."""
+    version = global_stats_version()
+    stats = cache.get(GLOBAL_STATS_CACHE_KEY, version=version)
+    if stats is None:
+        stats = {
+            "usercount": models.User.objects.count(),
+            "lecturercount": lecturer_models.Lecturer.real_objects.count(),
+            "documentcount": document_models.Document.objects.count(),
+            "quotecount": lecturer_models.Quote.objects.count(),
+        }
+        cache.set(
+            GLOBAL_STATS_CACHE_KEY,
+            stats,
+            settings.GLOBAL_STATS_CACHE_TIMEOUT,
+            version=version,
+        )
+    return stats
+
+
+def invalidate_global_stats():
+    caches["shared"].set(GLOBAL_STATS_VERSION_KEY, time.time_ns(), None)
+
 
 def global_stats(request):
-    """This context processor adds global stats to each context."""
+    """This context processor adds global stats to each context. The values
+    are only looked up once a template actually uses them."""
     return {
-        "usercount": models.User.objects.count(),
-        "lecturercount": lecturer_models.Lecturer.real_objects.count(),
-        "documentcount": document_models.Document.objects.count(),
-        "quotecount": lecturer_models.Quote.objects.count(),
+        name: lazy(lambda name=name: get_global_stats()[name], int)()
+        for name in ["usercount", "lecturercount", "documentcount", "quotecount"]
     }
 
 
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.front.models import StatsEntry
+
+
+class Command(BaseCommand):
+    help = "Recalculate the leaderboards of the stats page."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running and refresh again every INTERVAL seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            StatsEntry.objects.refresh()
+            if options["verbosity"] > 1:
+                self.stdout.write("Refreshed the stats.")
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
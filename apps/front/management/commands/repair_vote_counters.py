@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.lecturers.models import Quote
+from apps.tipps.models import Tipp
+
+
+class Command(BaseCommand):
+    help = "Recalculate the vote counters of all quotes and tipps from their votes."
+
+    def handle(self, *args, **options):
+        for model in [Quote, Tipp]:
+            count = model.objects.repair_vote_counters()
+            name = model._meta.verbose_name_plural
+            self.stdout.write(f"Recalculated the vote counters of {count} {name}.")
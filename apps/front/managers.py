@@ -0,0 +1,178 @@
+from django.db import connections, models, transaction
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    FilteredRelation,
+    OuterRef,
+    Q,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce
+
+
+class VoteQuerySet(models.QuerySet):
+    """Base queryset for models that can be up- and downvoted.
+
+    Subclasses set ``vote_relation`` to the related name of the vote model,
+    which needs a ``user`` foreign key and a boolean ``vote`` field. The
+    voted model is a ``VotableModel``, its ``upvotes`` and ``downvotes``
+    counters are maintained by ``vote()`` and can be recalculated with
+    ``repair_vote_counters()``.
+    """
+
+    vote_relation = None
+
+    def _vote_model(self):
+        """Return the vote model and the name of its foreign key to the voted
+        model."""
+        relation = self.model._meta.get_field(self.vote_relation)
+        return relation.related_model, relation.field.name
+
+    def with_votes(self, user=None):
+        """Annotate the vote counts and the vote of ``user``.
+
+        Adds ``vote_count``, ``upvote_count``, ``downvote_count``, ``voted_up``
+        and ``voted_down``. The counts are read from the counter columns, the
+        vote of the user is joined in (there is at most one per object).
+        """
+        queryset = self.annotate(
+            vote_count=F("upvotes") + F("downvotes"),
+            upvote_count=F("upvotes"),
+            downvote_count=F("downvotes"),
+        )
+        if user is None or not user.is_authenticated:
+            return queryset.annotate(voted_up=Value(False), voted_down=Value(False))
+        own_vote = FilteredRelation(
+            self.vote_relation, condition=Q(**{f"{self.vote_relation}__user": user})
+        )
+        return queryset.annotate(own_vote=own_vote).annotate(
+            voted_up=Case(When(own_vote__vote=True, then=True), default=False),
+            voted_down=Case(When(own_vote__vote=False, then=True), default=False),
+        )
+
+    def vote(self, obj, user, value):
+        """Set the vote of ``user`` on ``obj`` to up (``True``) or down
+        (``False``), or remove it (``None``).
+
+        The vote and the counters are changed in a single transaction. The
+        row of the object is locked first, so votes on it are serialized,
+        even a user's first ones (e.g. of a double click), which have no
+        vote row to lock. Returns the new ``(upvotes, downvotes)`` of the
+        object.
+        """
+        vote_model, target = self._vote_model()
+        with transaction.atomic(using=self.db):
+            counters = (
+                self.select_for_update()
+                .filter(pk=obj.pk)
+                .values_list("upvotes", "downvotes")
+                .get()
+            )
+            existing = vote_model.objects.filter(user=user, **{target: obj}).first()
+            old = existing.vote if existing is not None else None
+            if old == value:
+                return counters
+
+            if value is None:
+                existing.delete()
+            elif existing is None:
+                vote_model.objects.create(user=user, vote=value, **{target: obj})
+            else:
+                existing.vote = value
+                existing.save(update_fields=["vote"])
+            up = int(value is True) - int(old is True)
+            down = int(value is False) - int(old is False)
+            return self._update_counters(obj.pk, up, down)
+
+    def _update_counters(self, pk, up, down):
+        """Add ``up`` and ``down`` to the counters of an object and return
+        the new values. Uses ``UPDATE ... RETURNING``, which the ORM doesn't
+        provide, to avoid reading the counters in a separate query."""
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        sql = (
+            "UPDATE {table} SET upvotes = upvotes + %s, downvotes = downvotes + %s "
+            "WHERE {pk} = %s RETURNING upvotes, downvotes"
+        ).format(
+            table=quote_name(self.model._meta.db_table),
+            pk=quote_name(self.model._meta.pk.column),
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [up, down, pk])
+            return cursor.fetchone()
+
+    def repair_vote_counters(self):
+        """Recalculate the counters from the votes. Returns the number of
+        updated objects."""
+        vote_model, target = self._vote_model()
+        votes = (
+            vote_model.objects.filter(**{target: OuterRef("pk")})
+            .order_by()
+            .values(target)
+        )
+
+        def count(value):
+            return Coalesce(
+                Subquery(
+                    votes.filter(vote=value).annotate(count=Count("pk")).values("count")
+                ),
+                0,
+            )
+
+        return self.update(upvotes=count(True), downvotes=count(False))
+
+
+class UserOverlayQuerySet(models.QuerySet):
+    """Base queryset for values that users attach to other objects, like
+    their rating of a document.
+
+    Subclasses set ``overlay_relation`` to the name of the foreign key to the
+    objects and ``overlay_field`` to the name of the value field. The model
+    needs a ``user`` foreign key.
+    """
+
+    overlay_relation = None
+    overlay_field = None
+
+    def overlay(self, objects, user, attr):
+        """Set ``attr`` on each of ``objects`` to the value of ``user``, or
+        None if there is none.
+
+        Only the values of the given objects are fetched, in a single query.
+        Returns a dict mapping the object ids to the values.
+        """
+        objects = list(objects)
+        values = {}
+        if user.is_authenticated and objects:
+            relation = self.model._meta.get_field(self.overlay_relation)
+            values = dict(
+                self.filter(
+                    user=user,
+                    **{f"{relation.attname}__in": [obj.pk for obj in objects]},
+                ).values_list(relation.attname, self.overlay_field)
+            )
+        for obj in objects:
+            setattr(obj, attr, values.get(obj.pk))
+        return values
+
+
+class StatsEntryManager(models.Manager):
+    def refresh(self, concurrently=True):
+        """Recalculate the leaderboards. A concurrent refresh doesn't block
+        readers of the stats page."""
+        concurrently = "CONCURRENTLY " if concurrently else ""
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"REFRESH MATERIALIZED VIEW {concurrently}{self.model._meta.db_table}"
+            )
+
+    def leaderboards(self):
+        """Return a dict mapping the leaderboard keys to lists of
+        ``(object_id, value)`` tuples, ordered by rank."""
+        leaderboards = {}
+        for key, object_id, value in self.values_list("key", "object_id", "value"):
+            leaderboards.setdefault(key, []).append((object_id, value))
+        return leaderboards
@@ -0,0 +1,174 @@
+"""Per-request performance metrics.
+
+``RequestMetricsMiddleware`` records the number of SQL queries, the time
+spent in the database, the time spent rendering templates and the hits and
+misses of the default cache for every request. The metrics are logged to the
+``apps.front.metrics`` logger, keyed by the URL name of the view, and
+optionally sent to the browser in a ``Server-Timing`` header. Tests can read
+them from ``response.request_metrics``.
+
+The body of a streaming response is generated while it is sent, so its
+queries are counted, and the request is logged, once the stream is
+exhausted or closed. The ``Server-Timing`` header is sent before, it only
+covers the view.
+
+"""
+
+import contextvars
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from dataclasses import asdict, dataclass
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+
+logger = logging.getLogger("apps.front.metrics")
+
+_current = contextvars.ContextVar("request_metrics", default=None)
+_MISSING = object()
+
+
+@dataclass
+class RequestMetrics:
+    view_name: str = ""
+    queries: int = 0
+    db_time: float = 0.0
+    template_time: float = 0.0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    total_time: float = 0.0
+
+    def server_timing(self):
+        """Return the value of the ``Server-Timing`` header."""
+        return ", ".join(
+            [
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.1f}",
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+                f"total;dur={self.total_time * 1000:.1f}",
+            ]
+        )
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        if metrics is not None:
+            metrics.queries += 1
+            metrics.db_time += time.perf_counter() - start
+
+
+def _instrument_cache(cache):
+    """Count the hits and misses of ``cache.get()`` of the current request.
+    The cache objects are per thread, so this is done on first use."""
+    if getattr(cache, "_request_metrics", False):
+        return
+    get = cache.get
+
+    def instrumented_get(key, default=None, version=None):
+        value = get(key, _MISSING, version=version)
+        metrics = _current.get()
+        if metrics is not None:
+            if value is _MISSING:
+                metrics.cache_misses += 1
+            else:
+                metrics.cache_hits += 1
+        return default if value is _MISSING else value
+
+    cache.get = instrumented_get
+    cache._request_metrics = True
+
+
+@contextmanager
+def _measure(metrics):
+    """Record the queries and cache hits within the block in ``metrics``."""
+    token = _current.set(metrics)
+    _instrument_cache(caches["default"])
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(_record_query))
+            yield
+    finally:
+        _current.reset(token)
+
+
+class RequestMetricsMiddleware:
+    """Collect the metrics of each request, see the module docstring.
+
+    Should be the first middleware, so that it measures all others and is the
+    last one to see template responses before they are rendered.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        start = time.perf_counter()
+        with _measure(metrics):
+            response = self.get_response(request)
+        metrics.total_time = time.perf_counter() - start
+        if request.resolver_match is not None:
+            metrics.view_name = request.resolver_match.view_name
+
+        response.request_metrics = metrics
+        if settings.SERVER_TIMING_HEADER:
+            response["Server-Timing"] = metrics.server_timing()
+        # Files are sent with the file wrapper of the server if possible, and
+        # don't run queries
+        file_to_stream = getattr(response, "file_to_stream", None)
+        if response.streaming and not response.is_async and file_to_stream is None:
+            response.streaming_content = self._measure_stream(
+                request, response, response.streaming_content, metrics, start
+            )
+        else:
+            self._log(request, response, metrics)
+        return response
+
+    def _measure_stream(self, request, response, chunks, metrics, start):
+        """Measure the generation of the chunks of a streaming response and
+        log the request when it is exhausted or closed."""
+        chunks = iter(chunks)
+        try:
+            while True:
+                with _measure(metrics):
+                    chunk = next(chunks, _MISSING)
+                if chunk is _MISSING:
+                    break
+                yield chunk
+        finally:
+            metrics.total_time = time.perf_counter() - start
+            self._log(request, response, metrics)
+
+    def _log(self, request, response, metrics):
+        logger.info(
+            "%s %s %s view=%s queries=%d db_ms=%.1f template_ms=%.1f "
+            "cache_hits=%d cache_misses=%d total_ms=%.1f",
+            request.method,
+            request.path,
+            response.status_code,
+            metrics.view_name,
+            metrics.queries,
+            metrics.db_time * 1000,
+            metrics.template_time * 1000,
+            metrics.cache_hits,
+            metrics.cache_misses,
+            metrics.total_time * 1000,
+            extra={"request_metrics": asdict(metrics)},
+        )
+
+    def process_template_response(self, request, response):
+        metrics = _current.get()
+        start = time.perf_counter()
+
+        def rendered(response):
+            metrics.template_time += time.perf_counter() - start
+
+        response.add_post_render_callback(rendered)
+        return response
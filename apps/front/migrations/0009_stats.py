@@ -0,0 +1,103 @@
+# Generated by Django 5.0 on 2026-10-18 22:51
+
+from django.db import migrations, models
+
+# Leaderboards of the stats page. Lecturers need more than five ratings in a
+# category to be ranked. The import user is excluded from the upload and
+# quote leaderboards.
+CREATE_STATS_VIEW = """
+CREATE MATERIALIZED VIEW front_stats AS
+WITH lecturer_ratings AS (
+    SELECT lecturer_id, category, AVG(rating) AS average, COUNT(id) AS count
+    FROM lecturers_lecturerrating
+    GROUP BY lecturer_id, category
+    HAVING COUNT(id) > 5
+), entries AS (
+    SELECT 'lecturer_top_' || category AS key,
+           ROW_NUMBER() OVER (
+               PARTITION BY category ORDER BY average DESC, count DESC, lecturer_id
+           ) AS rank,
+           lecturer_id AS object_id, count AS value
+    FROM lecturer_ratings
+    UNION ALL
+    SELECT 'lecturer_flop_' || category,
+           ROW_NUMBER() OVER (
+               PARTITION BY category ORDER BY average ASC, count DESC, lecturer_id
+           ),
+           lecturer_id, count
+    FROM lecturer_ratings
+    UNION ALL
+    SELECT 'lecturer_quotes',
+           ROW_NUMBER() OVER (ORDER BY COUNT(id) DESC, lecturer_id),
+           lecturer_id, COUNT(id)
+    FROM lecturers_quote
+    GROUP BY lecturer_id
+    UNION ALL
+    SELECT 'user_topratings',
+           ROW_NUMBER() OVER (ORDER BY COUNT(DISTINCT lecturer_id) DESC, user_id),
+           user_id, COUNT(DISTINCT lecturer_id)
+    FROM lecturers_lecturerrating
+    WHERE user_id IS NOT NULL
+    GROUP BY user_id
+    UNION ALL
+    SELECT 'user_topuploads',
+           ROW_NUMBER() OVER (ORDER BY COUNT(d.id) DESC, d.uploader_id),
+           d.uploader_id, COUNT(d.id)
+    FROM documents_document d
+    JOIN front_user u ON u.id = d.uploader_id
+    WHERE u.username <> 'spimport'
+    GROUP BY d.uploader_id
+    UNION ALL
+    SELECT 'user_topevents',
+           ROW_NUMBER() OVER (ORDER BY COUNT(id) DESC, author_id),
+           author_id, COUNT(id)
+    FROM events_event
+    WHERE author_id IS NOT NULL
+    GROUP BY author_id
+    UNION ALL
+    SELECT 'user_topquotes',
+           ROW_NUMBER() OVER (ORDER BY COUNT(q.id) DESC, q.author_id),
+           q.author_id, COUNT(q.id)
+    FROM lecturers_quote q
+    JOIN front_user u ON u.id = q.author_id
+    WHERE u.username <> 'spimport'
+    GROUP BY q.author_id
+)
+SELECT key || '-' || rank AS id, key, rank, object_id, value
+FROM entries
+WHERE rank <= 3;
+
+CREATE UNIQUE INDEX front_stats_key_rank ON front_stats (key, rank);
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("front", "0008_auto_20210117_1428"),
+        ("documents", "0013_documentdownloadday"),
+        ("events", "0003_event_repeat_days_event_repeat_ends_event_repeats"),
+        ("lecturers", "0004_vote_counters"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatsEntry",
+            fields=[
+                (
+                    "id",
+                    models.CharField(max_length=40, primary_key=True, serialize=False),
+                ),
+                ("key", models.CharField(max_length=32)),
+                ("rank", models.PositiveSmallIntegerField()),
+                ("object_id", models.IntegerField()),
+                ("value", models.IntegerField()),
+            ],
+            options={
+                "db_table": "front_stats",
+                "ordering": ("key", "rank"),
+                "managed": False,
+            },
+        ),
+        migrations.RunSQL(CREATE_STATS_VIEW, "DROP MATERIALIZED VIEW front_stats"),
+    ]
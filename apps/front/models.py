@@ -1,4 +1,7 @@
 from django.contrib.auth.models import AbstractUser, UserManager
+from django.db import models
+
+from apps.front.managers import StatsEntryManager
 
 
 def strip_mail_part(username):
@@ -39,3 +42,63 @@ class User(AbstractUser):
         if self.first_name or self.last_name:
             return " ".join(part for part in [self.first_name, self.last_name] if part)
         return self.username
+
+
+class VotableModel(models.Model):
+    """Base class for models that can be up- and downvoted.
+
+    The vote counters are only changed by ``VoteQuerySet.vote()`` (see
+    ``managers.py``). Saving an existing object doesn't write them, so a
+    stale instance can't overwrite concurrent votes.
+    """
+
+    VOTE_COUNTERS = ("upvotes", "downvotes")
+
+    upvotes = models.PositiveIntegerField(default=0, editable=False)
+    downvotes = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        abstract = True
+
+    def vote_sum(self):
+        """Add up and return all votes for this object."""
+        return self.upvotes - self.downvotes
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.VOTE_COUNTERS
+            ]
+        super().save(*args, **kwargs)
+
+
+class StatsEntry(models.Model):
+    """An entry of a leaderboard on the stats page.
+
+    Backed by the materialized view ``front_stats``, which is refreshed by the
+    ``refresh_stats`` management command. Each leaderboard (``key``) contains
+    the top three lecturers or users (``object_id``) with their score
+    (``value``).
+    """
+
+    id = models.CharField(primary_key=True, max_length=40)
+    key = models.CharField(max_length=32)
+    rank = models.PositiveSmallIntegerField()
+    object_id = models.IntegerField()
+    value = models.IntegerField()
+
+    objects = StatsEntryManager()
+
+    class Meta:
+        managed = False
+        db_table = "front_stats"
+        ordering = ("key", "rank")
+
+    def __str__(self):
+        return f"{self.key} #{self.rank}: {self.object_id} ({self.value})"
@@ -0,0 +1,26 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.documents import models as document_models
+from apps.front import models
+from apps.front.context_processors import invalidate_global_stats
+from apps.lecturers import models as lecturer_models
+
+
+@receiver(post_save, sender=models.User)
+@receiver(post_save, sender=document_models.Document)
+@receiver(post_save, sender=lecturer_models.Quote)
+def invalidate_global_stats_on_create(sender, created, **kwargs):
+    if created:
+        invalidate_global_stats()
+
+
+# Whether a lecturer is counted depends on its function and department, so
+# updates need to invalidate the counters as well.
+@receiver(post_save, sender=lecturer_models.Lecturer)
+@receiver(post_delete, sender=models.User)
+@receiver(post_delete, sender=lecturer_models.Lecturer)
+@receiver(post_delete, sender=document_models.Document)
+@receiver(post_delete, sender=lecturer_models.Quote)
+def invalidate_global_stats_on_change(sender, **kwargs):
+    invalidate_global_stats()
@@ -2,7 +2,6 @@ import datetime
 
 from django.contrib import messages
 from django.contrib.auth import get_user_model
-from django.db.models import Count
 from django.urls import reverse
 from django.views.generic import TemplateView
 from django.views.generic.detail import DetailView
@@ -12,18 +11,29 @@ from apps.documents import models as document_models
 from apps.events import models as event_models
 from apps.front.mixins import LoginRequiredMixin
 from apps.lecturers import models as lecturer_models
+from apps.lecturers.managers import RATING_CATEGORIES
 
 from . import forms, models
 
+# The home page lists the next few events of the coming weeks, the event list
+# shows all of them
+HOME_EVENT_WEEKS = 8
+HOME_EVENT_COUNT = 10
+
 
 class Home(TemplateView):
     template_name = "front/home.html"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context["events_future"] = event_models.Event.objects.filter(
-            start_date__gte=datetime.date.today()
-        ).order_by("start_date", "start_time")
+        today = datetime.date.today()
+        context["events_future"] = event_models.Event.objects.select_related(
+            "author"
+        ).occurrences(
+            start=today, end=today + datetime.timedelta(weeks=HOME_EVENT_WEEKS)
+        )[
+            :HOME_EVENT_COUNT
+        ]
         return context
 
 
@@ -49,83 +59,77 @@ class User(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.get_object()
+        user = self.object
         context["lecturerratings"] = (
             user.LecturerRating.values_list("lecturer").distinct().count()
         )
-        if self.request.user.is_authenticated:
-            ratings = document_models.DocumentRating.objects.filter(user=user)
-            context["ratings"] = {r.document.pk: r.rating for r in ratings}
+        context["documents"] = user.Document.select_related(
+            "category", "uploader"
+        ).with_stats()
+        context["ratings"] = document_models.DocumentRating.objects.overlay(
+            context["documents"], self.request.user, "self_rating"
+        )
         # the logged in user, not the viewed one, accessed as "object"
         context["user"] = self.request.user
         return context
 
 
 class Stats(LoginRequiredMixin, TemplateView):
+    """Leaderboards of lecturers and users.
+
+    The leaderboards are precomputed in the ``front_stats`` materialized view
+    (see ``models.StatsEntry``), which is refreshed by the ``refresh_stats``
+    management command.
+    """
+
     template_name = "front/stats.html"
 
+    # Name of the attribute holding the score of the users, per leaderboard
+    user_leaderboards = {
+        "user_topratings": "lrcount",
+        "user_topuploads": "uploads_count",
+        "user_topevents": "events_count",
+        "user_topquotes": "quotes_count",
+    }
+
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
+        leaderboards = models.StatsEntry.objects.leaderboards()
 
-        # Lecturers
-        base_query = "SELECT lecturer_id AS id \
-                      FROM lecturers_lecturerrating \
-                      WHERE category = '%c' \
-                      GROUP BY lecturer_id HAVING COUNT(id) > 5"
-        base_query_top = base_query + " ORDER BY AVG(rating) DESC, COUNT(id) DESC"
-        base_query_flop = base_query + " ORDER BY AVG(rating) ASC, COUNT(id) DESC"
-
-        def fetchfirst(queryset):
-            try:
-                return queryset[0]
-            except IndexError:
-                return None
-
-        context["lecturer_top_d"] = fetchfirst(
-            lecturer_models.Lecturer.objects.raw(base_query_top % "d")
-        )
-        context["lecturer_top_m"] = fetchfirst(
-            lecturer_models.Lecturer.objects.raw(base_query_top % "m")
-        )
-        context["lecturer_top_f"] = fetchfirst(
-            lecturer_models.Lecturer.objects.raw(base_query_top % "f")
-        )
-        context["lecturer_flop_d"] = fetchfirst(
-            lecturer_models.Lecturer.objects.raw(base_query_flop % "d")
-        )
-        context["lecturer_flop_m"] = fetchfirst(
-            lecturer_models.Lecturer.objects.raw(base_query_flop % "m")
-        )
-        context["lecturer_flop_f"] = fetchfirst(
-            lecturer_models.Lecturer.objects.raw(base_query_flop % "f")
-        )
+        def objects(queryset, prefix):
+            ids = {
+                object_id
+                for key, entries in leaderboards.items()
+                if key.startswith(prefix)
+                for object_id, _ in entries
+            }
+            return queryset.in_bulk(ids) if ids else {}
 
-        context["lecturer_quotes"] = lecturer_models.Lecturer.objects.annotate(
-            quotes_count=Count("Quote")
-        ).order_by("-quotes_count")[:3]
+        lecturers = objects(lecturer_models.Lecturer.objects.all(), "lecturer_")
+        users = objects(models.User.objects.all(), "user_")
+
+        def first(key, objects):
+            entries = leaderboards.get(key)
+            return objects.get(entries[0][0]) if entries else None
+
+        # Lecturers
+        for category in RATING_CATEGORIES:
+            for board in ["top", "flop"]:
+                key = f"lecturer_{board}_{category}"
+                context[key] = first(key, lecturers)
+
+        context["lecturer_quotes"] = []
+        for object_id, value in leaderboards.get("lecturer_quotes", []):
+            if object_id in lecturers:
+                lecturer = lecturers[object_id]
+                lecturer.quotes_count = value
+                context["lecturer_quotes"].append(lecturer)
 
         # Users
-        context["user_topratings"] = fetchfirst(models.User.objects.raw("""
-                        SELECT u.id AS id, COUNT(DISTINCT lr.lecturer_id) AS lrcount
-                        FROM front_user u
-                        JOIN lecturers_lecturerrating lr
-                            ON u.id = lr.user_id
-                        GROUP BY u.id
-                        ORDER BY lrcount DESC"""))
-        context["user_topuploads"] = fetchfirst(
-            models.User.objects.exclude(username="spimport")
-            .annotate(uploads_count=Count("Document"))
-            .order_by("-uploads_count")
-        )
-        context["user_topevents"] = fetchfirst(
-            models.User.objects.annotate(events_count=Count("Event")).order_by(
-                "-events_count"
-            )
-        )
-        context["user_topquotes"] = fetchfirst(
-            models.User.objects.exclude(username="spimport")
-            .annotate(quotes_count=Count("Quote"))
-            .order_by("-quotes_count")
-        )
+        for key, attribute in self.user_leaderboards.items():
+            user = first(key, users)
+            if user is not None:
+                setattr(user, attribute, leaderboards[key][0][1])
+            context[key] = user
 
         return context
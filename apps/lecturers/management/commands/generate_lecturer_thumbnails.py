@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.lecturers.models import Lecturer
+
+
+class Command(BaseCommand):
+    help = "Generate the missing or outdated thumbnails of all lecturer photos."
+
+    def handle(self, *args, **options):
+        updated = Lecturer.objects.generate_thumbnails()
+        self.stdout.write(f"Updated the thumbnails of {updated} lecturers.")
@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.lecturers.models import Lecturer
+
+
+class Command(BaseCommand):
+    help = "Look up the lecturer photos in the media folder and store their paths."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--interval",
+            type=float,
+            help="Keep running and scan again every INTERVAL seconds",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            updated = Lecturer.objects.scan_photos()
+            if options["verbosity"] > 1 or updated:
+                self.stdout.write(f"Updated the photos of {updated} lecturers.")
+            if options["interval"] is None:
+                break
+            time.sleep(options["interval"])
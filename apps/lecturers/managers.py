@@ -1,7 +1,80 @@
 from django.db import models
+from django.db.models import Avg, Count, Q, Value
+from django.db.models.functions import Coalesce, Round
 
+from apps.front.managers import VoteQuerySet
+from apps.lecturers import photos, signals
 
-class RealLecturerManager(models.Manager):
+RATING_CATEGORIES = ("d", "m", "f")
+
+PHOTO_FIELDS = [
+    "photo_path",
+    "old_photo_paths",
+    "photo_thumbnails",
+    "old_photo_thumbnails",
+]
+
+
+class LecturerQuerySet(models.QuerySet):
+    def with_ratings(self):
+        """Annotate the rating average and count of every category using
+        conditional aggregation over a single join.
+
+        The annotations are picked up by ``Lecturer.avg_rating_*()`` and
+        ``Lecturer.rating_count_*()`` so that no per-lecturer queries are
+        needed.
+        """
+        annotations = {}
+        for category in RATING_CATEGORIES:
+            in_category = Q(LecturerRating__category=category)
+            annotations["ratings_avg_%c" % category] = Coalesce(
+                Round(Avg("LecturerRating__rating", filter=in_category)), Value(0.0)
+            )
+            annotations["ratings_count_%c" % category] = Count(
+                "LecturerRating", filter=in_category
+            )
+        return self.annotate(**annotations)
+
+    def _update_photos(self, lecturers):
+        """Store the photo fields of ``lecturers``. ``bulk_update()`` sends no
+        ``post_save`` signals, so ``photos_updated`` is sent instead. Returns
+        the number of updated lecturers."""
+        updated = self.model.objects.bulk_update(
+            lecturers, PHOTO_FIELDS, batch_size=500
+        )
+        if updated:
+            signals.photos_updated.send(sender=self.model)
+        return updated
+
+    def scan_photos(self):
+        """Look up the photos of all lecturers on the file system, listing
+        every directory only once, and store the changed paths. Thumbnails of
+        new photos are generated right away. Returns the number of updated
+        lecturers."""
+        listdir = photos.cached_listdir()
+        changed = [
+            lecturer
+            for lecturer in self.only("id", "picture", *PHOTO_FIELDS)
+            if lecturer.scan_photos(listdir)
+        ]
+        for lecturer in changed:
+            lecturer.generate_thumbnails()
+        return self._update_photos(changed)
+
+    def generate_thumbnails(self):
+        """Look up the photos of all lecturers and generate the missing or
+        outdated thumbnails, including those of the old photos. Returns the
+        number of updated lecturers."""
+        listdir = photos.cached_listdir()
+        changed = []
+        for lecturer in self.iterator():
+            photos_changed = lecturer.scan_photos(listdir)
+            if lecturer.generate_thumbnails() or photos_changed:
+                changed.append(lecturer)
+        return self._update_photos(changed)
+
+
+class RealLecturerManager(models.Manager.from_queryset(LecturerQuerySet)):
     """A lecturer manager that tries to filter out all non-lecturers."""
 
     def get_queryset(self):
@@ -13,3 +86,7 @@ class RealLecturerManager(models.Manager):
             .exclude(function__in=function_excludes)
             .exclude(department__in=department_excludes)
         )
+
+
+class QuoteQuerySet(VoteQuerySet):
+    vote_relation = "QuoteVote"
@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-18 22:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecturers", "0003_auto_20210107_2008"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="quote",
+            name="downvotes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="quote",
+            name="upvotes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE lecturers_quote SET
+                upvotes = (SELECT COUNT(*) FROM lecturers_quotevote
+                           WHERE quote_id = lecturers_quote.id AND vote),
+                downvotes = (SELECT COUNT(*) FROM lecturers_quotevote
+                             WHERE quote_id = lecturers_quote.id AND NOT vote)
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 22:58
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecturers", "0004_vote_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lecturer",
+            name="old_photo_paths",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=255),
+                default=list,
+                editable=False,
+                size=None,
+            ),
+        ),
+        migrations.AddField(
+            model_name="lecturer",
+            name="photo_path",
+            field=models.CharField(editable=False, max_length=255, null=True),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-18 23:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecturers", "0005_photo_paths"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lecturer",
+            name="photo_thumbnails",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
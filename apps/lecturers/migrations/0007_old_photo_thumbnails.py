@@ -0,0 +1,18 @@
+# Generated by Django 5.0 on 2026-10-19 00:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("lecturers", "0006_photo_thumbnails"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lecturer",
+            name="old_photo_thumbnails",
+            field=models.JSONField(default=dict, editable=False),
+        ),
+    ]
@@ -1,13 +1,13 @@
-import os
-import re
 from datetime import datetime
 
 from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.db.models.functions import Coalesce, Round
 
-from apps.lecturers import managers
+from apps.front.models import VotableModel
+from apps.lecturers import managers, photos
 
 
 def lecturer_directory_path(instance, filename):
@@ -19,7 +19,7 @@ class Lecturer(models.Model):
     """A lecturer at OST.
 
     If there is a photo of that lecturer, it should go into the media folder
-    and the filename should be <abbreviation>.jpg.
+    and the filename should be <id>.jpg (see ``apps.lecturers.photos``).
 
     """
 
@@ -44,8 +44,14 @@ class Lecturer(models.Model):
         null=True,
         blank=True,
     )
+    photo_path = models.CharField(max_length=255, null=True, editable=False)
+    old_photo_paths = ArrayField(
+        models.CharField(max_length=255), default=list, editable=False
+    )
+    photo_thumbnails = models.JSONField(default=dict, editable=False)
+    old_photo_thumbnails = models.JSONField(default=dict, editable=False)
 
-    objects = models.Manager()
+    objects = managers.LecturerQuerySet.as_manager()
     real_objects = managers.RealLecturerManager()
 
     def name(self):
@@ -53,30 +59,60 @@ class Lecturer(models.Model):
         return " ".join(p for p in parts if p)
 
     def photo(self):
-        """Try to see if a photo with the name <self.id>.jpg exists. If it
-        does, return the corresponding URL. If it doesn't, return None."""
-        if self.picture:
-            path = self.picture.name
-        else:
-            path = os.path.join("lecturers", f"{self.id}.jpg")
-        full_path = os.path.join(settings.MEDIA_ROOT, path)
-        return path if os.path.exists(full_path) else None
-
-    def oldphotos(self):
-        """Try to see whether there are more pictures in the folder
-        ``lecturers/old/<self.id>/``..."""
-        path = os.path.join("lecturers", "old", str(self.id))
-        fullpath = os.path.join(settings.MEDIA_ROOT, path)
-        oldphotos = []
-        if os.path.exists(fullpath):
-            for filename in os.listdir(fullpath):
-                if re.match(r"^[0-9]+\.jpg$", filename):
-                    filepath = os.path.join(path, filename)
-                    oldphotos.append(filepath)
-        return oldphotos
+        """Return the path of the current photo, or None if there is none."""
+        return self.photo_path
+
+    def old_photos(self):
+        """Return the older photos with their stored thumbnails."""
+        return [
+            photos.Photo(path, self.old_photo_thumbnails.get(path, {}))
+            for path in self.old_photo_paths
+        ]
+
+    def scan_photos(self, listdir=photos.list_media_dir):
+        """Look up the photos on the file system and set ``photo_path`` and
+        ``old_photo_paths``. Returns whether they changed."""
+        found = photos.find_photos(self, listdir)
+        changed = found != (self.photo_path, self.old_photo_paths)
+        self.photo_path, self.old_photo_paths = found
+        return changed
+
+    def generate_thumbnails(self):
+        """Generate the thumbnails of the current and the old photos and set
+        ``photo_thumbnails`` and ``old_photo_thumbnails``. Returns whether
+        they changed."""
+        thumbnails = (
+            photos.generate_thumbnails(self.photo_path) if self.photo_path else {}
+        )
+        old_thumbnails = {
+            path: photos.generate_thumbnails(path) for path in self.old_photo_paths
+        }
+        changed = (thumbnails, old_thumbnails) != (
+            self.photo_thumbnails,
+            self.old_photo_thumbnails,
+        )
+        self.photo_thumbnails = thumbnails
+        self.old_photo_thumbnails = old_thumbnails
+        return changed
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # The id and the uploaded picture are only known after saving
+        changed = self.scan_photos()
+        if self.generate_thumbnails() or changed:
+            Lecturer.objects.filter(pk=self.pk).update(
+                photo_path=self.photo_path,
+                old_photo_paths=self.old_photo_paths,
+                photo_thumbnails=self.photo_thumbnails,
+                old_photo_thumbnails=self.old_photo_thumbnails,
+            )
 
     def _avg_rating(self, category):
-        """Calculate the average rating for the given category."""
+        """Calculate the average rating for the given category. If the
+        lecturer was fetched using ``with_ratings()``, no query is needed."""
+        annotation = "ratings_avg_%c" % category
+        if hasattr(self, annotation):
+            return int(getattr(self, annotation))
         return int(
             self.LecturerRating.filter(category=category)
             .aggregate(avg=Coalesce(Round(models.Avg("rating")), models.Value(0.0)))
@@ -84,6 +120,9 @@ class Lecturer(models.Model):
         )
 
     def _rating_count(self, category):
+        annotation = "ratings_count_%c" % category
+        if hasattr(self, annotation):
+            return getattr(self, annotation)
         return self.LecturerRating.filter(category=category).count()
 
     def avg_rating_d(self):
@@ -138,7 +177,7 @@ class LecturerRating(models.Model):
         unique_together = ("user", "lecturer", "category")
 
 
-class Quote(models.Model):
+class Quote(VotableModel):
     """Lecturer quotes."""
 
     author = models.ForeignKey(
@@ -154,15 +193,11 @@ class Quote(models.Model):
     quote = models.TextField("Zitat")
     comment = models.TextField("Bemerkung", default="", blank=True)
 
+    objects = managers.QuoteQuerySet.as_manager()
+
     def date_available(self):
         return self.date != datetime(1970, 1, 1)
 
-    def vote_sum(self):
-        """Add up and return all votes for this quote."""
-        up = self.QuoteVote.filter(vote=True).count()
-        down = self.QuoteVote.filter(vote=False).count()
-        return up - down
-
     def __str__(self):
         return f"[{self.lecturer}] {self.quote[:30]}..."
 
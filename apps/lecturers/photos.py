@@ -0,0 +1,89 @@
+"""Lookup of lecturer photos on the media volume.
+
+Photos are either uploaded as ``Lecturer.picture`` or copied to
+``lecturers/<id>.jpg``, older photos to ``lecturers/old/<id>/<n>.jpg``. The
+paths are resolved when a lecturer is saved and by the
+``scan_lecturer_photos`` management command, and stored on the lecturer, so
+that rendering lecturers doesn't touch the file system.
+
+The same goes for the thumbnails in the sizes of ``THUMBNAIL_ALIASES``: they
+are generated eagerly and their paths are stored in
+``Lecturer.photo_thumbnails`` and, for the old photos,
+``Lecturer.old_photo_thumbnails``.
+
+"""
+
+import logging
+import os
+import re
+from functools import lru_cache
+from typing import NamedTuple
+
+from django.conf import settings
+from easy_thumbnails.alias import aliases
+from easy_thumbnails.engine import NoSourceGenerator
+from easy_thumbnails.exceptions import InvalidImageFormatError
+from easy_thumbnails.files import get_thumbnailer
+
+logger = logging.getLogger(__name__)
+
+PHOTO_DIR = "lecturers"
+OLD_PHOTO_DIR = os.path.join(PHOTO_DIR, "old")
+OLD_PHOTO_RE = re.compile(r"^[0-9]+\.jpg$")
+THUMBNAIL_ALIASES = ("lecturer_photo", "lecturer_photo_small", "lecturer_photo_icon")
+
+
+class Photo(NamedTuple):
+    """An old photo of a lecturer and the paths of its thumbnails."""
+
+    path: str
+    thumbnails: dict
+
+
+def list_media_dir(path):
+    """Return the file names in a directory below ``MEDIA_ROOT``, or an empty
+    set if it doesn't exist."""
+    try:
+        return set(os.listdir(os.path.join(settings.MEDIA_ROOT, path)))
+    except (FileNotFoundError, NotADirectoryError):
+        return set()
+
+
+def cached_listdir():
+    """Return a variant of ``list_media_dir`` that lists every directory only
+    once, to scan many lecturers."""
+    return lru_cache(maxsize=None)(list_media_dir)
+
+
+def find_photos(lecturer, listdir=list_media_dir):
+    """Return the path of the current photo (or None) and the sorted list of
+    old photo paths of a lecturer."""
+    if lecturer.picture:
+        path = lecturer.picture.name
+    else:
+        path = os.path.join(PHOTO_DIR, f"{lecturer.id}.jpg")
+    if os.path.basename(path) not in listdir(os.path.dirname(path)):
+        path = None
+
+    old_dir = os.path.join(OLD_PHOTO_DIR, str(lecturer.id))
+    old_paths = sorted(
+        os.path.join(old_dir, filename)
+        for filename in listdir(old_dir)
+        if OLD_PHOTO_RE.match(filename)
+    )
+    return path, old_paths
+
+
+def generate_thumbnails(path):
+    """Generate the thumbnails of a photo in all sizes, unless they are up to
+    date already. Returns a dict mapping the alias names to the thumbnail
+    paths, which is empty if the photo can't be read."""
+    thumbnailer = get_thumbnailer(path)
+    try:
+        return {
+            alias: thumbnailer.get_thumbnail(aliases.get(alias)).name
+            for alias in THUMBNAIL_ALIASES
+        }
+    except (InvalidImageFormatError, NoSourceGenerator, OSError):
+        logger.warning("Could not generate thumbnails of %s", path, exc_info=True)
+        return {}
@@ -0,0 +1,5 @@
+from django.dispatch import Signal
+
+# Sent with the lecturer model as sender after the photo fields of lecturers
+# were stored with ``bulk_update()``, which sends no ``post_save`` signals.
+photos_updated = Signal()
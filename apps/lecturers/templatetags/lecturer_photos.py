@@ -0,0 +1,29 @@
+from django.template import Library
+from easy_thumbnails.storage import thumbnail_default_storage
+from easy_thumbnails.templatetags.thumbnail import thumbnail_url
+
+from apps.lecturers import photos
+
+register = Library()
+
+
+@register.filter
+def photo_thumbnail(photo, alias):
+    """Return the URL of a thumbnail of a lecturer photo. ``photo`` is either
+    a lecturer, for its current photo, or one of ``Lecturer.old_photos()``.
+
+    Usage (in template): ``{{ lecturer|photo_thumbnail:"lecturer_photo" }}``
+
+    The stored thumbnail path is used if there is one, so the image files
+    aren't accessed. Otherwise the thumbnail is generated on demand.
+    """
+    if isinstance(photo, photos.Photo):
+        path, thumbnails = photo
+    else:
+        path, thumbnails = photo.photo_path, photo.photo_thumbnails
+    name = thumbnails.get(alias)
+    if name:
+        return thumbnail_default_storage.url(name)
+    if path:
+        return thumbnail_url(path, alias)
+    return ""
@@ -9,24 +9,22 @@ from django.views.generic.list import ListView
 
 from apps.front.message_levels import EVENT
 from apps.front.mixins import LoginRequiredMixin
-from apps.lecturers import forms, helpers, models
+from apps.lecturers import forms, models
 
 
 class Lecturer(LoginRequiredMixin, DetailView):
-    model = models.Lecturer
+    queryset = models.Lecturer.objects.with_ratings()
     context_object_name = "lecturer"
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
         # Quotes / QuoteVotes
-        context["quotes"] = helpers.extend_quotes_with_votes(
-            self.object.Quote.all(), self.request.user.pk
-        )
+        context["quotes"] = self.object.Quote.with_votes(self.request.user)
 
         # Ratings
         ratings = models.LecturerRating.objects.filter(
-            lecturer=self.get_object(), user=self.request.user
+            lecturer=self.object, user=self.request.user
         )
         ratings_dict = {r.category: r.rating for r in ratings}
         for cat in ["d", "m", "f"]:
@@ -36,7 +34,7 @@ class Lecturer(LoginRequiredMixin, DetailView):
 
 
 class LecturerList(LoginRequiredMixin, ListView):
-    queryset = models.Lecturer.real_objects.all()
+    queryset = models.Lecturer.real_objects.with_ratings()
     context_object_name = "lecturers"
 
     def get_context_data(self, **kwargs):
@@ -68,8 +66,8 @@ class QuoteList(LoginRequiredMixin, ListView):
     paginate_by = 50
 
     def get_queryset(self):
-        return helpers.extend_quotes_with_votes(
-            models.Quote.objects.all(), self.request.user.pk
+        return models.Quote.objects.select_related("lecturer").with_votes(
+            self.request.user
         )
 
 
@@ -104,11 +102,7 @@ class QuoteAdd(LoginRequiredMixin, CreateView):
         self.object.save()
         if not is_edit:
             # Automatically upvote own quote
-            models.QuoteVote.objects.create(
-                user=self.request.user,
-                quote=self.object,
-                vote=True,
-            )
+            models.Quote.objects.vote(self.object, self.request.user, True)
         return super().form_valid(form)
 
     def get_success_url(self):
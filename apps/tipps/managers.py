@@ -0,0 +1,5 @@
+from apps.front.managers import VoteQuerySet
+
+
+class TippQuerySet(VoteQuerySet):
+    vote_relation = "TippVote"
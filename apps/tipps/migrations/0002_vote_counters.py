@@ -0,0 +1,33 @@
+# Generated by Django 5.0 on 2026-10-18 22:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tipps", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="tipp",
+            name="downvotes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="tipp",
+            name="upvotes",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunSQL(
+            """
+            UPDATE tipps_tipp SET
+                upvotes = (SELECT COUNT(*) FROM tipps_tippvote
+                           WHERE tipp_id = tipps_tipp.id AND vote),
+                downvotes = (SELECT COUNT(*) FROM tipps_tippvote
+                             WHERE tipp_id = tipps_tipp.id AND NOT vote)
+            """,
+            migrations.RunSQL.noop,
+        ),
+    ]
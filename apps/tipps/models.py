@@ -3,8 +3,11 @@ from datetime import date
 from django.conf import settings
 from django.db import models
 
+from apps.front.models import VotableModel
+from apps.tipps import managers
 
-class Tipp(models.Model):
+
+class Tipp(VotableModel):
     """A tipp topp tipp."""
 
     author = models.ForeignKey(
@@ -17,15 +20,11 @@ class Tipp(models.Model):
     summary = models.CharField("Titel", max_length=64)
     description = models.TextField("Beschreibung")
 
+    objects = managers.TippQuerySet.as_manager()
+
     def date_available(self):
         return self.date != datetime(1970, 1, 1)
 
-    def vote_sum(self):
-        """Add up and return all votes for this tipp."""
-        up = self.TippVote.filter(vote=True).count()
-        down = self.TippVote.filter(vote=False).count()
-        return up - down
-
     def __str__(self):
         return f"{self.summary}"
 
@@ -23,38 +23,13 @@ from apps.front.mixins import LoginRequiredMixin
 from apps.tipps import forms, models
 
 
-# FIXME: duplicated
-def extend_tipps_with_votes(tipps, user_pk):
-    """Extends a tipp queryset with tipp votes (using an extra()-query)."""
-
-    vote_base_query = "SELECT EXISTS (SELECT id \
-            FROM tipps_tippvote \
-            WHERE tipps_tippvote.tipp_id = tipps_tipp.id \
-            AND vote = '%s' \
-            AND user_id = %u)"
-    count_query = "SELECT COUNT(*) \
-            FROM tipps_tippvote \
-            WHERE tipps_tippvote.tipp_id = tipps_tipp.id"
-    count_base_query = count_query + " AND vote = '%s'"
-
-    return tipps.extra(
-        select={
-            "voted_up": False if user_pk is None else vote_base_query % ("t", user_pk),
-            "voted_down": (
-                False if user_pk is None else vote_base_query % ("f", user_pk)
-            ),
-            "vote_count": count_query,
-            "upvote_count": count_base_query % "t",
-            "downvote_count": count_base_query % "f",
-        },
-    )
-
-
 class TippList(ListView):
     paginate_by = 50
 
     def get_queryset(self):
-        return extend_tipps_with_votes(models.Tipp.objects.all(), self.request.user.pk)
+        return models.Tipp.objects.select_related("author").with_votes(
+            self.request.user
+        )
 
 
 class TippAdd(LoginRequiredMixin, CreateView):
@@ -72,11 +47,7 @@ class TippAdd(LoginRequiredMixin, CreateView):
         self.object.save()
         if not is_edit:
             # Automatically upvote own tipp
-            models.TippVote.objects.create(
-                user=self.request.user,
-                tipp=self.object,
-                vote=True,
-            )
+            models.Tipp.objects.vote(self.object, self.request.user, True)
         return super().form_valid(form)
 
     def get_success_url(self):
@@ -114,22 +85,13 @@ class TippVote(LoginRequiredMixin, APIView):
         if vote not in ["up", "down", "remove"]:
             return HttpResponseBadRequest("Expected up/down/remove for vote")
 
-        if vote == "remove":
-            models.TippVote.objects.get(user=request.user, tipp=tipp).delete()
-        else:
-            try:
-                vote_obj = models.TippVote.objects.get(user=request.user, tipp=tipp)
-            except models.TippVote.DoesNotExist:
-                vote_obj = models.TippVote()
-                vote_obj.user = request.user
-                vote_obj.tipp = tipp
-            vote_obj.vote = vote == "up"
-            vote_obj.save()
+        value = None if vote == "remove" else vote == "up"
+        upvotes, downvotes = models.Tipp.objects.vote(tipp, request.user, value)
 
         data = {
             "vote_elem_pk": tipp.pk,
             "vote": vote,
-            "vote_count": tipp.TippVote.count(),
-            "vote_sum": tipp.vote_sum(),
+            "vote_count": upvotes + downvotes,
+            "vote_sum": upvotes - downvotes,
         }
         return JsonResponse(data)
@@ -26,6 +26,15 @@ MANAGERS = ADMINS
 DEBUG = env("DJANGO_DEBUG", "True").lower() in true_values
 DEBUG_TOOLBAR = env("DJANGO_DEBUG_TOOLBAR", "False").lower() in true_values
 THUMBNAIL_DEBUG = DEBUG
+# Sizes of the lecturer photos. Their thumbnails are generated when a photo is
+# saved and by the generate_lecturer_thumbnails management command.
+THUMBNAIL_ALIASES = {
+    "": {
+        "lecturer_photo": {"size": (120, 160), "crop": True},
+        "lecturer_photo_small": {"size": (34, 45), "crop": True},
+        "lecturer_photo_icon": {"size": (36, 36), "crop": True},
+    }
+}
 COMPRESS_ENABLED = env("DJANGO_COMPRESS", str(not DEBUG)).lower() in true_values
 
 # Local time zone for this installation. Choices can be found here:
@@ -75,6 +84,24 @@ DATABASES = {
     }
 }
 
+# Cached content is kept in the memory of each process. The versions of
+# cached content are in the "shared" cache, which all application server
+# processes and the background management commands use, so that bumping a
+# version in one process invalidates the content in all of them. Its table is
+# created by "createcachetable".
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "shared": {
+        "BACKEND": env(
+            "DJANGO_SHARED_CACHE_BACKEND",
+            "django.core.cache.backends.db.DatabaseCache",
+        ),
+        "LOCATION": env("DJANGO_SHARED_CACHE_LOCATION", "django_cache"),
+    },
+}
+
 SECRET_KEY = env("SECRET_KEY", "DEBUG_SECRET_KEY")
 if SECRET_KEY == "DEBUG_SECRET_KEY" and DEBUG is False:
     raise ImproperlyConfigured("Missing SECRET_KEY env variable")
@@ -167,6 +194,7 @@ MIDDLEWARE = []
 if DEBUG_TOOLBAR:
     MIDDLEWARE.append("debug_toolbar.middleware.DebugToolbarMiddleware")
 MIDDLEWARE += [
+    "apps.front.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -253,6 +281,12 @@ LOGGING = {
             "handlers": ["console"],
             "propagate": False,
         },
+        # One line with the query count and timings per request
+        "apps.front.metrics": {
+            "level": env("DJANGO_REQUEST_METRICS_LOG_LEVEL", "INFO"),
+            "handlers": ["console"],
+            "propagate": False,
+        },
     },
 }
 if not DEBUG:
@@ -311,6 +345,40 @@ REGISTRATION_FORM = "apps.front.forms.HsrRegistrationForm"
 REGISTRATION_EMAIL_HTML = False
 ACCOUNT_ACTIVATION_DAYS = 7
 
+# Cache lifetime (in seconds) of the global counters shown on every page.
+# They are invalidated on writes, so this is only a fallback.
+GLOBAL_STATS_CACHE_TIMEOUT = int(env("DJANGO_GLOBAL_STATS_CACHE_TIMEOUT", 60 * 60))
+
+# Document downloads are buffered in each process and written in batches at
+# most this many seconds apart. Set to 0 to write every download immediately.
+DOCUMENT_DOWNLOAD_FLUSH_INTERVAL = float(
+    env("DJANGO_DOCUMENT_DOWNLOAD_FLUSH_INTERVAL", 10)
+)
+
+# Raw document downloads are rolled up into daily counts and deleted after
+# this many days (see the rollup_document_downloads management command).
+DOCUMENT_DOWNLOAD_RETENTION_DAYS = int(
+    env("DJANGO_DOCUMENT_DOWNLOAD_RETENTION_DAYS", 90)
+)
+
+# Cache lifetime (in seconds) of the rendered document category overview. It
+# is versioned and invalidated on writes, so this is only a fallback.
+DOCUMENT_CATEGORY_LIST_CACHE_TIMEOUT = int(
+    env("DJANGO_DOCUMENT_CATEGORY_LIST_CACHE_TIMEOUT", 60 * 60 * 24)
+)
+
+# Cache lifetime (in seconds) of the iCalendar feed of the events. It is
+# versioned and invalidated on writes, so this is only a fallback.
+EVENT_CALENDAR_CACHE_TIMEOUT = int(
+    env("DJANGO_EVENT_CALENDAR_CACHE_TIMEOUT", 60 * 60 * 24)
+)
+
+# Send the request metrics (query count, database and template time) to
+# the browser in a Server-Timing header.
+SERVER_TIMING_HEADER = (
+    env("DJANGO_SERVER_TIMING_HEADER", str(DEBUG)).lower() in true_values
+)
+
 # Analytics
 GOOGLE_ANALYTICS_CODE = env("GOOGLE_ANALYTICS_CODE", None)
 
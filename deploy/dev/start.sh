@@ -8,6 +8,7 @@ done
 
 python3 manage.py migrate front
 python3 manage.py migrate
+python3 manage.py createcachetable
 python3 manage.py loaddata ./testdata/database.json
 cp -R ./testdata/media/* media/
 python3 manage.py runserver 0.0.0.0:8000
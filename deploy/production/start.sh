@@ -17,7 +17,25 @@ done
 
 python3 manage.py migrate front
 python3 manage.py migrate
+python3 manage.py createcachetable
 python3 manage.py collectstatic --clear --no-input -v 0
 python3 manage.py compress
 
+# Generate queued document thumbnails in the background
+python3 manage.py process_thumbnail_jobs &
+
+# Extract the text of new and changed documents for the full-text search
+python3 manage.py extract_document_text --workers 2 --interval 300 &
+
+# Roll up the download log into daily counts
+python3 manage.py rollup_document_downloads --interval 3600 &
+
+# Generate the lecturer photo thumbnails, then pick up photos copied to the
+# media folder
+(python3 manage.py generate_lecturer_thumbnails \
+  && python3 manage.py scan_lecturer_photos --interval 3600) &
+
+# Recalculate the leaderboards of the stats page
+python3 manage.py refresh_stats --interval 900 &
+
 gunicorn config.wsgi:application -n studentenportal -b 0.0.0.0:8000 -w 4 --log-level warning
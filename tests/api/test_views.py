@@ -1,12 +1,19 @@
 import base64
+import datetime
 import json
+import os
 
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import NoReverseMatch, reverse
 from model_bakery import baker
 
-from apps.lecturers.models import Lecturer, Quote, QuoteVote
+from apps.api.pagination import DocumentPagination
+from apps.documents import models as document_models
+from apps.lecturers.models import Lecturer, LecturerRating, Quote, QuoteVote
 
 User = get_user_model()
 
@@ -22,6 +29,11 @@ class TestAuthentication:
             "lecturer_detail",
             "quote_list",
             "quote_detail",
+            "document_search",
+            "document_list",
+            "document_detail",
+            "document_category_list",
+            "document_category_detail",
         ]
         for target in targets:
             try:
@@ -148,6 +160,26 @@ class TestLecturerView:
 
         assert len(data["quotes"]) == lecturer.Quote.count()
 
+    def test_list_ratings(self, lecturer, auth_client, django_assert_num_queries):
+        baker.make(LecturerRating, lecturer=lecturer, category="d", rating=4)
+        baker.make(LecturerRating, lecturer=lecturer, category="d", rating=9)
+        baker.make(LecturerRating, lecturer=lecturer, category="f", rating=2)
+        baker.make(Lecturer, _quantity=3)
+
+        url = reverse("api:lecturer_list")
+        # Session, user, count, lecturers with ratings, quotes
+        with django_assert_num_queries(5):
+            resp = auth_client.get(url)
+        data = next(
+            item for item in resp.json()["results"] if item["id"] == lecturer.pk
+        )
+        assert data["avg_rating_d"] == 7
+        assert data["avg_rating_m"] == 0
+        assert data["avg_rating_f"] == 2
+        assert data["rating_count_d"] == 2
+        assert data["rating_count_m"] == 0
+        assert data["rating_count_f"] == 1
+
     def test_list_methods(self, auth_client):
         url = reverse("api:lecturer_list")
         resp = auth_client.head(url)
@@ -314,6 +346,7 @@ class TestQuoteVote:
                 "vote_sum": vote_sum,
             }
             assert QuoteVote.objects.count() == vote_count
+            quote.refresh_from_db()
             assert quote.vote_sum() == vote_sum
 
         return _check_vote
@@ -322,6 +355,7 @@ class TestQuoteVote:
         voter("down", 1, -1)
         voter("up", 1, 1)
         voter("remove", 0, 0)
+        voter("remove", 0, 0)
 
 
 class TestLecturerRate:
@@ -381,3 +415,161 @@ class TestLecturerRate:
         rater("d", 4)
         rater("m", 6)
         rater("f", 10)
+
+
+class TestDocumentSearchView:
+    def test_search(self, auth_client, db):
+        doc = baker.make_recipe(
+            "apps.documents.document_summary", name="Theoriesammlung Physik"
+        )
+        baker.make_recipe("apps.documents.document_summary", name="Analysis")
+        url = reverse("api:document_search")
+
+        assert auth_client.get(url).json()["results"] == []
+
+        data = auth_client.get(url, {"q": "physik"}).json()
+        assert data["count"] == 1
+        assert data["results"][0]["id"] == doc.pk
+        assert data["results"][0]["name"] == "Theoriesammlung Physik"
+        assert data["results"][0]["downloadcount"] == 0
+
+    def test_search_methods(self, auth_client):
+        url = reverse("api:document_search")
+        resp = auth_client.head(url)
+        allow = set(resp.get("Allow").split(", "))
+        assert allow == {"GET", "HEAD", "OPTIONS"}
+
+
+class TestDocumentListView:
+    def test_list(self, auth_client, db):
+        category = baker.make(document_models.DocumentCategory, name="An1I")
+        other = baker.make(document_models.DocumentCategory, name="Other")
+        start = datetime.datetime(2020, 1, 1)
+        for i in range(30):
+            baker.make(
+                document_models.Document,
+                category=category if i < 25 else other,
+                license=1 if i % 2 else 2,
+                document="a.pdf",
+                change_date=start + datetime.timedelta(hours=i),
+            )
+        url = reverse("api:document_list")
+
+        data = auth_client.get(url).json()
+        assert len(data["results"]) == 30
+        assert data["next"] is None
+
+        data = auth_client.get(url, {"category": "an1i", "license": 1}).json()
+        assert len(data["results"]) == 12
+        assert {doc["category"] for doc in data["results"]} == {"An1I"}
+        assert {doc["license"] for doc in data["results"]} == {1}
+
+        assert auth_client.get(url, {"license": 42}).status_code == 400
+        assert auth_client.get(url, {"cursor": "invalid"}).status_code == 404
+
+    def test_pagination(self, auth_client, db, monkeypatch):
+        monkeypatch.setattr(DocumentPagination, "page_size", 2)
+        docs = baker.make_recipe("apps.documents.document_summary", _quantity=5)
+        url = reverse("api:document_list")
+        ids = []
+        while url:
+            data = auth_client.get(url).json()
+            ids += [doc["id"] for doc in data["results"]]
+            url = data["next"]
+        expected = sorted(docs, key=lambda d: (-d.change_date.timestamp(), d.pk))
+        assert ids == [doc.pk for doc in expected]
+
+    def test_limit_offset(self, auth_client, db):
+        docs = baker.make_recipe("apps.documents.document_summary", _quantity=5)
+        expected = sorted(docs, key=lambda d: (-d.change_date.timestamp(), d.pk))
+        url = reverse("api:document_list")
+        data = auth_client.get(url, {"limit": 2, "offset": 2}).json()
+        assert data["count"] == 5
+        assert [doc["id"] for doc in data["results"]] == [d.pk for d in expected[2:4]]
+
+    def test_pagination_schema(self):
+        keyset, offset = DocumentPagination().get_paginated_response_schema(
+            {"type": "array"}
+        )["oneOf"]
+        assert set(keyset["properties"]) == {"next", "results"}
+        assert set(offset["properties"]) == {"count", "next", "previous", "results"}
+
+    def test_field_selection(self, auth_client, db):
+        baker.make_recipe("apps.documents.document_summary")
+        url = reverse("api:document_list")
+        data = auth_client.get(url, {"fields": "id,name,unknown"}).json()
+        assert set(data["results"][0]) == {"id", "name"}
+
+    def test_constant_query_count(self, auth_client, user, db):
+        url = reverse("api:document_list")
+        baker.make_recipe("apps.documents.document_summary", _quantity=2)
+        with CaptureQueriesContext(connection) as queries:
+            auth_client.get(url)
+        baseline = len(queries)
+        baker.make_recipe("apps.documents.document_summary", _quantity=10)
+        with CaptureQueriesContext(connection) as queries:
+            auth_client.get(url)
+        assert len(queries) == baseline
+
+
+class TestDocumentDetailView:
+    @pytest.fixture
+    def pdf_document(self, db):
+        doc = baker.make_recipe(
+            "apps.documents.document_summary",
+            document=SimpleUploadedFile("summary.pdf", b"%PDF-1.4"),
+        )
+        yield doc
+        os.remove(doc.document.path)
+
+    def test_detail(self, auth_client, pdf_document):
+        doc = pdf_document
+        document_models.DocumentStats.objects.filter(document=doc).update(
+            download_count=3, rating_sum=15, rating_count=2
+        )
+        doc.refresh_from_db()
+        data = auth_client.get(reverse("api:document_detail", args=(doc.pk,))).json()
+        assert data["id"] == doc.pk
+        assert data["category"] == "An1I"
+        assert data["downloadcount"] == 3
+        assert data["rating"] == 8
+        assert data["rating_count"] == 2
+        assert data["file_size"] == doc.document.size
+        assert data["download_url"] == (f"http://testserver/dokumente/an1i/{doc.pk}/")
+        assert data["thumbnail_url"] == (
+            f"http://testserver/dokumente/an1i/thumbnail/{doc.pk}/"
+            f"?v={doc.thumbnail_version()}"
+        )
+
+    def test_detail_without_thumbnail(self, auth_client, db):
+        doc = baker.make_recipe(
+            "apps.documents.document_summary",
+            document=SimpleUploadedFile("summary.txt", b"Zusammenfassung"),
+        )
+        data = auth_client.get(reverse("api:document_detail", args=(doc.pk,))).json()
+        os.remove(doc.document.path)
+        assert data["thumbnail_url"] is None
+
+
+class TestDocumentCategoryView:
+    def test_list(self, auth_client, db):
+        baker.make_recipe("apps.documents.document_summary", _quantity=2)
+        baker.make_recipe("apps.documents.document_exam")
+        baker.make_recipe("apps.documents.document_software")
+        baker.make(document_models.DocumentCategory, name="Empty")
+        data = auth_client.get(reverse("api:document_category_list")).json()
+        assert data["count"] == 2
+        an1i, empty = data["results"]
+        assert an1i["name"] == "An1I"
+        assert an1i["document_count"] == 4
+        assert an1i["summary_count"] == 2
+        assert an1i["exam_count"] == 1
+        assert an1i["other_count"] == 1
+        assert empty["document_count"] == 0
+        assert empty["other_count"] == 0
+
+    def test_detail(self, auth_client, db):
+        doc = baker.make_recipe("apps.documents.document_exam")
+        url = reverse("api:document_category_detail", args=(doc.category.pk,))
+        data = auth_client.get(url, {"fields": "name,exam_count"}).json()
+        assert data == {"name": "An1I", "exam_count": 1}
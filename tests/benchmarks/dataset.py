@@ -0,0 +1,283 @@
+"""A production-sized dataset for the benchmarks.
+
+``build()`` fills the database with ``SIZES`` objects of every kind,
+multiplied by a scale factor. The objects are generated with the baker
+recipes and written with ``bulk_create()``, so no signals run; the derived
+data (search vectors, statistics, leaderboards, event occurrences) is
+computed in bulk afterwards. The raw downloads are generated in SQL,
+creating millions of model instances in Python would take longer than the
+benchmarks themselves.
+
+The random values of the recipes and of ``build()`` are seeded, so the
+dataset is the same on every run (apart from the dates, which are relative
+to today) and reports of different commits can be compared.
+"""
+
+import datetime
+import random
+
+from django.db import connection
+from model_bakery import baker
+from model_bakery.recipe import Recipe
+
+from apps.documents import baker_recipes as document_recipes
+from apps.documents import models as document_models
+from apps.events import models as event_models
+from apps.front import baker_recipes as front_recipes
+from apps.front import models as front_models
+from apps.lecturers import baker_recipes as lecturer_recipes
+from apps.lecturers import models as lecturer_models
+
+SIZES = {
+    "users": 2000,
+    "lecturers": 500,
+    "courses": 20,
+    "categories": 400,
+    "documents": 50000,
+    "downloads": 2000000,
+    "document_ratings": 100000,
+    "lecturer_ratings": 300000,
+    "quotes": 20000,
+    "events": 2000,
+}
+
+# Categories have this many lecturers and courses
+CATEGORY_LECTURERS = 2
+CATEGORY_COURSES = 1
+
+# Every tenth event repeats weekly for a year, every other one of them with
+# a recurrence rule of a semester with a two week break
+REPEATING_EVENTS = 10
+SEMESTER_RULE = "FREQ=WEEKLY;COUNT=16"
+SEMESTER_BREAK = (7 * 7, 8 * 7)
+
+# Downloads are spread over the last two years
+DOWNLOAD_DAYS = 730
+
+BATCH_SIZE = 5000
+
+# The types of the document recipes. The recipes themselves create a file
+# per document, so the documents are prepared with ``baker`` directly.
+DOCUMENT_TYPES = [
+    document_models.Document.DTypes.SUMMARY,
+    document_models.Document.DTypes.EXAM,
+    document_models.Document.DTypes.SOFTWARE,
+    document_models.Document.DTypes.LEARNING_AID,
+]
+
+
+def scaled_sizes(scale=1.0):
+    """Return ``SIZES`` multiplied by ``scale``, at least one of each kind."""
+    return {key: max(1, round(size * scale)) for key, size in SIZES.items()}
+
+
+def _prepare(recipe, count, **numbered):
+    """Prepare ``count`` objects with ``recipe``. The ``numbered`` fields are
+    set to their value formatted with (or, if it is a number, added to) the
+    position of the object, counting from one, to keep them unique."""
+    objects = recipe.prepare(_quantity=count)
+    for i, obj in enumerate(objects, 1):
+        for field, value in numbered.items():
+            setattr(
+                obj, field, value.format(i) if isinstance(value, str) else value + i
+            )
+    return objects
+
+
+def _insert_downloads(documents, count):
+    """Insert ``count`` downloads of ``documents``, one per visitor and day."""
+    table = document_models.DocumentDownload._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            INSERT INTO {table} (document_id, timestamp, day, visitor)
+            SELECT ids[1 + n %% cardinality(ids)],
+                   timestamp,
+                   timestamp::date,
+                   'benchmark-' || n
+            FROM (SELECT %s::integer[] AS ids) AS documents,
+                 generate_series(0, %s - 1) AS n,
+                 LATERAL (
+                     SELECT date_trunc('day', localtimestamp)
+                            - (n %% %s) * interval '1 day'
+                            + (n %% 86400) * interval '1 second' AS timestamp
+                 ) AS timestamps
+            """,
+            [[d.pk for d in documents], count, DOWNLOAD_DAYS],
+        )
+
+
+def build(scale=1.0, seed=0):
+    """Fill the database and return the number of objects of every kind.
+
+    The first user is meant to be logged in by the benchmarks, the first
+    category has the most documents.
+    """
+    sizes = scaled_sizes(scale)
+    rng = random.Random(seed)
+    baker.seed(seed)
+    now = datetime.datetime.now().replace(microsecond=0)
+    today = now.date()
+
+    users = front_models.User.objects.bulk_create(
+        _prepare(
+            front_recipes.user,
+            sizes["users"],
+            username="benchmark{}",
+            email="benchmark{}@example.com",
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+    lecturers = lecturer_models.Lecturer.objects.bulk_create(
+        _prepare(
+            lecturer_recipes.lecturer,
+            sizes["lecturers"],
+            id=0,
+            abbreviation="L{}",
+            last_name="Dozent {}",
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    courses = lecturer_models.Course.objects.bulk_create(
+        _prepare(
+            Recipe(lecturer_models.Course), sizes["courses"], id=0, abbreviation="C{}"
+        )
+    )
+
+    categories = document_models.DocumentCategory.objects.bulk_create(
+        _prepare(document_recipes.documentcategory, sizes["categories"], name="Cat{}"),
+        batch_size=BATCH_SIZE,
+    )
+    document_models.DocumentCategory.lecturers.through.objects.bulk_create(
+        [
+            document_models.DocumentCategory.lecturers.through(
+                documentcategory=category,
+                lecturer=lecturers[(i + j) % len(lecturers)],
+            )
+            for i, category in enumerate(categories)
+            for j in range(min(CATEGORY_LECTURERS, len(lecturers)))
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    document_models.DocumentCategory.courses.through.objects.bulk_create(
+        [
+            document_models.DocumentCategory.courses.through(
+                documentcategory=category, course=courses[(i + j) % len(courses)]
+            )
+            for i, category in enumerate(categories)
+            for j in range(min(CATEGORY_COURSES, len(courses)))
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    # Category sizes follow a power law, like the real subjects
+    weights = [1 / (rank + 1) for rank in range(len(categories))]
+    documents = []
+    for i, dtype in enumerate(DOCUMENT_TYPES):
+        count = sizes["documents"] // len(DOCUMENT_TYPES)
+        if i < sizes["documents"] % len(DOCUMENT_TYPES):
+            count += 1
+        if not count:
+            continue
+        for document in baker.prepare(
+            document_models.Document,
+            _quantity=count,
+            dtype=dtype,
+            category=categories[0],
+            uploader=users[0],
+            document="benchmark/document.pdf",
+            original_filename="document.pdf",
+            file_size=100000,
+        ):
+            document.category = rng.choices(categories, weights)[0]
+            document.uploader = rng.choice(users)
+            document.change_date = now - datetime.timedelta(
+                minutes=rng.randrange(10 * 365 * 24 * 60)
+            )
+            documents.append(document)
+    documents = document_models.Document.objects.bulk_create(
+        documents, batch_size=BATCH_SIZE
+    )
+    document_models.Document.objects.update_search_vector()
+
+    _insert_downloads(documents, sizes["downloads"])
+    document_models.DocumentDownloadDay.objects.rollup()
+
+    # Ratings are spread so that nobody rates the same thing twice, which
+    # limits the number of ratings in small datasets
+    sizes["document_ratings"] = min(
+        sizes["document_ratings"], len(documents) * len(users)
+    )
+    document_models.DocumentRating.objects.bulk_create(
+        [
+            document_models.DocumentRating(
+                user=users[(i // len(documents) + i % len(documents)) % len(users)],
+                document=documents[i % len(documents)],
+                rating=rng.randint(1, 5),
+            )
+            for i in range(sizes["document_ratings"])
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    document_models.DocumentStats.objects.rebuild(batch_size=BATCH_SIZE)
+
+    rating_categories = [c for c, _ in lecturer_models.LecturerRating.CATEGORY_CHOICES]
+    ratings_per_user = len(lecturers) * len(rating_categories)
+    sizes["lecturer_ratings"] = min(
+        sizes["lecturer_ratings"], ratings_per_user * len(users)
+    )
+    lecturer_models.LecturerRating.objects.bulk_create(
+        [
+            lecturer_models.LecturerRating(
+                user=users[(i // ratings_per_user + i % ratings_per_user) % len(users)],
+                lecturer=lecturers[i % len(lecturers)],
+                category=rating_categories[
+                    i // len(lecturers) % len(rating_categories)
+                ],
+                rating=rng.randint(1, 10),
+            )
+            for i in range(sizes["lecturer_ratings"])
+        ],
+        batch_size=BATCH_SIZE,
+    )
+
+    quotes = baker.prepare(
+        lecturer_models.Quote,
+        lecturer=lecturers[0],
+        author=users[0],
+        _quantity=sizes["quotes"],
+    )
+    for quote in quotes:
+        quote.lecturer = rng.choice(lecturers)
+        quote.author = rng.choice(users)
+        quote.upvotes = rng.randrange(20)
+        quote.downvotes = rng.randrange(5)
+    lecturer_models.Quote.objects.bulk_create(quotes, batch_size=BATCH_SIZE)
+
+    events = baker.prepare(
+        event_models.Event,
+        author=users[0],
+        start_date=today,
+        _quantity=sizes["events"],
+    )
+    for i, event in enumerate(events):
+        event.author = rng.choice(users)
+        event.start_date = today + datetime.timedelta(
+            days=rng.randrange(-10 * 365, 365)
+        )
+        if i % (2 * REPEATING_EVENTS) == REPEATING_EVENTS:
+            event.rrule = SEMESTER_RULE
+            event.exdates = [
+                event.start_date + datetime.timedelta(days=days)
+                for days in SEMESTER_BREAK
+            ]
+        elif i % REPEATING_EVENTS == 0:
+            event.repeats = True
+            event.repeat_days = 7
+            event.repeat_ends = event.start_date + datetime.timedelta(days=365)
+    event_models.Event.objects.bulk_create(events, batch_size=BATCH_SIZE)
+    event_models.EventOccurrence.objects.refresh()
+
+    front_models.StatsEntry.objects.refresh(concurrently=False)
+    return sizes
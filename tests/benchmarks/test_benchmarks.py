@@ -0,0 +1,171 @@
+"""Benchmarks of the most frequently used views with a production-sized
+dataset (see ``dataset.py``).
+
+The benchmarks are deselected by default, run them with::
+
+    pytest -m benchmark tests/benchmarks
+
+Building the full dataset takes a few minutes. The environment variables
+``BENCHMARK_SCALE`` (default 1) and ``BENCHMARK_ROUNDS`` (default 5) change
+the size of the dataset and the number of measured requests per view. The
+results are written as JSON to ``BENCHMARK_REPORT`` (default
+``benchmark-report.json``), which can be diffed between commits.
+
+Every view is requested once with an empty cache (``cold_*``), then
+``BENCHMARK_ROUNDS`` times with the cache filled. The latencies are
+measured around the test client, including streamed content. The query
+counts and the database and template times are read from
+``RequestMetricsMiddleware``, the memory peak is measured in an extra
+request with ``tracemalloc``.
+"""
+
+import json
+import os
+import statistics
+import subprocess
+import time
+import tracemalloc
+
+import pytest
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client
+from django.urls import reverse
+
+from apps.documents import models as document_models
+from apps.front import models as front_models
+
+from . import dataset
+
+pytestmark = pytest.mark.benchmark
+
+SCALE = float(os.environ.get("BENCHMARK_SCALE", 1))
+ROUNDS = int(os.environ.get("BENCHMARK_ROUNDS", 5))
+REPORT = os.environ.get("BENCHMARK_REPORT", "benchmark-report.json")
+
+# (URL name, URL arguments, query parameters). The argument "category" is
+# replaced by the category with the most documents.
+ENTRY_POINTS = [
+    ("home", (), {}),
+    ("stats", (), {}),
+    ("documents:documentcategory_list", (), {}),
+    ("documents:document_list", ("category",), {}),
+    ("documents:document_search", (), {"q": "Analysis"}),
+    ("lecturers:lecturer_list", (), {}),
+    ("lecturers:quote_list", (), {}),
+    ("events:event_list", (), {}),
+    ("events:event_calendar", (), {}),
+    ("api:user_list", (), {}),
+    ("api:lecturer_list", (), {}),
+    ("api:quote_list", (), {}),
+    ("api:document_category_list", (), {}),
+    ("api:document_list", (), {}),
+]
+
+
+def _git_revision():
+    try:
+        result = subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except OSError:
+        return None
+    return result.stdout.strip() or None
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 1)
+
+
+@pytest.fixture(scope="module")
+def benchmark_data(django_db_setup, django_db_blocker):
+    """Build the dataset once for all benchmarks, it is rolled back
+    afterwards."""
+    with django_db_blocker.unblock(), transaction.atomic():
+        start = time.perf_counter()
+        sizes = dataset.build(SCALE)
+        category = document_models.DocumentCategory.objects.order_by("pk").first()
+        yield {
+            "sizes": sizes,
+            "build_time": time.perf_counter() - start,
+            "user": front_models.User.objects.order_by("pk").first(),
+            "category": category.name.lower(),
+        }
+        transaction.set_rollback(True)
+
+
+@pytest.fixture(scope="module")
+def report(benchmark_data):
+    results = {}
+    yield results
+    with open(REPORT, "w") as f:
+        json.dump(
+            {
+                "revision": _git_revision(),
+                "scale": SCALE,
+                "rounds": ROUNDS,
+                "sizes": benchmark_data["sizes"],
+                "build_s": round(benchmark_data["build_time"], 1),
+                "results": results,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+        f.write("\n")
+
+
+@pytest.fixture(scope="module")
+def benchmark_client(benchmark_data):
+    client = Client()
+    client.force_login(benchmark_data["user"])
+    return client
+
+
+def request(client, url, params):
+    """Request ``url`` and read the whole response. Returns the response,
+    its content and the elapsed time."""
+    start = time.perf_counter()
+    response = client.get(url, params)
+    if response.streaming:
+        content = b"".join(response.streaming_content)
+    else:
+        content = response.content
+    return response, content, time.perf_counter() - start
+
+
+@pytest.mark.parametrize("view_name, args, params", ENTRY_POINTS)
+def test_benchmark(benchmark_data, report, benchmark_client, view_name, args, params):
+    args = [benchmark_data.get(arg, arg) for arg in args]
+    url = reverse(view_name, args=args)
+
+    cache.clear()
+    cold, content, cold_time = request(benchmark_client, url, params)
+    assert cold.status_code == 200
+
+    rounds = [request(benchmark_client, url, params) for _ in range(ROUNDS)]
+    times = [elapsed for _, _, elapsed in rounds]
+    metrics = [response.request_metrics for response, _, _ in rounds]
+
+    tracemalloc.start()
+    try:
+        request(benchmark_client, url, params)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    report[view_name] = {
+        "cold_ms": _ms(cold_time),
+        "cold_queries": cold.request_metrics.queries,
+        "median_ms": _ms(statistics.median(times)),
+        "min_ms": _ms(min(times)),
+        "max_ms": _ms(max(times)),
+        "queries": max(m.queries for m in metrics),
+        "db_ms": _ms(statistics.median(m.db_time for m in metrics)),
+        "template_ms": _ms(statistics.median(m.template_time for m in metrics)),
+        "peak_memory_kb": round(peak / 1024),
+        "response_kb": round(len(content) / 1024),
+    }
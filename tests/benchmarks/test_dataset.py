@@ -0,0 +1,53 @@
+from django.db import transaction
+
+from apps.documents import models as document_models
+from apps.events import models as event_models
+from apps.front import models as front_models
+from apps.lecturers import models as lecturer_models
+
+from . import dataset
+
+
+def test_scaled_sizes():
+    sizes = dataset.scaled_sizes(0.01)
+    assert sizes["documents"] == dataset.SIZES["documents"] // 100
+    assert min(dataset.scaled_sizes(0).values()) == 1
+
+
+def test_build(db):
+    """Build a small dataset, so that the benchmarks don't rot."""
+    sizes = dataset.build(scale=0.002)
+
+    assert front_models.User.objects.count() == sizes["users"]
+    assert lecturer_models.Lecturer.objects.count() == sizes["lecturers"]
+    assert document_models.Document.objects.count() == sizes["documents"]
+    assert document_models.DocumentDownload.objects.count() == sizes["downloads"]
+    assert document_models.DocumentRating.objects.count() == sizes["document_ratings"]
+    assert lecturer_models.LecturerRating.objects.count() == sizes["lecturer_ratings"]
+    assert lecturer_models.Quote.objects.count() == sizes["quotes"]
+    assert event_models.Event.objects.count() == sizes["events"]
+
+    # The derived data is up to date
+    stats = document_models.DocumentStats.objects.order_by("-download_count")
+    assert stats.count() == sizes["documents"]
+    assert sum(s.download_count for s in stats) == sizes["downloads"]
+    assert front_models.StatsEntry.objects.exists()
+    assert event_models.EventOccurrence.objects.count() > sizes["events"]
+    assert document_models.Document.objects.search("Analysis").exists()
+
+
+def test_build_deterministic(db):
+    """The same dataset is generated on every run."""
+    names = []
+    for _ in range(2):
+        with transaction.atomic():
+            dataset.build(scale=0.001)
+            names.append(
+                list(
+                    document_models.Document.objects.order_by("pk").values_list(
+                        "name", "description", "category__name", "uploader__username"
+                    )
+                )
+            )
+            transaction.set_rollback(True)
+    assert names[0] == names[1]
@@ -1,9 +1,41 @@
+import os
+import subprocess
+import sys
+
 import pytest
 from django.contrib.auth import get_user_model
+from django.core.cache import cache, caches
+from django.db import connection
 
 User = get_user_model()  # FIXME use fixture?
 
 
+@pytest.fixture(autouse=True)
+def clear_cache(request):
+    """Database changes are rolled back between tests, the cache isn't. The
+    shared cache is stored in the database, so it is rolled back after each
+    test, except after transactional ones."""
+    marker = request.node.get_closest_marker("django_db")
+    transactional = "transactional_db" in request.fixturenames or (
+        marker is not None and marker.kwargs.get("transaction", False)
+    )
+    if not transactional:
+        yield
+        cache.clear()
+        return
+    request.getfixturevalue("transactional_db")
+    yield
+    cache.clear()
+    caches["shared"].clear()
+
+
+@pytest.fixture(autouse=True)
+def unbuffered_downloads(settings):
+    """Write document downloads immediately, so they are counted right
+    away."""
+    settings.DOCUMENT_DOWNLOAD_FLUSH_INTERVAL = 0
+
+
 @pytest.fixture
 def user(db):
     return User.objects.create_user(
@@ -15,3 +47,40 @@ def user(db):
 def auth_client(client, user):
     assert client.login(username="testuser", password="test")
     return client
+
+
+@pytest.fixture
+def assert_query_budget():
+    """Return a function that fails if a response ran more SQL queries than
+    its budget. The queries are counted by ``RequestMetricsMiddleware``,
+    those of streaming responses while their content is read."""
+
+    def check(response, budget):
+        if response.streaming:
+            b"".join(response.streaming_content)
+        metrics = response.request_metrics
+        assert metrics.queries <= budget, (
+            f"{metrics.view_name} ran {metrics.queries} queries, "
+            f"its budget is {budget}"
+        )
+
+    return check
+
+
+@pytest.fixture
+def other_process(transactional_db, settings):
+    """Return a function that runs Python code in a new process with the test
+    database, like another application server or management command."""
+
+    def run(code):
+        env = dict(os.environ, POSTGRES_DB_NAME=connection.settings_dict["NAME"])
+        result = subprocess.run(
+            [sys.executable, "manage.py", "shell", "-c", code],
+            cwd=settings.PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        assert result.returncode == 0, result.stderr
+
+    return run
@@ -0,0 +1,123 @@
+from datetime import date, timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.test import RequestFactory
+from model_bakery import baker
+
+from apps.documents import downloads, models
+
+User = get_user_model()
+
+
+@pytest.fixture
+def document(db):
+    return baker.make_recipe("apps.documents.document_summary", public=True)
+
+
+def make_request(user=None, ip="127.0.0.1"):
+    request = RequestFactory().get("/", REMOTE_ADDR=ip)
+    request.user = user or AnonymousUser()
+    return request
+
+
+def test_visitor_key(db, user):
+    assert downloads.visitor_key(make_request(user)) == f"user:{user.pk}"
+    anonymous = downloads.visitor_key(make_request())
+    assert anonymous.startswith("anon:")
+    assert "127.0.0.1" not in anonymous
+    assert anonymous == downloads.visitor_key(make_request())
+    assert anonymous != downloads.visitor_key(make_request(ip="10.0.0.1"))
+
+
+def test_buffered_downloads(document, user, settings, django_assert_num_queries):
+    settings.DOCUMENT_DOWNLOAD_FLUSH_INTERVAL = 3600
+    buffer = downloads.DownloadBuffer()
+    try:
+        with django_assert_num_queries(0):
+            for _ in range(3):
+                buffer.add(document.pk, "user:1")
+            buffer.add(document.pk, "user:2")
+        assert len(buffer) == 2
+        assert document.downloadcount() == 0
+    finally:
+        # Three queries and the savepoint
+        with django_assert_num_queries(5):
+            assert buffer.flush() == 2
+    assert models.DocumentDownload.objects.count() == 2
+    assert document.downloadcount() == 2
+    assert buffer.flush() == 0
+
+
+def test_daily_dedup_across_batches(document, user):
+    other = baker.make(User, username="other")
+    downloads.record_download(make_request(user), document)
+    downloads.record_download(make_request(user), document)
+    # The deduplication is per user, not global
+    downloads.record_download(make_request(other), document)
+    downloads.record_download(make_request(), document)
+    assert models.DocumentDownload.objects.count() == 3
+    assert document.downloadcount() == 3
+
+
+def test_deleted_document(document):
+    buffer = downloads.DownloadBuffer()
+    buffer._pending.add((document.pk + 1, "user:1", document.upload_date.date()))
+    buffer._pending.add((document.pk, "user:1", document.upload_date.date()))
+    assert buffer.flush() == 2
+    assert models.DocumentDownload.objects.get().document == document
+
+
+def test_rollup(document, settings):
+    today = date.today()
+    for days_ago, visitor in [(100, "a"), (100, "b"), (2, "a"), (1, "a"), (0, "a")]:
+        models.DocumentDownload.objects.create(
+            document=document, visitor=visitor, day=today - timedelta(days_ago)
+        )
+    assert document.downloadcount() == 5
+
+    settings.DOCUMENT_DOWNLOAD_RETENTION_DAYS = 30
+    call_command("rollup_document_downloads")
+    rollup = models.DocumentDownloadDay.objects.values_list("day", "count")
+    assert dict(rollup) == {
+        today - timedelta(100): 2,
+        today - timedelta(2): 1,
+        today - timedelta(1): 1,
+    }
+    assert models.DocumentDownloadDay.objects.rolled_up_until() == today - timedelta(1)
+    # Old raw downloads are pruned, the last rolled up day and today are kept
+    assert sorted(models.DocumentDownload.objects.values_list("day", flat=True)) == [
+        today - timedelta(2),
+        today - timedelta(1),
+        today,
+    ]
+
+    # Counts are read from the rollup and the tail
+    models.DocumentDownload.objects.create(document=document, visitor="b", day=today)
+    models.DocumentStats.objects.rebuild()
+    assert document.downloadcount() == 6
+
+    # Rolling up again recounts the last day, but doesn't count twice
+    models.DocumentDownload.objects.create(
+        document=document, visitor="b", day=today - timedelta(1)
+    )
+    models.DocumentDownloadDay.objects.rollup()
+    assert models.DocumentDownloadDay.objects.get(day=today - timedelta(1)).count == 2
+    models.DocumentStats.objects.refresh_downloads([document.pk])
+    assert document.downloadcount() == 7
+
+
+def test_refresh_downloads_single_statement(document, django_assert_num_queries):
+    """The last rolled up day is read in the same statement as the counts, so
+    a concurrent rollup can't be counted twice."""
+    today = date.today()
+    for days_ago in [2, 1, 0]:
+        models.DocumentDownload.objects.create(
+            document=document, visitor="a", day=today - timedelta(days_ago)
+        )
+    models.DocumentDownloadDay.objects.rollup(until=today - timedelta(1))
+    with django_assert_num_queries(1):
+        models.DocumentStats.objects.refresh_downloads([document.pk])
+    assert document.downloadcount() == 3
@@ -0,0 +1,155 @@
+import datetime
+import io
+import os
+import zipfile
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from model_bakery import baker
+
+from apps.documents import extraction, models
+
+DOCX_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/'
+    'wordprocessingml/2006/main"><w:body>'
+    "<w:p><w:r><w:t>Fourier</w:t></w:r><w:r><w:t>transformation</w:t></w:r></w:p>"
+    "<w:p><w:r><w:t>Laplace</w:t></w:r></w:p>"
+    "</w:body></w:document>"
+)
+
+
+def make_docx():
+    data = io.BytesIO()
+    with zipfile.ZipFile(data, "w") as archive:
+        archive.writestr("word/document.xml", DOCX_XML)
+    return data.getvalue()
+
+
+@pytest.fixture
+def make_document(db):
+    documents = []
+    category = baker.make_recipe("apps.documents.documentcategory")
+
+    def make(filename, content):
+        doc = models.Document.objects.create(
+            name="Zusammenfassung",
+            dtype=models.Document.DTypes.SUMMARY,
+            category=category,
+            document=SimpleUploadedFile(filename, content),
+        )
+        documents.append(doc)
+        return doc
+
+    yield make
+    for doc in documents:
+        if os.path.exists(doc.document.path):
+            os.remove(doc.document.path)
+
+
+def test_extract_docx(tmp_path):
+    path = tmp_path / "summary.docx"
+    path.write_bytes(make_docx())
+    assert extraction.extract_text(str(path)) == "Fouriertransformation\nLaplace"
+
+
+def test_extract_invalid_archive(tmp_path):
+    path = tmp_path / "summary.docx"
+    path.write_bytes(b"no zip file")
+    with pytest.raises(extraction.ExtractionError):
+        extraction.extract_text(str(path))
+
+
+def test_extract_archive_too_large(tmp_path, monkeypatch):
+    path = tmp_path / "summary.docx"
+    path.write_bytes(make_docx())
+    monkeypatch.setattr(extraction, "MAX_ARCHIVE_SIZE", len(DOCX_XML) - 1)
+    with pytest.raises(extraction.ExtractionError, match="too large"):
+        extraction.extract_text(str(path))
+
+
+def test_split_chunks():
+    text = "eins zwei\n\ndrei  vier\nfünf"
+    assert extraction.split_chunks(text) == ["eins zwei\ndrei vier\nfünf"]
+    assert extraction.split_chunks(text, size=10) == ["eins zwei", "drei vier", "fünf"]
+    assert extraction.split_chunks("x" * 25, size=10) == ["x" * 10, "x" * 10, "x" * 5]
+    assert extraction.split_chunks("  \n ") == []
+
+
+def test_extract_command(make_document, monkeypatch):
+    doc = make_document("summary.docx", make_docx())
+    pdf = make_document("exam.pdf", b"%PDF-1.4")
+    make_document("archive.7z", b"7z")
+    monkeypatch.setattr(
+        extraction, "_extract_pdf", lambda path, timeout=None: "Eigenwerte"
+    )
+
+    call_command("extract_document_text", "--workers", "2")
+    assert models.DocumentContent.objects.count() == 3
+    assert not models.Document.objects.with_outdated_content().exists()
+    assert list(models.Document.objects.search("laplace")) == [doc]
+    assert list(models.Document.objects.search("eigenwert")) == [pdf]
+
+    # Only changed documents are processed again
+    extracted = []
+
+    def fake_extract(path, timeout=None):
+        extracted.append(path)
+        return "Taylorreihe"
+
+    monkeypatch.setattr(extraction, "extract_text", fake_extract)
+    pdf.change_date = datetime.datetime.now()
+    pdf.save()
+    call_command("extract_document_text")
+    assert extracted == [pdf.document.path]
+    assert list(models.Document.objects.search("taylorreihe")) == [pdf]
+    assert not models.Document.objects.search("eigenwert").exists()
+
+
+def test_extract_command_failure(make_document, monkeypatch, capsys):
+    doc = make_document("summary.docx", b"broken")
+    call_command("extract_document_text")
+    content = models.DocumentContent.objects.get(document=doc)
+    assert content.error
+    assert not content.chunks.exists()
+    assert doc.document.path in capsys.readouterr().err
+
+    # Failed extractions are not retried until the file changes
+    assert not models.Document.objects.with_outdated_content().exists()
+
+
+def test_search_ranks_metadata_higher(make_document):
+    in_name = make_document("a.txt", b"")
+    in_name.name = "Eigenwerte"
+    in_name.save()
+    in_content = make_document("b.txt", b"")
+    models.DocumentContent.objects.store(
+        in_content.pk, in_content.change_date, chunks=["Eigenwerte und Eigenvektoren"]
+    )
+    assert list(models.Document.objects.search("eigenwerte")) == [
+        in_name,
+        in_content,
+    ]
+
+
+def test_search_matches_once(make_document):
+    doc = make_document("a.txt", b"")
+    doc.name = "Eigenwerte"
+    doc.save()
+    models.DocumentContent.objects.store(
+        doc.pk, doc.change_date, chunks=["Eigenwerte", "Eigenwerte und Eigenvektoren"]
+    )
+    assert list(models.Document.objects.search("eigenwerte")) == [doc]
+
+
+@pytest.mark.django_db
+def test_search_uses_indexes():
+    """Both the metadata and the content are searched with their indexes,
+    not by scanning all documents."""
+    with connection.cursor() as cursor:
+        cursor.execute("SET LOCAL enable_seqscan = off")
+    plan = models.Document.objects.search("eigenwerte").explain()
+    assert "documents_search_idx" in plan
+    assert "documents_content_search_idx" in plan
+    assert "Seq Scan" not in plan
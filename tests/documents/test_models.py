@@ -3,6 +3,7 @@ import datetime
 import pytest
 from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.db import IntegrityError
 from model_bakery import baker
 
@@ -93,6 +94,73 @@ class TestDocumentModel:
         models.DocumentDownload.objects.create(document=document)
         assert document.downloadcount() == 3
 
+    def test_stats(self, document, marc):
+        """The denormalized statistics follow downloads and ratings."""
+        models.DocumentDownload.objects.create(document=document)
+        stats = models.DocumentStats.objects.get(document=document)
+        assert stats.download_count == 1
+        assert stats.rating_sum == 7
+        assert stats.rating_count == 2
+
+        rating = models.DocumentRating.objects.get(document=document, user=marc)
+        rating.rating = 9
+        rating.save()
+        assert document.rating() == 6
+
+        rating.delete()
+        assert document.rating() == 2
+        assert document.rating_count() == 1
+
+    def test_with_stats(self, document, django_assert_num_queries):
+        models.DocumentDownload.objects.create(document=document)
+        with django_assert_num_queries(1):
+            doc = models.Document.objects.with_stats().get(pk=document.pk)
+            assert doc.downloadcount() == 1
+            assert doc.rating() == 4
+            assert doc.rating_count() == 2
+
+    def test_rebuild_stats(self, document):
+        models.DocumentDownload.objects.create(document=document)
+        models.DocumentStats.objects.filter(document=document).update(
+            download_count=42, rating_sum=0, rating_count=0
+        )
+        call_command("rebuild_document_stats")
+        assert document.downloadcount() == 1
+        assert document.rating() == 4
+        assert document.rating_count() == 2
+
+    def test_delete_with_stats(self, document):
+        document.delete()
+        assert not models.DocumentStats.objects.exists()
+
+    def test_search(self, document):
+        other = models.Document.objects.create(
+            name="Lineare Algebra",
+            dtype=models.Document.DTypes.SUMMARY,
+            description="Zusammenfassung mit Beispielen zur Analysis",
+        )
+        results = list(models.Document.objects.search("analysis"))
+        # Matches in the name are ranked higher than in the description
+        assert results == [document, other]
+        assert list(models.Document.objects.search("theoriesammlung")) == [document]
+        assert not models.Document.objects.search("Stochastik").exists()
+
+    def test_search_category(self, document):
+        category = models.DocumentCategory.objects.create(
+            name="AnI1", description="Infinitesimalrechnung"
+        )
+        document.category = category
+        document.save()
+        assert list(models.Document.objects.search("infinitesimalrechnung")) == [
+            document
+        ]
+
+        # Renaming the category updates the search index of its documents
+        category.description = "Differentialrechnung"
+        category.save()
+        assert not models.Document.objects.search("infinitesimalrechnung").exists()
+        assert models.Document.objects.search("differentialrechnung").exists()
+
     @pytest.mark.django_db
     def test_license_details_cc(self):
         """Test the details of a CC license."""
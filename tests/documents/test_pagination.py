@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta
+
+import pytest
+from model_bakery import baker
+
+from apps.documents import models, pagination
+
+
+@pytest.fixture
+def documents(db):
+    """25 documents, the change dates are the same in groups of five."""
+    category = baker.make(models.DocumentCategory, name="An1I")
+    start = datetime(2020, 1, 1)
+    return [
+        baker.make(
+            models.Document,
+            category=category,
+            document="a.pdf",
+            change_date=start + timedelta(days=i // 5),
+        )
+        for i in range(25)
+    ]
+
+
+def test_paginate(documents):
+    expected = sorted(documents, key=lambda d: (-d.change_date.timestamp(), d.pk))
+    queryset = models.Document.objects.all()
+    pages = []
+    cursor = None
+    while True:
+        page, cursor = pagination.paginate(queryset, cursor, size=7)
+        pages.append(page)
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [7, 7, 7, 4]
+    assert [doc for page in pages for doc in page] == expected
+
+
+def test_paginate_exact_page(documents):
+    page, cursor = pagination.paginate(models.Document.objects.all(), size=25)
+    assert len(page) == 25
+    assert cursor is None
+
+
+@pytest.mark.parametrize("cursor", ["invalid", "aW52YWxpZA", "MjAyMHwx"])
+def test_invalid_cursor(db, cursor):
+    with pytest.raises(ValueError):
+        pagination.paginate(models.Document.objects.all(), cursor)
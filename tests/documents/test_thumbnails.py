@@ -0,0 +1,156 @@
+import os
+import subprocess
+from datetime import datetime
+
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from model_bakery import baker
+
+from apps.documents import models, thumbnails
+
+
+@pytest.fixture
+def pdf_document(db):
+    category = baker.make_recipe("apps.documents.documentcategory")
+    doc = models.Document.objects.create(
+        dtype=models.Document.DTypes.SUMMARY,
+        category=category,
+        document=SimpleUploadedFile("summary.pdf", b"%PDF-1.4"),
+    )
+    yield doc
+    for path in [doc.document.path, thumbnails.thumbnail_path(doc.document.path)]:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def test_process_job(pdf_document, monkeypatch):
+    def fake_generate(document_path, thumbnail_path, timeout=None):
+        with open(thumbnail_path, "wb") as f:
+            f.write(b"PNG")
+
+    monkeypatch.setattr(thumbnails, "generate_thumbnail", fake_generate)
+    models.ThumbnailJob.objects.enqueue(pdf_document)
+    call_command("process_thumbnail_jobs", "--once")
+    assert os.path.exists(thumbnails.thumbnail_path(pdf_document.document.path))
+    assert not models.ThumbnailJob.objects.exists()
+
+
+def test_process_job_failure(pdf_document, monkeypatch):
+    def failing_generate(document_path, thumbnail_path, timeout=None):
+        raise subprocess.CalledProcessError(1, "gm", output=b"broken pdf")
+
+    monkeypatch.setattr(thumbnails, "generate_thumbnail", failing_generate)
+    models.ThumbnailJob.objects.enqueue(pdf_document)
+    call_command("process_thumbnail_jobs", "--once")
+    job = models.ThumbnailJob.objects.get(document=pdf_document)
+    assert job.attempts == thumbnails.MAX_ATTEMPTS
+    assert "broken pdf" in job.last_error
+
+    # A new upload resets the attempts
+    models.ThumbnailJob.objects.enqueue(pdf_document, retry=True)
+    job.refresh_from_db()
+    assert job.attempts == 0
+
+
+def test_process_job_claimed(transactional_db, pdf_document, monkeypatch):
+    """The job is claimed, not locked, while the thumbnail is generated."""
+
+    def fake_generate(document_path, thumbnail_path, timeout=None):
+        assert not connection.in_atomic_block
+        job = models.ThumbnailJob.objects.get(document=pdf_document)
+        assert job.claimed is not None
+        assert job.attempts == 1
+        # Other workers skip it
+        assert thumbnails.claim_next_job() is None
+        with open(thumbnail_path, "wb") as f:
+            f.write(b"PNG")
+
+    monkeypatch.setattr(thumbnails, "generate_thumbnail", fake_generate)
+    models.ThumbnailJob.objects.enqueue(pdf_document)
+    assert thumbnails.process_next_job()
+    assert not models.ThumbnailJob.objects.exists()
+
+
+def test_process_job_queued_again(pdf_document, monkeypatch):
+    """Jobs queued again while they are processed are kept."""
+
+    def fake_generate(document_path, thumbnail_path, timeout=None):
+        models.ThumbnailJob.objects.enqueue(pdf_document, retry=True)
+        raise subprocess.CalledProcessError(1, "gm", output=b"broken pdf")
+
+    monkeypatch.setattr(thumbnails, "generate_thumbnail", fake_generate)
+    models.ThumbnailJob.objects.enqueue(pdf_document)
+    assert thumbnails.process_next_job()
+    job = models.ThumbnailJob.objects.get(document=pdf_document)
+    assert job.claimed is None
+    assert job.attempts == 0
+    assert job.last_error == ""
+
+
+def test_claim_stale_job(pdf_document):
+    models.ThumbnailJob.objects.enqueue(pdf_document)
+    job = thumbnails.claim_next_job()
+    assert thumbnails.claim_next_job() is None
+
+    # The worker crashed
+    job.claimed = datetime.now() - thumbnails.CLAIM_TIMEOUT
+    job.save()
+    assert thumbnails.claim_next_job() == job
+
+
+def test_placeholder_missing(monkeypatch):
+    monkeypatch.setattr(thumbnails, "PLACEHOLDER", "img/missing.gif")
+    thumbnails.placeholder.cache_clear()
+    try:
+        with pytest.raises(ImproperlyConfigured):
+            thumbnails.placeholder()
+    finally:
+        thumbnails.placeholder.cache_clear()
+
+
+def test_generate_thumbnails_command(pdf_document, monkeypatch, capsys):
+    rendered = []
+
+    def fake_generate(document_path, thumbnail_path, timeout=None):
+        rendered.append(document_path)
+        with open(thumbnail_path, "wb") as f:
+            f.write(b"PNG")
+
+    monkeypatch.setattr(thumbnails, "generate_thumbnail", fake_generate)
+    models.ThumbnailJob.objects.enqueue(pdf_document)
+    call_command("generate_thumbnails", "--workers", "2")
+    assert rendered == [pdf_document.document.path]
+    assert not models.ThumbnailJob.objects.exists()
+
+    # Up to date thumbnails are skipped
+    call_command("generate_thumbnails")
+    assert len(rendered) == 1
+    assert "1 thumbnail(s) up to date, 0 to generate." in capsys.readouterr().out
+
+
+def test_generate_thumbnails_command_failure(pdf_document, monkeypatch, capsys):
+    def failing_generate(document_path, thumbnail_path, timeout=None):
+        raise subprocess.TimeoutExpired("gm", timeout)
+
+    monkeypatch.setattr(thumbnails, "generate_thumbnail", failing_generate)
+    call_command("generate_thumbnails", "--timeout", "1")
+    captured = capsys.readouterr()
+    assert "Generated 0 thumbnail(s), 1 failed." in captured.out
+    assert f"{pdf_document.document.path}: timeout" in captured.err
+
+
+def test_generate_thumbnails_command_missing_gm(pdf_document, monkeypatch, capsys):
+    def failing_generate(document_path, thumbnail_path, timeout=None):
+        raise FileNotFoundError(2, "No such file or directory", "gm")
+
+    monkeypatch.setattr(thumbnails, "generate_thumbnail", failing_generate)
+    models.ThumbnailJob.objects.enqueue(pdf_document)
+    call_command("generate_thumbnails")
+    captured = capsys.readouterr()
+    assert "Generated 0 thumbnail(s), 1 failed." in captured.out
+    assert "No such file or directory" in captured.err
+    # The job stays queued for the worker
+    assert models.ThumbnailJob.objects.exists()
@@ -1,15 +1,20 @@
+import os
 from base64 import b64decode
+from datetime import datetime, timedelta
 
 import pytest
 from bs4 import BeautifulSoup
 from django.contrib.auth import get_user_model
 from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from model_bakery import baker
+from pytest_django.asserts import assertContains
 
-from apps.documents import forms, models
+from apps.documents import forms, models, thumbnails
 
 User = get_user_model()
 
@@ -95,7 +100,15 @@ def test_document_thumbnail_view(client):
     url = reverse("documents:document_thumbnail", args=(doc.category.name, doc.pk))
     response = client.get(url)
 
+    # The thumbnail is generated in the background, until then a placeholder
+    # is served.
     assert response.status_code == 200
+    assert response["Content-Type"] == "image/gif"
+    assert response["Cache-Control"] == "max-age=30"
+    assert models.ThumbnailJob.objects.filter(document=doc).count() == 1
+
+    client.get(url)
+    assert models.ThumbnailJob.objects.filter(document=doc).count() == 1
 
 
 class DocumentcategoryListViewTest(TestCase):
@@ -133,6 +146,40 @@ class DocumentcategoryListViewTest(TestCase):
         self.assertContains(self.response, '<span class="icon-test"></span>1 Prüfung')
         self.assertContains(self.response, '<span class="icon-doc-alt"></span>2 Andere')
 
+    def testCached(self):
+        """Test whether the grid is served from the cache until a document is
+        added."""
+        url = reverse("documents:documentcategory_list")
+        # Only the version is read from the shared cache
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertContains(response, '<span class="icon-test"></span>1 Prüfung')
+
+        baker.make_recipe("apps.documents.document_exam")
+        response = self.client.get(url)
+        self.assertContains(response, '<span class="icon-test"></span>2 Prüfungen')
+
+    def testCacheInvalidatedByCategory(self):
+        url = reverse("documents:documentcategory_list")
+        category = models.DocumentCategory.objects.get(name="An1I")
+        category.lecturers.add(baker.make_recipe("apps.lecturers.lecturer"))
+        response = self.client.get(url)
+        self.assertContains(response, ">KRA</a>")
+
+
+def test_documentcategory_list_invalidated_by_other_process(client, other_process):
+    """Changes made by another process invalidate the cached grid of this
+    one."""
+    baker.make_recipe("apps.documents.document_exam")
+    url = reverse("documents:documentcategory_list")
+    assertContains(client.get(url), '<span class="icon-test"></span>1 Prüfung')
+
+    other_process(
+        "from model_bakery import baker; "
+        "baker.make_recipe('apps.documents.document_exam')"
+    )
+    assertContains(client.get(url), '<span class="icon-test"></span>2 Prüfungen')
+
 
 class DocumentcategoryAddViewTest(TestCase):
     taburl = "/dokumente/add/"
@@ -336,6 +383,17 @@ class DocumentListViewTest(TestCase):
         document2 = anchor2.find_parent("article").prettify()
         assert "1 Download" in document2
 
+    def testConstantQueryCount(self):
+        """The number of queries doesn't depend on the number of documents."""
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+        baker.make_recipe(
+            "apps.documents.document_summary", uploader=self.user2, _quantity=5
+        )
+        with self.assertNumQueries(2):
+            self.client.get(self.url)
+
     def testNullValueUploader(self):
         """Test whether a document without an uploader does not raise an error."""
         doc = baker.make_recipe(
@@ -354,3 +412,152 @@ class DocumentListViewTest(TestCase):
         response = self.client.get(self.url)
         self.assertContains(response, "Durchschnitt")
         self.assertContains(response, "Deine Bewertung")
+
+
+@pytest.mark.django_db
+def test_document_add_queues_thumbnail(auth_client):
+    category = baker.make_recipe("apps.documents.documentcategory")
+    url = reverse("documents:document_add", args=(category.name.lower(),))
+    data = {
+        "name": "Zusammenfassung",
+        "dtype": models.Document.DTypes.SUMMARY,
+        "document": generate_pdf(),
+    }
+    response = auth_client.post(url, data)
+    assert response.status_code == 302
+    doc = models.Document.objects.get(name="Zusammenfassung")
+    assert models.ThumbnailJob.objects.filter(document=doc).exists()
+
+
+@pytest.mark.django_db
+def test_document_download_not_modified(client):
+    doc = baker.make_recipe("apps.documents.document_summary", public=True)
+    url = reverse("documents:document_download", args=(doc.category.name, doc.pk))
+    response = client.get(url)
+    assert response.status_code == 200
+    etag = response["ETag"]
+    assert response["Last-Modified"]
+    models.DocumentDownload.objects.all().delete()
+
+    # Revalidated downloads are not logged
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304
+    assert response["ETag"] == etag
+    assert not models.DocumentDownload.objects.exists()
+
+
+@pytest.mark.django_db
+def test_document_thumbnail_caching(client):
+    category = baker.make_recipe("apps.documents.documentcategory")
+    doc = models.Document.objects.create(
+        dtype=models.Document.DTypes.SUMMARY,
+        category=category,
+        document=generate_pdf(),
+    )
+    thumbnail_path = thumbnails.thumbnail_path(doc.document.path)
+    with open(thumbnail_path, "wb") as f:
+        f.write(b"PNG")
+    try:
+        url = reverse("documents:document_thumbnail", args=(category.name, doc.pk))
+        response = client.get(url, {"v": doc.thumbnail_version()})
+        assert response.status_code == 200
+        assert "immutable" in response["Cache-Control"]
+        assert "max-age=31536000" in response["Cache-Control"]
+
+        # Outdated or missing versions must not be cached forever
+        response = client.get(url, {"v": 1})
+        assert "Cache-Control" not in response
+
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+        assert response.status_code == 304
+    finally:
+        os.remove(thumbnail_path)
+
+
+@pytest.mark.django_db
+def test_document_search(client):
+    doc = baker.make_recipe(
+        "apps.documents.document_summary", name="Theoriesammlung Physik"
+    )
+    baker.make_recipe("apps.documents.document_summary", name="Analysis")
+    url = reverse("documents:document_search")
+
+    response = client.get(url)
+    assert response.status_code == 200
+    assert list(response.context["documents"]) == []
+
+    response = client.get(url, {"q": "physik"})
+    assert response.status_code == 200
+    assert list(response.context["documents"]) == [doc]
+    assert "Theoriesammlung Physik" in response.content.decode("utf-8")
+
+
+@pytest.mark.parametrize("view", ["document_list", "user"])
+def test_self_rating_constant_query_count(auth_client, user, view):
+    """The number of queries must not depend on the number of documents rated
+    by the user."""
+    uploader = baker.make(User)
+    other_category = baker.make(models.DocumentCategory, name="Other")
+
+    def add_ratings(count):
+        for _ in range(count):
+            for category in [None, other_category]:
+                extra = {"category": category} if category else {}
+                document = baker.make_recipe(
+                    "apps.documents.document_summary", uploader=uploader, **extra
+                )
+                baker.make(
+                    models.DocumentRating, document=document, user=user, rating=7
+                )
+
+    if view == "user":
+        url = reverse("user", args=(uploader.pk, uploader.username))
+    else:
+        url = reverse("documents:document_list", args=("an1i",))
+
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            response = auth_client.get(url)
+        assertContains(response, "Deine Bewertung (7/10)")
+        return len(queries)
+
+    add_ratings(2)
+    baseline = count_queries()
+    add_ratings(20)
+    assert count_queries() == baseline
+
+
+def test_document_list_pagination(auth_client, db):
+    category = baker.make(models.DocumentCategory, name="An1I")
+    start = datetime(2020, 1, 1)
+    for i in range(60):
+        baker.make(
+            models.Document,
+            name=f"Dokument {i}",
+            category=category,
+            dtype=(
+                models.Document.DTypes.EXAM if i % 2 else models.Document.DTypes.SUMMARY
+            ),
+            document="a.pdf",
+            change_date=start + timedelta(hours=i),
+        )
+    url = reverse("documents:document_list", args=("an1i",))
+
+    response = auth_client.get(url)
+    assert len(response.context["documents"]) == 50
+    assert response.context["documents"][0].name == "Dokument 59"
+    assert "first_page_url" not in response.context
+
+    response = auth_client.get(url + response.context["next_page_url"])
+    assert [doc.name for doc in response.context["documents"]] == [
+        f"Dokument {i}" for i in range(9, -1, -1)
+    ]
+    assert "next_page_url" not in response.context
+    assertContains(response, "Neueste")
+
+    response = auth_client.get(url, {"dtype": models.Document.DTypes.EXAM})
+    documents = response.context["documents"]
+    assert len(documents) == 30
+    assert {doc.dtype for doc in documents} == {models.Document.DTypes.EXAM}
+
+    assert auth_client.get(url, {"cursor": "invalid"}).status_code == 404
@@ -0,0 +1,36 @@
+import pytest
+
+from apps.events import forms
+
+DATA = {
+    "summary": "Stamm",
+    "description": "Jeden Dienstag",
+    "start_date": "02.06.2020",
+}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "data, valid",
+    [
+        ({}, True),
+        ({"rrule": "FREQ=WEEKLY;UNTIL=20200630", "exdates": "09.06.2020"}, True),
+        ({"rrule": "FREQ=WEEKLY"}, False),
+        ({"rrule": "FREQ=HOURLY;COUNT=3"}, False),
+        ({"rrule": "FREQ=DAILY;UNTIL=29991231"}, False),
+        ({"repeats": True, "repeat_days": 1, "repeat_ends": "31.12.2099"}, False),
+        ({"repeats": True, "repeat_days": 7, "repeat_ends": "30.06.2020"}, True),
+        (
+            {
+                "repeats": True,
+                "repeat_days": 7,
+                "repeat_ends": "30.06.2020",
+                "rrule": "FREQ=WEEKLY;COUNT=3",
+            },
+            False,
+        ),
+    ],
+)
+def test_event_form_recurrence(data, valid):
+    form = forms.EventForm(data={**DATA, **data})
+    assert form.is_valid() == valid, form.errors
@@ -0,0 +1,87 @@
+import datetime
+
+from model_bakery import baker
+
+from apps.events import ical, models
+
+
+def test_escape():
+    assert ical.escape("a,b;c\\d\ne") == "a\\,b\\;c\\\\d\\ne"
+
+
+def test_fold():
+    assert ical.fold("SUMMARY:kurz") == "SUMMARY:kurz\r\n"
+    line = "DESCRIPTION:" + "ä" * 100
+    folded = ical.fold(line)
+    lines = folded.split("\r\n")[:-1]
+    assert all(len(line.encode()) <= 75 for line in lines)
+    assert all(line.startswith(" ") for line in lines[1:])
+    assert "".join(line[1:] if i else line for i, line in enumerate(lines)) == line
+
+
+def test_serialize_event():
+    event = baker.prepare(
+        models.Event,
+        id=42,
+        summary="Grillabend, Gebäude 1",
+        description="Mitbringen:\nWurst",
+        start_date=datetime.date(2020, 6, 1),
+        end_date=datetime.date(2020, 6, 2),
+        author=None,
+    )
+    vevent = ical.serialize_event(event, "20200101T000000Z")
+    assert vevent.startswith("BEGIN:VEVENT\r\n")
+    assert vevent.endswith("END:VEVENT\r\n")
+    assert "UID:42@studentenportal.ch\r\n" in vevent
+    assert "DTSTART;VALUE=DATE:20200601\r\n" in vevent
+    assert "DTEND:20200602T235959\r\n" in vevent
+    assert "SUMMARY:Grillabend\\, Gebäude 1\r\n" in vevent
+    assert "DESCRIPTION:Mitbringen:\\nWurst\r\n" in vevent
+    assert "COMMENT" not in vevent
+    assert "RRULE" not in vevent
+
+
+def test_serialize_recurring_event():
+    event = baker.prepare(
+        models.Event,
+        id=42,
+        start_date=datetime.date(2020, 6, 2),
+        start_time=datetime.time(18, 15),
+        rrule="FREQ=WEEKLY;UNTIL=20200630",
+        exdates=[datetime.date(2020, 6, 9), datetime.date(2020, 6, 16)],
+        author=None,
+    )
+    vevent = ical.serialize_event(event, "20200101T000000Z")
+    assert "DTSTART:20200602T181500\r\n" in vevent
+    assert "RRULE:FREQ=WEEKLY;UNTIL=20200630T235959\r\n" in vevent
+    assert "EXDATE:20200609T181500,20200616T181500\r\n" in vevent
+
+
+def test_serialize_repeated_event():
+    """Events repeated every few days get an equivalent rule."""
+    event = baker.prepare(
+        models.Event,
+        start_date=datetime.date(2020, 6, 1),
+        repeats=True,
+        repeat_days=14,
+        repeat_ends=datetime.date(2020, 8, 1),
+        exdates=[datetime.date(2020, 6, 15)],
+        author=None,
+    )
+    vevent = ical.serialize_event(event, "20200101T000000Z")
+    assert "DTSTART;VALUE=DATE:20200601\r\n" in vevent
+    assert "RRULE:FREQ=DAILY;INTERVAL=14;UNTIL=20200801\r\n" in vevent
+    assert "EXDATE;VALUE=DATE:20200615\r\n" in vevent
+
+
+def test_iter_calendar_chunks():
+    events = baker.prepare(
+        models.Event, start_date=datetime.date(2020, 6, 1), author=None, _quantity=5
+    )
+    chunks = list(ical.iter_calendar(events, chunk_size=2))
+    # Header, two chunks of two events, the last event and the footer
+    assert len(chunks) == 4
+    calendar = "".join(chunks)
+    assert calendar.startswith("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+    assert calendar.endswith("END:VEVENT\r\nEND:VCALENDAR\r\n")
+    assert calendar.count("BEGIN:VEVENT") == 5
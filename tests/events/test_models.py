@@ -60,3 +60,101 @@ class TestEventModel:
             event.save()
         except IntegrityError:
             pytest.fail("An event with no author should not throw an IntegrityError.")
+
+
+@pytest.mark.django_db
+class TestEventOccurrences:
+    def occurrence_dates(self, event):
+        return list(
+            event.occurrences.order_by("start_date").values_list(
+                "start_date", "end_date"
+            )
+        )
+
+    def test_single(self):
+        event = baker.make(models.Event, start_date=datetime.date(2020, 6, 1))
+        assert self.occurrence_dates(event) == [
+            (datetime.date(2020, 6, 1), datetime.date(2020, 6, 1))
+        ]
+
+    def test_repeated(self):
+        event = baker.make(
+            models.Event,
+            start_date=datetime.date(2020, 6, 1),
+            end_date=datetime.date(2020, 6, 2),
+            repeats=True,
+            repeat_days=7,
+            repeat_ends=datetime.date(2020, 6, 15),
+        )
+        assert self.occurrence_dates(event) == [
+            (datetime.date(2020, 6, 1), datetime.date(2020, 6, 2)),
+            (datetime.date(2020, 6, 8), datetime.date(2020, 6, 9)),
+            (datetime.date(2020, 6, 15), datetime.date(2020, 6, 16)),
+        ]
+
+        # Refreshed when the event changes
+        event.repeat_ends = datetime.date(2020, 6, 14)
+        event.save()
+        assert len(self.occurrence_dates(event)) == 2
+        event.repeats = False
+        event.save()
+        assert len(self.occurrence_dates(event)) == 1
+
+    def test_incomplete_repetition(self):
+        event = baker.make(
+            models.Event,
+            start_date=datetime.date(2020, 6, 1),
+            repeats=True,
+            repeat_days=None,
+            repeat_ends=datetime.date(2020, 6, 15),
+        )
+        assert len(self.occurrence_dates(event)) == 1
+
+    def test_refresh_all(self):
+        baker.make(models.Event, start_date=datetime.date(2020, 6, 1), _quantity=3)
+        models.EventOccurrence.objects.all().delete()
+        models.EventOccurrence.objects.refresh()
+        assert models.EventOccurrence.objects.count() == 3
+
+    def test_occurrences_window(self):
+        baker.make(
+            models.Event,
+            summary="Stamm",
+            start_date=datetime.date(2020, 6, 1),
+            end_date=datetime.date(2020, 6, 2),
+            repeats=True,
+            repeat_days=7,
+            repeat_ends=datetime.date(2020, 7, 1),
+        )
+        baker.make(models.Event, summary="Party", start_date=datetime.date(2020, 6, 9))
+
+        occurrences = models.Event.objects.occurrences(
+            start=datetime.date(2020, 6, 9), end=datetime.date(2020, 6, 15)
+        )
+        assert [(e.summary, e.start_date, e.end_date) for e in occurrences] == [
+            # Still running on the first day of the window
+            ("Stamm", datetime.date(2020, 6, 8), datetime.date(2020, 6, 9)),
+            ("Party", datetime.date(2020, 6, 9), None),
+            ("Stamm", datetime.date(2020, 6, 15), datetime.date(2020, 6, 16)),
+        ]
+        assert models.Event.objects.occurrences().count() == 6
+
+    def test_rrule(self):
+        event = baker.make(
+            models.Event,
+            start_date=datetime.date(2020, 6, 2),
+            start_time=datetime.time(18, 15),
+            end_time=datetime.time(20, 0),
+            rrule="FREQ=WEEKLY;UNTIL=20200630",
+            exdates=[datetime.date(2020, 6, 16)],
+        )
+        assert [start for start, _ in self.occurrence_dates(event)] == [
+            datetime.date(2020, 6, 2),
+            datetime.date(2020, 6, 9),
+            datetime.date(2020, 6, 23),
+            datetime.date(2020, 6, 30),
+        ]
+
+        event.exdates = []
+        event.save()
+        assert len(self.occurrence_dates(event)) == 5
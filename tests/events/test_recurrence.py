@@ -0,0 +1,113 @@
+import datetime
+
+import pytest
+from django.core.exceptions import ValidationError
+
+from apps.events import recurrence
+
+
+@pytest.mark.parametrize(
+    "rule, all_day, expected",
+    [
+        ("freq=weekly;count=3", True, "FREQ=WEEKLY;COUNT=3"),
+        (
+            "RRULE:FREQ=WEEKLY;UNTIL=20200630",
+            False,
+            "FREQ=WEEKLY;UNTIL=20200630T235959",
+        ),
+        (
+            "FREQ=WEEKLY;UNTIL=20200630T120000Z",
+            False,
+            "FREQ=WEEKLY;UNTIL=20200630T120000",
+        ),
+        ("FREQ=WEEKLY;UNTIL=20200630T120000Z", True, "FREQ=WEEKLY;UNTIL=20200630"),
+    ],
+)
+def test_normalize_rule(rule, all_day, expected):
+    assert recurrence.normalize_rule(rule, all_day) == expected
+
+
+@pytest.mark.parametrize(
+    "rule",
+    ["FREQ=WEEKLY;COUNT=3", "FREQ=MONTHLY;BYDAY=1MO;UNTIL=20201231"],
+)
+def test_validate_rule(rule):
+    recurrence.validate_rule(rule)
+
+
+@pytest.mark.parametrize(
+    "rule",
+    [
+        "FREQ=SOMETIMES;COUNT=3",
+        "FREQ=WEEKLY",
+        "Montags",
+        # Several properties or rules
+        "FREQ=WEEKLY;COUNT=3\nEXDATE:20200101",
+        "FREQ=WEEKLY;COUNT=3 RDATE:20200101",
+        "FREQ=WEEKLY\nEXRULE:FREQ=DAILY;COUNT=3",
+        # More often than daily
+        "FREQ=HOURLY;COUNT=3",
+        "FREQ=MINUTELY;UNTIL=20200630",
+        "FREQ=DAILY;BYHOUR=8,18;COUNT=3",
+        "FREQ=WEEKLY;BYMINUTE=0,30;COUNT=3",
+        # More occurrences than are stored
+        "FREQ=DAILY;COUNT=5000",
+    ],
+)
+def test_validate_rule_invalid(rule):
+    with pytest.raises(ValidationError):
+        recurrence.validate_rule(rule)
+
+
+def test_occurrence_dates():
+    dates = recurrence.occurrence_dates(
+        "FREQ=WEEKLY;UNTIL=20200630",
+        datetime.datetime(2020, 6, 2, 18, 15),
+        exdates=[datetime.date(2020, 6, 16)],
+    )
+    assert dates == [
+        datetime.date(2020, 6, 2),
+        datetime.date(2020, 6, 9),
+        datetime.date(2020, 6, 23),
+        datetime.date(2020, 6, 30),
+    ]
+
+
+def test_occurrence_dates_start():
+    """As in RFC 5545 (and calendar clients), the start is only an
+    occurrence if it matches the rule."""
+    dates = recurrence.occurrence_dates(
+        "FREQ=MONTHLY;BYDAY=1MO;COUNT=2", datetime.date(2020, 6, 2)
+    )
+    assert dates == [datetime.date(2020, 7, 6), datetime.date(2020, 8, 3)]
+
+
+def test_occurrence_dates_sub_daily():
+    """Rules repeating more often than daily give one occurrence per day."""
+    dates = recurrence.occurrence_dates(
+        "FREQ=HOURLY;INTERVAL=12;COUNT=4", datetime.datetime(2020, 6, 2, 8)
+    )
+    assert dates == [datetime.date(2020, 6, 2), datetime.date(2020, 6, 3)]
+
+
+def test_occurrence_dates_limit():
+    dates = recurrence.occurrence_dates(
+        "FREQ=DAILY;COUNT=5000", datetime.date(2020, 1, 1)
+    )
+    assert len(dates) == recurrence.MAX_OCCURRENCES
+
+
+def test_validate_occurrences():
+    start = datetime.date(2020, 1, 1)
+    recurrence.validate_occurrences("FREQ=WEEKLY;UNTIL=20301231", start)
+    with pytest.raises(ValidationError):
+        recurrence.validate_occurrences("FREQ=DAILY;UNTIL=29991231", start)
+
+
+def test_validate_occurrences_exdates():
+    """Excluded dates aren't stored, so they don't count."""
+    start = datetime.date(2020, 1, 1)
+    rule = "FREQ=DAILY;UNTIL=20220927"  # 1001 days
+    with pytest.raises(ValidationError):
+        recurrence.validate_occurrences(rule, start)
+    recurrence.validate_occurrences(rule, start, exdates=[start])
@@ -121,7 +121,7 @@ class EventDetailViewTest(TestCase):
 @pytest.mark.django_db(transaction=True)
 def test_ical_event1(client, test_events):
     response = client.get(reverse("events:event_calendar"))
-    event = response.content.decode("utf-8").split("BEGIN:VEVENT")[1]
+    event = response.getvalue().decode("utf-8").split("BEGIN:VEVENT")[1]
     assert "SUMMARY:Weltuntergang" in event
     assert "DTSTART:20121221T200000" in event
     assert "DTEND:20121222T100000" in event
@@ -131,8 +131,172 @@ def test_ical_event1(client, test_events):
 @pytest.mark.django_db(transaction=True)
 def test_ical_event2(client, test_events):
     response = client.get(reverse("events:event_calendar"))
-    event = response.content.decode("utf-8").split("BEGIN:VEVENT")[2]
+    event = response.getvalue().decode("utf-8").split("BEGIN:VEVENT")[2]
     assert "SUMMARY:Afterparty" in event
     assert "DTSTART:20121222T100000" in event
     assert "DTEND:20121222T235959" in event
     assert "COMMENT:Erfasst von user2" in event
+
+
+def calendar_events(response):
+    """Return the VEVENT blocks of a calendar response."""
+    return response.getvalue().decode("utf-8").split("BEGIN:VEVENT")[1:]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ical_cached(client, test_events):
+    url = reverse("events:event_calendar")
+    response = client.get(url)
+    assert response.streaming
+    assert len(calendar_events(response)) == 2
+    etag = response["ETag"]
+
+    # Served from the cache until an event changes, reading the version from
+    # the shared cache
+    response = client.get(url)
+    assert response.request_metrics.queries == 1
+    assert response["ETag"] == etag
+    assert len(calendar_events(response)) == 2
+
+    baker.make(models.Event, summary="Neu", start_date=datetime.date(2013, 1, 1))
+    response = client.get(url)
+    assert response["ETag"] != etag
+    assert "SUMMARY:Neu" in calendar_events(response)[-1]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ical_not_modified(client, test_events):
+    url = reverse("events:event_calendar")
+    response = client.get(url)
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 304
+    assert response.request_metrics.queries == 1
+
+    response = client.get(url, HTTP_IF_MODIFIED_SINCE=response["Last-Modified"])
+    assert response.status_code == 304
+
+    models.Event.objects.get(summary="Afterparty").delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+    assert response.status_code == 200
+    assert len(calendar_events(response)) == 1
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.parametrize(
+    "params, summaries",
+    [
+        ({"to": "2012-12-21"}, ["Weltuntergang"]),
+        ({"from": "2012-12-22"}, ["Weltuntergang", "Afterparty"]),
+        ({"from": "2012-12-23"}, []),
+        ({"from": "2012-12-01", "to": "2012-12-31"}, ["Weltuntergang", "Afterparty"]),
+    ],
+)
+def test_ical_window(client, test_events, params, summaries):
+    response = client.get(reverse("events:event_calendar"), params)
+    events = calendar_events(response)
+    assert len(events) == len(summaries)
+    for event, summary in zip(events, summaries):
+        assert f"SUMMARY:{summary}" in event
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ical_window_not_cached(client, test_events):
+    """Only the complete feed is cached, not every requested window."""
+    url = reverse("events:event_calendar")
+    params = {"from": "2012-12-22"}
+    response = client.get(url, params)
+    assert len(calendar_events(response)) == 2
+    etag = response["ETag"]
+
+    response = client.get(url, params)
+    assert response.streaming
+    assert len(calendar_events(response)) == 2
+    assert client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+
+def test_ical_invalidated_by_other_process(client, other_process):
+    """Events created by another process invalidate the feed of this one."""
+    url = reverse("events:event_calendar")
+    response = client.get(url)
+    assert calendar_events(response) == []
+    etag = response["ETag"]
+
+    other_process(
+        "import datetime; "
+        "from apps.events.models import Event; "
+        "Event.objects.create(summary='Neu', start_date=datetime.date(2013, 1, 1))"
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert "SUMMARY:Neu" in calendar_events(response)[0]
+
+
+@pytest.mark.django_db
+def test_ical_window_recurring(client):
+    baker.make(
+        models.Event,
+        summary="Stamm",
+        start_date=datetime.date(2013, 1, 1),
+        end_date=datetime.date(2013, 1, 2),
+        repeats=True,
+        repeat_days=7,
+        repeat_ends=datetime.date(2013, 3, 1),
+    )
+    baker.make(models.Event, summary="Party", start_date=datetime.date(2013, 1, 1))
+    response = client.get(
+        reverse("events:event_calendar"), {"from": "2013-02-05", "to": "2013-02-12"}
+    )
+    # Repeated events are written once, with their rule
+    events = calendar_events(response)
+    assert len(events) == 1
+    assert "DTSTART;VALUE=DATE:20130101" in events[0]
+    assert "DTEND:20130102T235959" in events[0]
+    assert "RRULE:FREQ=DAILY;INTERVAL=7;UNTIL=20130301" in events[0]
+
+
+@pytest.mark.django_db
+def test_ical_invalid_window(client):
+    response = client.get(reverse("events:event_calendar"), {"from": "morgen"})
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_ical_streamed_queries(client, django_assert_num_queries):
+    for i in range(5):
+        baker.make(
+            models.Event,
+            author=baker.make(User, username=f"user{i}"),
+            start_date=datetime.date(2013, 1, i + 1),
+        )
+    response = client.get(reverse("events:event_calendar"))
+    # The events and their authors are read in a single query while streaming
+    with django_assert_num_queries(1):
+        events = calendar_events(response)
+    assert len(events) == 5
+
+
+@pytest.mark.django_db
+def test_event_list_recurring(client, django_assert_max_num_queries):
+    today = datetime.date.today()
+    baker.make(
+        models.Event,
+        summary="Stamm",
+        start_date=today - datetime.timedelta(days=14),
+        repeats=True,
+        repeat_days=7,
+        repeat_ends=today + datetime.timedelta(days=14),
+    )
+    with django_assert_max_num_queries(3):
+        response = client.get(reverse("events:event_list"))
+    future = response.context["events_future"]
+    past = response.context["events_past"]
+    assert [e.start_date for e in future] == [
+        today + datetime.timedelta(days=7),
+        today + datetime.timedelta(days=14),
+    ]
+    assert [e.start_date for e in past] == [
+        today,
+        today - datetime.timedelta(days=7),
+        today - datetime.timedelta(days=14),
+    ]
@@ -0,0 +1,58 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+
+from apps.front import context_processors
+from apps.lecturers import models as lecturer_models
+
+User = get_user_model()
+
+
+@pytest.mark.django_db
+def test_global_stats_lazy(rf, django_assert_num_queries):
+    """The counters are only queried when they are actually used."""
+    with django_assert_num_queries(0):
+        context = context_processors.global_stats(rf.get("/"))
+    with CaptureQueriesContext(connection) as queries:
+        assert int(context["usercount"]) == 0
+        assert int(context["quotecount"]) == 0
+    counts = [q for q in queries if 'COUNT(*) AS "__count"' in q["sql"]]
+    assert len(counts) == 4
+
+
+@pytest.mark.django_db
+def test_global_stats_cached(rf, django_assert_num_queries):
+    baker.make(User)
+    assert context_processors.get_global_stats()["usercount"] == 1
+    # Only the version is read from the shared cache
+    with django_assert_num_queries(1):
+        context = context_processors.global_stats(rf.get("/"))
+        assert str(context["usercount"]) == "1"
+
+
+@pytest.mark.django_db
+def test_global_stats_invalidation():
+    assert context_processors.get_global_stats()["usercount"] == 0
+    user = baker.make(User)
+    assert context_processors.get_global_stats()["usercount"] == 1
+    lecturer = baker.make(lecturer_models.Lecturer, function="Dozent")
+    assert context_processors.get_global_stats()["lecturercount"] == 1
+    lecturer.function = "Projektmitarbeiter"
+    lecturer.save()
+    assert context_processors.get_global_stats()["lecturercount"] == 0
+    user.delete()
+    assert context_processors.get_global_stats()["usercount"] == 0
+
+
+def test_global_stats_invalidated_by_other_process(other_process):
+    """Changes made by another process invalidate the counters of this
+    one."""
+    assert context_processors.get_global_stats()["usercount"] == 0
+    other_process(
+        "from model_bakery import baker; "
+        "from apps.front.models import User; "
+        "baker.make(User)"
+    )
+    assert context_processors.get_global_stats()["usercount"] == 1
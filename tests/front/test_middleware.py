@@ -0,0 +1,54 @@
+import datetime
+import logging
+
+from django.urls import reverse
+from model_bakery import baker
+
+
+def test_request_metrics(client, db, settings, caplog, monkeypatch):
+    settings.SERVER_TIMING_HEADER = True
+    # The logger doesn't propagate to the root logger captured by caplog
+    monkeypatch.setattr(logging.getLogger("apps.front.metrics"), "propagate", True)
+    baker.make_recipe("apps.documents.document_summary")
+    url = reverse("documents:documentcategory_list")
+
+    with caplog.at_level(logging.INFO, logger="apps.front.metrics"):
+        response = client.get(url)
+    metrics = response.request_metrics
+    assert metrics.view_name == "documents:documentcategory_list"
+    assert metrics.queries > 0
+    assert metrics.template_time > 0
+    assert metrics.cache_misses > 0
+    assert response["Server-Timing"].startswith(
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"'
+    )
+    (record,) = caplog.records
+    assert record.request_metrics["view_name"] == "documents:documentcategory_list"
+    assert "view=documents:documentcategory_list" in record.getMessage()
+
+    # The category grid is cached now
+    response = client.get(url)
+    assert response.request_metrics.cache_hits > 0
+    assert response.request_metrics.queries < metrics.queries
+
+
+def test_server_timing_disabled(client, db, settings):
+    settings.SERVER_TIMING_HEADER = False
+    response = client.get(reverse("home"))
+    assert "Server-Timing" not in response
+
+
+def test_request_metrics_streaming(client, db, caplog, monkeypatch):
+    monkeypatch.setattr(logging.getLogger("apps.front.metrics"), "propagate", True)
+    baker.make("events.Event", start_date=datetime.date(2013, 1, 1))
+
+    with caplog.at_level(logging.INFO, logger="apps.front.metrics"):
+        response = client.get(reverse("events:event_calendar"))
+        assert response.streaming
+        queries = response.request_metrics.queries
+        assert not caplog.records
+        b"".join(response.streaming_content)
+    # The events are read while streaming
+    assert response.request_metrics.queries > queries
+    (record,) = caplog.records
+    assert record.request_metrics["queries"] == response.request_metrics.queries
@@ -0,0 +1,75 @@
+"""Query budgets of the most frequently used views.
+
+The budgets are upper limits for the number of SQL queries per request,
+counted by ``RequestMetricsMiddleware``. They are measured with a few objects
+of every kind, so views with per-row queries exceed them. The requests are
+made with an empty cache, so the budgets include creating the cache versions
+in the shared database cache.
+"""
+
+import datetime
+
+import pytest
+from django.urls import reverse
+from model_bakery import baker
+
+from apps.documents import models as document_models
+from apps.events import models as event_models
+from apps.lecturers import models as lecturer_models
+from apps.tipps import models as tipp_models
+
+# (URL name, URL arguments, budget)
+BUDGETS = [
+    ("home", (), 3),
+    ("stats", (), 3),
+    ("user", ("uploader",), 16),
+    ("documents:documentcategory_list", (), 13),
+    ("documents:document_list", ("an1i",), 5),
+    ("documents:document_search", (), 3),
+    ("lecturers:lecturer_list", (), 4),
+    ("lecturers:lecturer_detail", (1337,), 5),
+    ("lecturers:quote_list", (), 4),
+    ("events:event_list", (), 3),
+    ("events:event_calendar", (), 2),
+    ("tipps:tipp_list", (), 4),
+    ("api:document_list", (), 3),
+    ("api:document_category_list", (), 6),
+    ("api:lecturer_list", (), 5),
+    ("api:quote_list", (), 4),
+]
+
+
+@pytest.fixture
+def data(user):
+    uploader = baker.make_recipe("apps.front.user", username="uploader")
+    lecturer = baker.make_recipe("apps.lecturers.lecturer")
+    category = baker.make_recipe("apps.documents.documentcategory")
+    category.lecturers.add(lecturer)
+    for _ in range(5):
+        document = baker.make(
+            document_models.Document,
+            category=category,
+            dtype=document_models.Document.DTypes.SUMMARY,
+            uploader=uploader,
+            document="a.pdf",
+        )
+        baker.make(document_models.DocumentRating, document=document, user=user)
+        quote = baker.make(lecturer_models.Quote, lecturer=lecturer, author=user)
+        lecturer_models.Quote.objects.vote(quote, user, True)
+        baker.make(lecturer_models.LecturerRating, lecturer=lecturer, rating=5)
+        baker.make(
+            event_models.Event,
+            author=user,
+            start_date=datetime.date.today() + datetime.timedelta(days=1),
+        )
+        baker.make(tipp_models.Tipp, author=user)
+    return {"uploader": (uploader.pk, uploader.username)}
+
+
+@pytest.mark.parametrize("view_name, args, budget", BUDGETS)
+def test_query_budget(auth_client, data, assert_query_budget, view_name, args, budget):
+    args = data.get(args[0], args) if args else args
+    response = auth_client.get(reverse(view_name, args=args), {"q": "test"})
+    assert response.status_code == 200
+    assert response.request_metrics.view_name == view_name
+    assert_query_budget(response, budget)
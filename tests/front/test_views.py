@@ -1,12 +1,19 @@
+import datetime
+
 import pytest
 from django.contrib.auth import get_user_model
 from django.core import mail
+from django.core.management import call_command
 from django.db import transaction
 from django.test import TestCase
 from django.urls import reverse
 from model_bakery import baker
 from pytest_django.asserts import assertRedirects
 
+from apps.events import models as event_models
+from apps.front import views
+from apps.lecturers.models import Lecturer, LecturerRating, Quote
+
 User = get_user_model()
 
 
@@ -20,6 +27,27 @@ def test_home_view(client):
     assert response.status_code == 200
 
 
+@pytest.mark.django_db
+def test_home_view_events_bounded(client):
+    """Repetitions of a daily event don't flood the home page."""
+    today = datetime.date.today()
+    baker.make(
+        event_models.Event,
+        start_date=today + datetime.timedelta(weeks=views.HOME_EVENT_WEEKS + 1),
+    )
+    response = client.get("/")
+    assert list(response.context["events_future"]) == []
+
+    baker.make(event_models.Event, start_date=today, rrule="FREQ=DAILY;COUNT=365")
+    response = client.get("/")
+    events = list(response.context["events_future"])
+    assert len(events) == views.HOME_EVENT_COUNT
+    assert [event.start_date for event in events[:2]] == [
+        today,
+        today + datetime.timedelta(days=1),
+    ]
+
+
 @pytest.mark.django_db
 def test_profile_view_unauth_redirect(client):
     """An unauthenticated user should not get access to the profile detail page."""
@@ -294,3 +322,38 @@ class StatsViewTest(TestCase):
         login(self)
         response = self.client.get(self.taburl)
         self.assertContains(response, "<h1>Statistiken</h1>")
+
+
+def test_stats(auth_client, user, django_assert_max_num_queries):
+    good, bad = baker.make(Lecturer, _quantity=2)
+    raters = baker.make(User, _quantity=6)
+    for rater in raters:
+        LecturerRating.objects.create(user=rater, lecturer=good, category="d", rating=9)
+        LecturerRating.objects.create(user=rater, lecturer=bad, category="d", rating=2)
+    LecturerRating.objects.create(user=user, lecturer=good, category="m", rating=5)
+    LecturerRating.objects.create(user=user, lecturer=bad, category="m", rating=5)
+    baker.make(Quote, lecturer=bad, author=user, _quantity=2)
+    baker.make(Quote, lecturer=good, author=raters[0])
+    spimport = baker.make(User, username="spimport")
+    baker.make(Quote, lecturer=good, author=spimport, _quantity=5)
+
+    # The leaderboards are only updated by a refresh
+    response = auth_client.get("/statistiken/")
+    assert response.context["lecturer_top_d"] is None
+    call_command("refresh_stats")
+
+    # Session, user, leaderboards, lecturers and users
+    with django_assert_max_num_queries(5):
+        response = auth_client.get("/statistiken/")
+    context = response.context
+    assert context["lecturer_top_d"] == good
+    assert context["lecturer_flop_d"] == bad
+    # Not enough ratings
+    assert context["lecturer_top_m"] is None
+    assert context["lecturer_quotes"] == [good, bad]
+    assert [lecturer.quotes_count for lecturer in context["lecturer_quotes"]] == [6, 2]
+    assert context["user_topratings"] == user
+    assert context["user_topratings"].lrcount == 2
+    assert context["user_topquotes"] == user
+    assert context["user_topquotes"].quotes_count == 2
+    assert context["user_topuploads"] is None
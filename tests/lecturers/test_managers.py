@@ -0,0 +1,104 @@
+import threading
+import time
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.core.management import call_command
+from django.db import connection, transaction
+from model_bakery import baker
+
+from apps.lecturers import models
+
+User = get_user_model()
+
+
+@pytest.fixture
+def quote(db):
+    quote = baker.make(models.Quote)
+    for vote in [True, True, False]:
+        models.Quote.objects.vote(quote, baker.make(User), vote)
+    return quote
+
+
+def test_with_votes(quote, user, django_assert_num_queries):
+    models.Quote.objects.vote(quote, user, True)
+    with django_assert_num_queries(1):
+        annotated = models.Quote.objects.with_votes(user).get()
+        assert annotated.vote_count == 4
+        assert annotated.upvote_count == 3
+        assert annotated.downvote_count == 1
+        assert annotated.vote_sum() == 2
+        assert annotated.voted_up and not annotated.voted_down
+    quote.refresh_from_db()
+    assert quote.vote_sum() == 2
+
+
+@pytest.mark.parametrize("user", [None, AnonymousUser()])
+def test_with_votes_anonymous(quote, user):
+    annotated = models.Quote.objects.with_votes(user).get()
+    assert annotated.vote_sum() == 1
+    assert not annotated.voted_up and not annotated.voted_down
+
+
+def test_with_votes_without_votes(db, user):
+    baker.make(models.Quote)
+    annotated = models.Quote.objects.with_votes(user).get()
+    assert annotated.vote_count == 0
+    assert annotated.vote_sum() == 0
+    assert not annotated.voted_up and not annotated.voted_down
+
+
+def test_vote(quote, user):
+    vote = models.Quote.objects.vote
+    assert vote(quote, user, True) == (3, 1)
+    assert vote(quote, user, True) == (3, 1)
+    # Flip
+    assert vote(quote, user, False) == (2, 2)
+    assert models.QuoteVote.objects.get(user=user).vote is False
+    # Removal
+    assert vote(quote, user, None) == (2, 1)
+    assert vote(quote, user, None) == (2, 1)
+    assert not models.QuoteVote.objects.filter(user=user).exists()
+
+
+def test_repair_vote_counters(quote, capsys):
+    models.Quote.objects.update(upvotes=42, downvotes=0)
+    call_command("repair_vote_counters")
+    quote.refresh_from_db()
+    assert (quote.upvotes, quote.downvotes) == (2, 1)
+    assert "1 quotes" in capsys.readouterr().out
+
+
+def test_save_keeps_vote_counters(quote, user):
+    stale = models.Quote.objects.get(pk=quote.pk)
+    models.Quote.objects.vote(quote, user, True)
+    stale.comment = "Bearbeitet"
+    stale.save()
+    quote.refresh_from_db()
+    assert quote.comment == "Bearbeitet"
+    assert (quote.upvotes, quote.downvotes) == (3, 1)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_vote_concurrent_first_votes():
+    """A second first vote of a user, e.g. of a double click, waits for the
+    first one instead of failing on the unique constraint."""
+    quote = baker.make(models.Quote)
+    user = baker.make(User)
+    results = []
+
+    def vote_again():
+        try:
+            results.append(models.Quote.objects.vote(quote, user, True))
+        finally:
+            connection.close()
+
+    thread = threading.Thread(target=vote_again)
+    with transaction.atomic():
+        assert models.Quote.objects.vote(quote, user, True) == (1, 0)
+        thread.start()
+        time.sleep(0.5)  # Let the other vote run into the lock
+    thread.join()
+    assert results == [(1, 0)]
+    assert models.QuoteVote.objects.filter(user=user).count() == 1
@@ -5,8 +5,11 @@ from django.contrib.auth import get_user_model
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from model_bakery import baker
+from PIL import Image
 
-from apps.lecturers import models
+from apps.documents.cache import category_list_version
+from apps.lecturers import models, photos
+from apps.lecturers.templatetags.lecturer_photos import photo_thumbnail
 
 User = get_user_model()
 
@@ -31,6 +34,17 @@ class TestLecturerModel:
         assert lecturer.avg_rating_m() == 10
         assert lecturer.avg_rating_f() == 0
 
+    def test_ratings_annotated(self, lecturer, django_assert_num_queries):
+        """Annotated ratings are read without additional queries."""
+        with django_assert_num_queries(1):
+            annotated = models.Lecturer.objects.with_ratings().get(pk=lecturer.pk)
+            assert annotated.avg_rating_d() == 7
+            assert annotated.avg_rating_m() == 10
+            assert annotated.avg_rating_f() == 0
+            assert annotated.rating_count_d() == 2
+            assert annotated.rating_count_m() == 1
+            assert annotated.rating_count_f() == 0
+
     def test_name(self, lecturer):
         assert lecturer.name() == "Prof. Dr. Krakaduku David"
 
@@ -49,6 +63,95 @@ class TestLecturerModel:
         assert 12 not in real_lecturers.values_list("pk", flat=True)
 
 
+class TestLecturerPhotos:
+    @pytest.fixture
+    def media(self, settings, tmp_path):
+        settings.MEDIA_ROOT = str(tmp_path)
+        (tmp_path / "lecturers" / "old").mkdir(parents=True)
+        return tmp_path / "lecturers"
+
+    def test_no_photo(self, db, media):
+        lecturer = baker.make(models.Lecturer)
+        assert lecturer.photo() is None
+        assert lecturer.old_photo_paths == []
+
+    def test_photos_stored_on_save(self, db, media, monkeypatch):
+        lecturer = baker.make(models.Lecturer)
+        (media / f"{lecturer.pk}.jpg").touch()
+        (media / "old" / str(lecturer.pk)).mkdir()
+        for filename in ["2.jpg", "1.jpg", "notes.txt"]:
+            (media / "old" / str(lecturer.pk) / filename).touch()
+        lecturer.save()
+
+        def listdir(path):
+            raise AssertionError("The file system must not be accessed")
+
+        monkeypatch.setattr("os.listdir", listdir)
+        lecturer = models.Lecturer.objects.get(pk=lecturer.pk)
+        assert lecturer.photo() == f"lecturers/{lecturer.pk}.jpg"
+        assert lecturer.old_photo_paths == [
+            f"lecturers/old/{lecturer.pk}/1.jpg",
+            f"lecturers/old/{lecturer.pk}/2.jpg",
+        ]
+
+    def test_scan_photos(self, db, media):
+        with_photo, without_photo = baker.make(models.Lecturer, _quantity=2)
+        (media / f"{with_photo.pk}.jpg").touch()
+        assert models.Lecturer.objects.scan_photos() == 1
+        assert models.Lecturer.objects.scan_photos() == 0
+        with_photo.refresh_from_db()
+        without_photo.refresh_from_db()
+        assert with_photo.photo() == f"lecturers/{with_photo.pk}.jpg"
+        assert without_photo.photo() is None
+
+        (media / f"{with_photo.pk}.jpg").unlink()
+        assert models.Lecturer.objects.scan_photos() == 1
+        with_photo.refresh_from_db()
+        assert with_photo.photo() is None
+
+    def test_thumbnails_generated_on_save(self, db, media, settings):
+        Image.new("RGB", (300, 400)).save(media / "1.jpg")
+        lecturer = baker.make(models.Lecturer, id=1)
+        lecturer.refresh_from_db()
+        assert set(lecturer.photo_thumbnails) == set(photos.THUMBNAIL_ALIASES)
+        for name in lecturer.photo_thumbnails.values():
+            assert (media.parent / name).exists()
+        with Image.open(
+            media.parent / lecturer.photo_thumbnails["lecturer_photo"]
+        ) as im:
+            assert im.size == (120, 160)
+        assert photo_thumbnail(lecturer, "lecturer_photo_small") == (
+            settings.MEDIA_URL + lecturer.photo_thumbnails["lecturer_photo_small"]
+        )
+
+    def test_generate_thumbnails(self, db, media, settings):
+        lecturer = baker.make(models.Lecturer, id=1)
+        Image.new("RGB", (300, 400)).save(media / "1.jpg")
+        (media / "old" / "1").mkdir()
+        Image.new("RGB", (300, 400)).save(media / "old" / "1" / "1.jpg")
+        assert models.Lecturer.objects.generate_thumbnails() == 1
+        assert models.Lecturer.objects.generate_thumbnails() == 0
+        lecturer.refresh_from_db()
+        assert lecturer.photo_thumbnails.keys() == set(photos.THUMBNAIL_ALIASES)
+        old_thumbnails = list((media / "old" / "1").glob("1.jpg.*"))
+        assert len(old_thumbnails) == len(photos.THUMBNAIL_ALIASES)
+
+        # The paths of the old thumbnails are stored too
+        [old_photo] = lecturer.old_photos()
+        assert old_photo.path == "lecturers/old/1/1.jpg"
+        assert old_photo.thumbnails.keys() == set(photos.THUMBNAIL_ALIASES)
+        assert photo_thumbnail(old_photo, "lecturer_photo_icon") == (
+            settings.MEDIA_URL + old_photo.thumbnails["lecturer_photo_icon"]
+        )
+
+    def test_scan_photos_invalidates_category_list(self, db, media):
+        lecturer = baker.make(models.Lecturer)
+        version = category_list_version()
+        (media / f"{lecturer.pk}.jpg").touch()
+        assert models.Lecturer.objects.scan_photos() == 1
+        assert category_list_version() != version
+
+
 class TestLecturerRatingModel:
     @pytest.fixture(autouse=True)
     def create_objects(self, db):
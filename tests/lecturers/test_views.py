@@ -1,8 +1,11 @@
 import pytest
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from model_bakery import baker
+from pytest_django.asserts import assertContains
 
 from apps.lecturers import models
 
@@ -164,3 +167,55 @@ class QuoteViewTest(TestCase):
         response = self.client.get("/zitate/")
         self.assertContains(response, "spam")
         self.assertContains(response, "ham")
+
+
+@pytest.mark.parametrize("url", ["/zitate/", "/dozenten/1337/"])
+def test_quote_votes_constant_query_count(auth_client, user, url):
+    """The number of queries must not depend on the number of quotes."""
+    lecturer = baker.make_recipe("apps.lecturers.lecturer")
+    other = baker.make(User)
+
+    def add_quotes(count):
+        for _ in range(count):
+            quote = baker.make(models.Quote, lecturer=lecturer, author=user)
+            models.Quote.objects.vote(quote, user, True)
+            models.Quote.objects.vote(quote, other, False)
+
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            response = auth_client.get(url)
+        assert response.status_code == 200
+        return len(queries)
+
+    add_quotes(2)
+    baseline = count_queries()
+    add_quotes(20)
+    assert count_queries() == baseline
+
+
+def test_lecturer_detail_stored_thumbnails(auth_client, monkeypatch, settings):
+    """The thumbnails of the old photos are read from the stored paths, not
+    generated while rendering."""
+    lecturer = baker.make_recipe("apps.lecturers.lecturer")
+    old_path = f"lecturers/old/{lecturer.pk}/1.jpg"
+    models.Lecturer.objects.filter(pk=lecturer.pk).update(
+        old_photo_paths=[old_path],
+        old_photo_thumbnails={
+            old_path: {
+                "lecturer_photo": f"{old_path}.120x160.jpg",
+                "lecturer_photo_icon": f"{old_path}.36x36.jpg",
+            }
+        },
+    )
+
+    def thumbnail_url(path, alias):
+        raise AssertionError("Thumbnails must not be generated while rendering")
+
+    monkeypatch.setattr(
+        "apps.lecturers.templatetags.lecturer_photos.thumbnail_url", thumbnail_url
+    )
+    response = auth_client.get(
+        reverse("lecturers:lecturer_detail", args=(lecturer.pk,))
+    )
+    assertContains(response, f'src="{settings.MEDIA_URL}{old_path}.120x160.jpg"')
+    assertContains(response, f'src="{settings.MEDIA_URL}{old_path}.36x36.jpg"')
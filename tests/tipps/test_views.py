@@ -0,0 +1,42 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from model_bakery import baker
+
+from apps.tipps import models
+
+User = get_user_model()
+
+
+def test_tipp_votes(auth_client, user):
+    tipp = baker.make(models.Tipp, author=user)
+    models.Tipp.objects.vote(tipp, user, False)
+    for _ in range(3):
+        models.Tipp.objects.vote(tipp, baker.make(User), True)
+
+    response = auth_client.get(reverse("tipps:tipp_list"))
+    tipp = response.context["object_list"][0]
+    assert tipp.vote_count == 4
+    assert tipp.vote_sum() == 2
+    assert tipp.voted_down and not tipp.voted_up
+
+
+def test_tipp_list_constant_query_count(client, db):
+    """The number of queries must not depend on the number of tipps."""
+    url = reverse("tipps:tipp_list")
+
+    def add_tipps(count):
+        for _ in range(count):
+            tipp = baker.make(models.Tipp, author=baker.make(User))
+            models.Tipp.objects.vote(tipp, tipp.author, True)
+
+    def count_queries():
+        with CaptureQueriesContext(connection) as queries:
+            assert client.get(url).status_code == 200
+        return len(queries)
+
+    add_tipps(2)
+    baseline = count_queries()
+    add_tipps(20)
+    assert count_queries() == baseline